@@ -0,0 +1,132 @@
+"""FAISS index types for vector store partitions.
+
+An index spec names the type, optionally followed by parameters:
+
+    flat                                  exact search (the default)
+    hnsw:m=32,ef_construction=40,ef_search=64
+    ivfpq:nlist=256,m=64,nbits=8,nprobe=16
+
+HNSW needs no training and keeps the full vectors plus a neighbour graph.
+IVF-PQ is trained on the vectors it is built from and stores compressed
+codes, so it is far smaller; left out, `nlist` is 4*sqrt(n) and `m` the
+largest of 64, 48, 32, ... that divides the dimension. Search parameters
+(`ef_search`, `nprobe`) are saved with the index.
+"""
+import math
+import numpy as np
+import faiss
+
+DEFAULT_INDEX_SPEC = "flat"
+
+INDEX_PARAMETERS = {
+    "flat": {},
+    "hnsw": {"m": 32, "ef_construction": 40, "ef_search": 64},
+    "ivfpq": {"nlist": None, "m": None, "nbits": 8, "nprobe": 16}
+}
+
+PQ_SUBQUANTIZERS = (64, 48, 32, 24, 16, 12, 8, 4, 2, 1)
+
+
+def parse_index_spec(spec):
+    """Split 'kind:key=value,...' into (kind, parameters with defaults filled in)"""
+    kind, _, options = (spec or DEFAULT_INDEX_SPEC).partition(":")
+    kind = kind.strip().lower()
+    if kind not in INDEX_PARAMETERS:
+        raise ValueError(f"Unknown index type '{kind}' (expected one of {', '.join(INDEX_PARAMETERS)})")
+    params = dict(INDEX_PARAMETERS[kind])
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        key = key.strip()
+        if key not in params:
+            raise ValueError(f"Unknown {kind} parameter '{key}'")
+        params[key] = int(value)
+    return kind, params
+
+
+def build_index(spec, vectors):
+    """An empty index of type `spec`, trained on `vectors` when it needs training"""
+    kind, params = parse_index_spec(spec)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    count, dimension = vectors.shape
+
+    if kind == "hnsw":
+        index = faiss.index_factory(dimension, f"HNSW{params['m']}")
+        index.hnsw.efConstruction = params["ef_construction"]
+        index.hnsw.efSearch = params["ef_search"]
+        return index
+
+    if kind == "ivfpq":
+        nlist = params["nlist"] or max(1, int(4 * math.sqrt(count)))
+        m = params["m"] or next(m for m in PQ_SUBQUANTIZERS if dimension % m == 0)
+        # k-means needs at least one point per centroid and per PQ code
+        if count < max(nlist, 2 ** params["nbits"]):
+            print(f"Only {count} vectors, too few to train IVF-PQ; using a flat index")
+            return faiss.IndexFlatL2(dimension)
+        # "np": skip polysemous training, which is slow and only helps Hamming filtering
+        index = faiss.index_factory(dimension, f"IVF{nlist},PQ{m}x{params['nbits']}np")
+        index.train(vectors)
+        index.nprobe = params["nprobe"]
+        # MMR reconstructs the vectors of hits; a hashtable map also allows removals
+        faiss.extract_index_ivf(index).set_direct_map_type(faiss.DirectMap.Hashtable)
+        return index
+
+    return faiss.IndexFlatL2(dimension)
+
+
+def remove_positions(index, positions):
+    """Return `index` without the vectors at `positions`; the rest are renumbered 0..n-1.
+
+    Only flat indexes compact their ids when removing in place. HNSW cannot
+    remove at all and IVF leaves gaps in the ids, so those are rebuilt from
+    their remaining vectors (an IVF index keeps its trained quantizers).
+    """
+    positions = np.asarray(sorted(positions), dtype=np.int64)
+    if isinstance(index, faiss.IndexFlat):
+        index.remove_ids(positions)
+        return index
+    keep = np.setdiff1d(np.arange(index.ntotal, dtype=np.int64), positions)
+    vectors = index.reconstruct_n(0, index.ntotal)[keep]
+    rebuilt = faiss.clone_index(index)
+    rebuilt.reset()
+    rebuilt.add(vectors)
+    return rebuilt
+
+
+def read_index(path, mmap=False):
+    """Load an index; with `mmap` its vectors/codes are paged in from the file on demand"""
+    if not mmap:
+        return faiss.read_index(path)
+    flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+    return faiss.read_index(path, flag | faiss.IO_FLAG_READ_ONLY)
+
+
+def infer_index_spec(indexes):
+    """A spec that rebuilds the type of `indexes` (the partitions of one store).
+
+    For stores saved before the spec was recorded. Small IVF-PQ partitions
+    fall back to flat, so any approximate partition decides the type;
+    an automatic `nlist`/`m` is recomputed on rebuild.
+    """
+    indexes = list(indexes)
+    for index in indexes:
+        if isinstance(index, faiss.IndexHNSW):
+            hnsw = index.hnsw
+            return f"hnsw:m={hnsw.nb_neighbors(1)},ef_construction={hnsw.efConstruction},ef_search={hnsw.efSearch}"
+    for index in indexes:
+        try:
+            ivf = faiss.extract_index_ivf(index)
+        except RuntimeError:
+            continue
+        return f"ivfpq:nprobe={ivf.nprobe}"
+    return DEFAULT_INDEX_SPEC
+
+
+def describe_index(index):
+    """Short human-readable index type, e.g. 'IVF-PQ (nlist=64, nprobe=16)'"""
+    if isinstance(index, faiss.IndexHNSW):
+        return f"HNSW (efSearch={index.hnsw.efSearch})"
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return "flat"
+    return f"IVF-PQ (nlist={ivf.nlist}, nprobe={ivf.nprobe})"
@@ -1,9 +1,10 @@
 import streamlit as st
-from langchain.chat_models import ChatOpenAI
-from langchain.chains import ConversationalRetrievalChain
-from langchain.vectorstores import FAISS
-from langchain.embeddings import OpenAIEmbeddings
-from config import OPENAI_API_KEY
+import contextlib
+import time
+from langchain.callbacks.base import BaseCallbackHandler
+from query_client import QueryServiceClient
+from conversation_memory import ConversationMemory
+from metrics import metrics
 import os
 
 # Configure Streamlit page
@@ -14,156 +15,76 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-class RAGApplication:
-    def __init__(self):
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=OPENAI_API_KEY
-        )
-        self.vector_store = FAISS.load_local(
-            "faiss_index", 
-            self.embeddings,
-            allow_dangerous_deserialization=True
-        )
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model_name='gpt-4-0125-preview',
-            openai_api_key=OPENAI_API_KEY,
-            max_tokens=4000
-        )
-        
-        # Create separate retrievers for different purposes
-        self.event_retriever = self.vector_store.as_retriever(
-            search_type="mmr",
-            search_kwargs={
-                "k": 4,
-                "fetch_k": 8,
-                "filter": {"document_type": "event_details"}
-            }
-        )
-        
-        self.food_retriever = self.vector_store.as_retriever(
-            search_type="similarity",
-            search_kwargs={
-                "k": 10,  # Get more food items for better combinations
-                "filter": {"document_type": "food_item"}
-            }
-        )
-        
-        self.qa_chain = ConversationalRetrievalChain.from_llm(
-            self.llm,
-            retriever=self.event_retriever,  # Default to event retriever
-            return_source_documents=True,
-            verbose=True,
-            max_tokens_limit=6000
-        )
+class StreamlitTokenHandler(BaseCallbackHandler):
+    """Render LLM tokens into a Streamlit placeholder as they arrive"""
+    
+    def __init__(self, placeholder):
+        self.placeholder = placeholder
+        self.tokens = []
+        self.start_time = time.perf_counter()
+        self.first_token_time = None
+    
+    def on_llm_new_token(self, token, **kwargs):
+        if self.first_token_time is None:
+            self.first_token_time = time.perf_counter()
+        self.tokens.append(token)
+        self.placeholder.markdown("".join(self.tokens) + "▌")
+    
+    def finish(self, response):
+        """Replace the streamed text with the final answer and return the timings"""
+        self.placeholder.markdown(response)
+        return {
+            "time_to_first_token": (
+                self.first_token_time - self.start_time if self.first_token_time else None
+            ),
+            "total_time": time.perf_counter() - self.start_time
+        }
 
-    def get_response(self, query, chat_history):
-        """Get response from the LLM"""
-        query_type = self._determine_query_type(query)
-        
-        if query_type == "menu_creation":
-            return self._handle_menu_creation(query)
-        elif query_type == "event_lookup":
-            return self._handle_event_query(query)
-        else:
-            return self._handle_general_query(query)
+def show_debug_panel(trace):
+    """Timing breakdown of the last request"""
+    with st.sidebar.expander("Last request breakdown", expanded=True):
+        if trace is None:
+            st.caption("Send a question to see its timings.")
+            return
+        attrs = ", ".join(f"{k}={v}" for k, v in trace["attrs"].items())
+        st.caption(f"{trace['name']} {attrs} · {trace['seconds'] * 1000:.0f} ms total")
+        st.table([
+            {"step": span["name"], "ms": round(span["seconds"] * 1000, 1)}
+            for span in trace["spans"]
+        ])
+        for value in trace["values"]:
+            st.caption(f"{value['name']}: {value['value']}")
 
-    def _determine_query_type(self, query):
-        """Determine the type of query"""
-        query_lower = query.lower()
-        
-        if any(phrase in query_lower for phrase in [
-            "create", "make", "design", "suggest", "new menu",
-            "what would you recommend", "can you prepare"
-        ]):
-            return "menu_creation"
-        elif any(phrase in query_lower for phrase in [
-            "what was", "tell me about", "details for", "information about",
-            "pricing for", "menu for the", "what did we serve"
-        ]):
-            return "event_lookup"
-        
-        return "general"
+@st.cache_resource(show_spinner=False)
+def get_rag_application():
+    """Return the RAGApplication shared by every session in this process.
 
-    def _handle_menu_creation(self, query):
-        """Handle menu creation requests using food item catalog"""
-        context = """
-        You are a creative menu designer with access to a catalog of food items. When creating menus:
-        1. Use only food items that exist in the catalog
-        2. Consider the menu section (appetizer, entree, etc.) when combining items
-        3. Create cohesive combinations that work well together
-        4. Reference which events the items were successfully used in
-        5. Use the base pricing guidelines for new menus
-        6. Explain why you chose each item and how they complement each other
-        """
-        
-        # Get relevant food items
-        food_docs = self.food_retriever.get_relevant_documents(query)
-        
-        # Create a focused menu creation prompt
-        menu_prompt = f"""
-        {context}
-        
-        Available Food Items:
-        {self._format_food_items(food_docs)}
-        
-        Base Pricing Guidelines:
-        - Drinks: $4 per person
-        - Sandwich lunch: $20 per person
-        - Hot lunch: $30 per person
-        - Dinner: $30-$55 per person
-        
-        Query: {query}
-        
-        Create a menu using only the available items above. Include:
-        1. Selected items with descriptions
-        2. Why you chose each item
-        3. Estimated pricing based on the guidelines
-        4. Suggested variations or alternatives
-        """
-        
-        with st.spinner("Creating custom menu..."):
-            response = self.llm.predict(menu_prompt)
-            return response
+    Streamlit builds it once on first use (under its own lock) and hands the
+    same instance to every rerun and session, so the FAISS index, OpenAI
+    clients and QA chain are only loaded once per process. The application
+    is created lazily, so this returns at once; `start_warm_up` loads the
+    rest after the page has rendered. With MENU_SERVICE_URL set, queries go
+    to a running query_service.py instead and nothing is loaded here.
+    """
+    if os.environ.get("MENU_SERVICE_URL"):
+        return QueryServiceClient(os.environ["MENU_SERVICE_URL"])
+    from rag_application import RAGApplication
+    return RAGApplication(lazy=True)
 
-    def _format_food_items(self, food_docs):
-        """Format food items for the menu creation prompt"""
-        formatted_items = []
-        for doc in food_docs:
-            formatted_items.append(f"""
-Item: {doc.metadata.get('item_name')}
-Section: {doc.metadata.get('menu_section')}
-Description: {doc.metadata.get('full_description')}
-Previously used in: {doc.metadata.get('source_event')}
-            """.strip())
-        return "\n\n".join(formatted_items)
-
-    def _handle_event_query(self, query):
-        """Handle queries about specific events"""
-        context = """
-        You are a menu bot with access to detailed event records. When providing event information:
-        1. Include the exact event name, date, and location
-        2. List all menu items by section
-        3. Provide the complete pricing breakdown
-        4. Include setup notes and contact information
-        Be specific and use exact details from the event records.
-        """
-        
-        result = self.qa_chain({
-            "question": f"{context}\n\nFind complete details for this event: {query}",
-            "chat_history": []
-        })
-        return result["answer"]
+@st.cache_resource(show_spinner=False)
+def start_warm_up(_rag_app):
+    """Load the index, models and chains in the background, once per process"""
+    if isinstance(_rag_app, QueryServiceClient):
+        return None
+    return _rag_app.warm_up_in_background()
 
-    def _handle_general_query(self, query):
-        """Handle general queries"""
-        context = "Menu creator bot. Use existing items/pricing only."
-        result = self.qa_chain({
-            "question": f"{context}\n\nQuery: {query}",
-            "chat_history": []
-        })
-        return result["answer"]
+def get_cache_stats(rag_app):
+    """Response cache statistics, local or from the query service (None while loading)"""
+    if isinstance(rag_app, QueryServiceClient):
+        return rag_app.stats()["response_cache"]
+    if "response_cache" not in rag_app.load_seconds:
+        return None
+    return rag_app.response_cache.stats()
 
 def initialize_session_state():
     """Initialize session state variables"""
@@ -171,6 +92,13 @@ def initialize_session_state():
         st.session_state.chat_history = []
     if "user_input" not in st.session_state:
         st.session_state.user_input = ""
+    if "last_timing" not in st.session_state:
+        st.session_state.last_timing = None
+    if "last_trace" not in st.session_state:
+        st.session_state.last_trace = None
+    if "memory" not in st.session_state:
+        # What follow-up questions see: recent turns plus a summary, within a token budget
+        st.session_state.memory = ConversationMemory()
 
 def main():
     initialize_session_state()
@@ -185,8 +113,8 @@ def main():
     """)
     
     try:
-        # Initialize RAG application
-        rag_app = RAGApplication()
+        # Shared, read-only RAG application (loaded once per process)
+        rag_app = get_rag_application()
         
         # Display only the last 5 exchanges in the UI
         display_history = st.session_state.chat_history[-5:] if len(st.session_state.chat_history) > 5 else st.session_state.chat_history
@@ -197,6 +125,40 @@ def main():
             st.write("🤖 Menu Creator:", answer)
             st.write("---")
         
+        timing = st.session_state.last_timing
+        if timing:
+            first_token = timing["time_to_first_token"]
+            st.caption(
+                (f"First token after {first_token:.1f}s · " if first_token is not None else "")
+                + f"Total {timing['total_time']:.1f}s"
+            )
+        
+        stream_responses = st.sidebar.checkbox("Stream responses", value=True)
+        cache_stats = get_cache_stats(rag_app)
+        if cache_stats is None:
+            st.sidebar.caption("Loading menu index...")
+        else:
+            st.sidebar.caption(
+                f"Response cache: {cache_stats['hit_rate']:.0%} hit rate "
+                f"({cache_stats['exact_hits']} exact, {cache_stats['semantic_hits']} similar), "
+                f"{cache_stats['saved_seconds']:.0f}s saved"
+            )
+        memory = st.session_state.memory
+        st.sidebar.caption(
+            f"Conversation memory: {len(memory)} turns "
+            f"({memory.summarized_turns} summarized), {memory.tokens()} tokens"
+        )
+        if st.sidebar.button("New conversation"):
+            memory.clear()
+            st.session_state.chat_history = []
+            st.rerun()
+        debug_timings = st.sidebar.checkbox(
+            "Debug timings", value=False,
+            help="Record a timing breakdown of each of your requests"
+        )
+        if debug_timings:
+            show_debug_panel(st.session_state.last_trace)
+        
         # Create a form for input
         with st.form(key="chat_form", clear_on_submit=True):
             user_question = st.text_area(
@@ -208,8 +170,23 @@ def main():
             submit_button = st.form_submit_button("Send")
             
             if submit_button and user_question:
-                # Get new response
-                response = rag_app.get_response(user_question, [])  # Pass empty chat history
+                # Get new response, streaming tokens into the page as they arrive
+                st.write("🤔 You:", user_question)
+                handler = StreamlitTokenHandler(st.empty())
+                # Only this session's requests are traced for its debug panel
+                with metrics.collect() if debug_timings else contextlib.nullcontext([]) as traces:
+                    if stream_responses:
+                        response = rag_app.get_response(
+                            user_question,
+                            memory.as_chat_history(),
+                            callbacks=[handler]
+                        )
+                    else:
+                        with st.spinner("Creating response..."):
+                            response = rag_app.get_response(user_question, memory.as_chat_history())
+                st.session_state.last_timing = handler.finish(response)
+                st.session_state.last_trace = traces[-1] if traces else None
+                memory.add_turn(user_question, response, summarize=getattr(rag_app, "summarize_history", None))
                 
                 # Update session state with new exchange
                 st.session_state.chat_history.append((user_question, response))
@@ -219,6 +196,9 @@ def main():
                     st.session_state.chat_history = st.session_state.chat_history[-10:]
                 
                 st.rerun()
+        
+        # The page is on screen; load whatever the first query would otherwise wait for
+        start_warm_up(rag_app)
                     
     except Exception as e:
         st.error(f"An error occurred: {str(e)}")
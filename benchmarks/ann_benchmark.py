@@ -0,0 +1,166 @@
+"""Recall and latency of the FAISS index types in ann_index against exact search.
+
+Vectors come from a partition of a saved index, or from a synthetic clustered
+corpus to see how each type scales past the size of the real one. Queries
+are corpus vectors with a little noise added, and the exact top-k of a flat
+index is the ground truth. Run from the repository root:
+
+    python -m benchmarks.ann_benchmark --index faiss_index --partition food_item
+    python -m benchmarks.ann_benchmark --synthetic 200000 --dim 1536 --output ann.json
+
+For each spec it reports build time, serialized size (the memory an
+in-process load takes), load time with and without mmap, single-query latency
+p50/p95/p99 and recall@k. It also deletes half of the vectors through
+ann_index.remove_positions and checks that every hit of a search afterwards
+is a remaining vector at its renumbered position.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import faiss
+from ann_index import build_index, describe_index, read_index, remove_positions
+
+DEFAULT_SPECS = ["flat", "hnsw", "hnsw:ef_search=128", "ivfpq", "ivfpq:nprobe=32"]
+
+
+def partition_vectors(index_path, partition):
+    from index_versions import IndexVersions
+    version_path = IndexVersions(index_path).current_path() or index_path
+    index = faiss.read_index(os.path.join(version_path, partition, "index.faiss"))
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def synthetic_vectors(count, dimension, clusters, seed):
+    """Unit vectors around random centres, roughly like text embeddings"""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, count)]
+    vectors += 0.6 * rng.standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors, count, seed):
+    rng = np.random.default_rng(seed + 1)
+    queries = vectors[rng.integers(0, len(vectors), count)].copy()
+    queries += 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+    return queries
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99))
+    }
+
+
+def bench_spec(spec, vectors, queries, truth, k, workdir):
+    start = time.perf_counter()
+    index = build_index(spec, vectors)
+    index.add(vectors)
+    build_seconds = time.perf_counter() - start
+
+    path = os.path.join(workdir, "index.faiss")
+    faiss.write_index(index, path)
+    timings = {}
+    for label, mmap in (("load_seconds", False), ("mmap_load_seconds", True)):
+        start = time.perf_counter()
+        loaded = read_index(path, mmap)
+        timings[label] = time.perf_counter() - start
+
+    # One query at a time, as the app searches
+    latencies = []
+    found = np.empty((len(queries), k), dtype=np.int64)
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = loaded.search(query[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        found[i] = ids[0]
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+
+    return dict(
+        {"index": describe_index(index), "build_seconds": build_seconds,
+         "bytes": os.path.getsize(path), f"recall_at_{k}": float(recall)},
+        **timings, **percentiles(latencies)
+    )
+
+
+def check_delete(spec, vectors, queries, k):
+    """Delete every other vector, then search: positions must stay contiguous and map to kept vectors"""
+    index = build_index(spec, vectors)
+    index.add(vectors)
+    deleted = np.arange(0, len(vectors), 2)
+    kept = np.setdiff1d(np.arange(len(vectors)), deleted)
+    index = remove_positions(index, deleted)
+    problems = []
+    if index.ntotal != len(kept):
+        problems.append(f"ntotal {index.ntotal} after delete, expected {len(kept)}")
+    # Each kept vector should find itself at its new position (kept is sorted)
+    probe = np.arange(0, len(kept), max(len(kept) // len(queries), 1))[:len(queries)]
+    _, ids = index.search(vectors[kept[probe]], k)
+    if ids.max() >= len(kept):
+        problems.append(f"search returned position {ids.max()} past the {len(kept)} remaining vectors")
+    self_hits = float(np.mean([position in row for position, row in zip(probe, ids)]))
+    return {"delete_ok": not problems, "delete_self_recall": self_hits, "delete_problems": problems}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", default="faiss_index", help="Saved index folder (its live version, if versioned)")
+    parser.add_argument("--partition", default="food_item", help="Partition of --index to use")
+    parser.add_argument("--synthetic", type=int, help="Use this many synthetic vectors instead")
+    parser.add_argument("--dim", type=int, default=1536, help="Dimension of synthetic vectors")
+    parser.add_argument("--clusters", type=int, default=200, help="Clusters in the synthetic corpus")
+    parser.add_argument("--specs", nargs="+", default=DEFAULT_SPECS, help="Index specs to compare")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON results here")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, args.dim, args.clusters, args.seed)
+        corpus = {"synthetic": args.synthetic, "clusters": args.clusters}
+    else:
+        vectors = partition_vectors(args.index, args.partition)
+        corpus = {"index": args.index, "partition": args.partition}
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    k = min(args.k, len(vectors))
+    queries = make_queries(vectors, args.queries, args.seed)
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    results = {
+        "corpus": dict(corpus, vectors=len(vectors), dim=int(vectors.shape[1])),
+        "queries": args.queries,
+        "k": k,
+        "specs": {}
+    }
+    with tempfile.TemporaryDirectory(prefix="ann_bench_") as workdir:
+        for spec in args.specs:
+            results["specs"][spec] = bench_spec(spec, vectors, queries, truth, k, workdir)
+            results["specs"][spec].update(check_delete(spec, vectors, queries, k))
+            row = results["specs"][spec]
+            print(f"{spec:28} recall@{k} {row[f'recall_at_{k}']:.3f}  p50 {row['p50_ms']:.3f} ms  "
+                  f"p99 {row['p99_ms']:.3f} ms  {row['bytes'] / 1e6:.1f} MB  build {row['build_seconds']:.1f}s  "
+                  f"delete {'ok' if row['delete_ok'] else 'FAILED'}",
+                  file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
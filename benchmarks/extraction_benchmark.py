@@ -0,0 +1,122 @@
+"""Golden check and microbenchmark for MenuExtractor.
+
+Run from the repository root:
+
+    python -m benchmarks.extraction_benchmark            # verify + time
+    python -m benchmarks.extraction_benchmark --update-golden
+
+The golden files hold the output of the reference functions in
+benchmarks/reference_extraction for every fixture; MenuExtractor must reproduce them exactly
+(compared as JSON, so key order counts too).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from menu_extractor import MenuExtractor
+from benchmarks import reference_extraction
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, "fixtures")
+GOLDEN_DIR = os.path.join(HERE, "golden")
+
+
+def load_fixtures():
+    fixtures = {}
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.endswith(".txt"):
+            with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+                fixtures[name[:-4]] = f.read()
+    return fixtures
+
+
+def reference_output(text, filename):
+    return {
+        "event_details": reference_extraction.extract_event_details(text, filename),
+        "pricing_details": reference_extraction.extract_pricing_details(text),
+        "food_items": reference_extraction.extract_food_items(text)
+    }
+
+
+def extractor_output(extractor, text, filename):
+    event_details, food_items = extractor.extract(text, filename)
+    return {
+        "event_details": event_details,
+        "pricing_details": extractor.extract_pricing_details(text),
+        "food_items": food_items
+    }
+
+
+def update_golden(fixtures):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for name, text in fixtures.items():
+        with open(os.path.join(GOLDEN_DIR, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(reference_output(text, f"{name}.pdf"), f, indent=2)
+            f.write("\n")
+    print(f"Wrote {len(fixtures)} golden files to {GOLDEN_DIR}")
+
+
+def check_golden(fixtures, extractor):
+    failures = []
+    for name, text in fixtures.items():
+        with open(os.path.join(GOLDEN_DIR, f"{name}.json"), "r", encoding="utf-8") as f:
+            golden = json.dumps(json.load(f), indent=2)
+        for label, output in (
+            ("reference", reference_output(text, f"{name}.pdf")),
+            ("extractor", extractor_output(extractor, text, f"{name}.pdf"))
+        ):
+            if json.dumps(output, indent=2) != golden:
+                failures.append(f"{name}: {label} output differs from golden")
+    return failures
+
+
+def time_per_doc(func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for name, text in texts:
+            func(text, f"{name}.pdf")
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def legacy_pipeline(text, filename):
+    # What ingestion used to run per PDF: event details (which re-split the
+    # text for pricing) plus extract_food_items twice
+    reference_extraction.extract_event_details(text, filename)
+    reference_extraction.extract_food_items(text)
+    reference_extraction.extract_food_items(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--update-golden", action="store_true", help="Regenerate golden files from the reference functions")
+    parser.add_argument("--repeat", type=int, default=200, help="Timing iterations per document")
+    parser.add_argument("--scale", type=int, default=20, help="Also time each fixture repeated this many times")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    if args.update_golden:
+        update_golden(fixtures)
+        return
+
+    extractor = MenuExtractor()
+    failures = check_golden(fixtures, extractor)
+    if failures:
+        print("\n".join(failures))
+        sys.exit(1)
+    print(f"Golden check passed for {len(fixtures)} fixtures")
+
+    for label, texts in (
+        ("fixture", list(fixtures.items())),
+        (f"fixture x{args.scale}", [(name, "\n".join([text] * args.scale)) for name, text in fixtures.items()])
+    ):
+        repeat = max(1, args.repeat // (args.scale if "x" in label else 1))
+        legacy = time_per_doc(legacy_pipeline, texts, repeat)
+        single_pass = time_per_doc(extractor.extract, texts, repeat)
+        print(f"{label:>14}: legacy {legacy * 1e6:9.1f} us/doc  "
+              f"single-pass {single_pass * 1e6:9.1f} us/doc  "
+              f"speedup {legacy / single_pass:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
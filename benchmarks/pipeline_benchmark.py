@@ -0,0 +1,288 @@
+"""Offline end-to-end benchmark of ingestion and querying.
+
+Generates a synthetic invoice corpus, ingests it through PDFProcessor from a
+local folder source, and queries it through RAGApplication. Embeddings are
+HashEmbeddings and the LLM is a canned FakeListLLM, so nothing touches the network
+and every run does the same work. Run from the repository root:
+
+    python -m benchmarks.pipeline_benchmark --docs 200 --output bench.json
+    python -m benchmarks.pipeline_benchmark --docs 200 --compare bench.json
+
+All files are written to a temporary working directory that is removed
+afterwards (keep it with --workdir).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from langchain.llms.fake import FakeListLLM
+import pdf_extraction
+from benchmarks.synthetic_corpus import generate_corpus
+from catalog_store import FoodItemRecord
+from document_sources import CachedTextSource, LocalFolderSource
+from embedding_cache import HashEmbeddings
+from embedding_scheduler import EmbeddingScheduler
+from event_store import EventStore
+from food_catalog import FoodCatalog
+from partitioned_store import PartitionedVectorStore, INDEX_PATH
+from pdf_processor import PDFProcessor
+from rag_application import RAGApplication
+
+STUB_ANSWER = (
+    "Here is a menu built from past events. Appetizers: Caprese Skewers and Mini Crab Cakes. "
+    "Entree: Herb Roasted Salmon with Roasted Vegetable Platter. Dessert: Lemon Bars. "
+    "The pricing above applies as given."
+)
+
+
+class StubLLM(FakeListLLM):
+    """FakeListLLM with a local token estimate (the default needs transformers)"""
+
+    def get_num_tokens(self, text):
+        return len(text) // 4 + 1
+
+
+def rate(count, seconds):
+    return count / seconds if seconds else None
+
+
+def stage(count, seconds, unit):
+    return {"seconds": seconds, unit: count, f"{unit}_per_second": rate(count, seconds)}
+
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        "count": int(samples.size),
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99))
+    }
+
+
+def bench_ingestion_stages(source, processor, embeddings):
+    """Run each ingestion stage on its own so they can be timed separately"""
+    results = {}
+
+    start = time.perf_counter()
+    files = source.list_files()
+    results["list"] = stage(len(files), time.perf_counter() - start, "files")
+
+    start = time.perf_counter()
+    blobs = [source.download(f) for f in files]
+    seconds = time.perf_counter() - start
+    results["download"] = dict(stage(len(blobs), seconds, "files"),
+                               megabytes_per_second=rate(sum(map(len, blobs)) / 1e6, seconds))
+
+    start = time.perf_counter()
+    pages = [pdf_extraction.extract_pdf_pages(data) for data in blobs]
+    seconds = time.perf_counter() - start
+    page_count = sum(len(p) for p in pages)
+    results["pdf_text"] = dict(stage(page_count, seconds, "pages"),
+                               ms_per_page=seconds * 1000 / page_count if page_count else None)
+
+    start = time.perf_counter()
+    parsed = [pdf_extraction.parse_text(pdf_extraction.join_pages(p), f['title'])
+              for f, p in zip(files, pages)]
+    results["parse"] = stage(len(parsed), time.perf_counter() - start, "files")
+
+    start = time.perf_counter()
+    documents = []
+    food_records = []
+    for f, result in zip(files, parsed):
+        details = result['event_details']
+        documents.extend(processor.create_documents(details))
+        food_records.extend(
+            FoodItemRecord(item['name'], item['description'], item['section'],
+                           details['event_name'], details['date'], f['id'])
+            for item in result['food_items']
+        )
+    catalog = FoodCatalog.build(food_records)
+    documents.extend(FoodCatalog.document(item) for item in catalog.items)
+    results["documents"] = dict(stage(len(documents), time.perf_counter() - start, "documents"),
+                                food_item_records=len(food_records), canonical_food_items=len(catalog.items))
+
+    scheduler = EmbeddingScheduler(embeddings, checkpoint_dir="bench_checkpoints")
+    texts = [doc.page_content for doc in documents]
+    start = time.perf_counter()
+    vectors = scheduler.embed(texts)
+    results["embed"] = stage(len(texts), time.perf_counter() - start, "documents")
+    scheduler.clear_checkpoints()
+
+    start = time.perf_counter()
+    store = PartitionedVectorStore(embeddings)
+    store.add_embeddings(list(zip(texts, vectors)), [doc.metadata for doc in documents],
+                         [str(i) for i in range(len(documents))])
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    store.save("bench_index")
+    save_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    PartitionedVectorStore.load("bench_index", embeddings)
+    load_seconds = time.perf_counter() - start
+    shutil.rmtree("bench_index")
+
+    index = {
+        "documents": len(documents),
+        "build_seconds": build_seconds,
+        "save_seconds": save_seconds,
+        "load_seconds": load_seconds
+    }
+    return results, index
+
+
+def bench_full_ingest(processor, pipelined):
+    """process_all_pdfs end to end, as process_pdfs.py runs it"""
+    pipeline = None
+    if pipelined:
+        from ingest_pipeline import IngestPipeline
+        pipeline = IngestPipeline()
+    scheduler = EmbeddingScheduler(processor.embeddings)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.process_all_pdfs(full_rebuild=True, pipeline=pipeline, scheduler=scheduler)
+    return time.perf_counter() - start
+
+
+def bench_re_extract(processor):
+    """process_all_pdfs from the text cache the full ingest filled, as --re-extract runs it"""
+    re_extractor = PDFProcessor(source=CachedTextSource(processor.text_cache),
+                                embeddings=processor.embeddings, text_cache=processor.text_cache)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        re_extractor.process_all_pdfs(full_rebuild=True)
+    return time.perf_counter() - start
+
+
+def build_queries(event_store, count):
+    events = event_store.all_events()
+    templates = {
+        "event_lookup_by_name": lambda e: f"Tell me about the {e['event_name']}",
+        "event_lookup_by_invoice": lambda e: f"Details for invoice {e['invoice_no']}",
+        "event_lookup_retrieval": lambda e: f"What did we serve for around {e['guest_count']} guests at {e['location']}?",
+        "menu_creation": lambda e: f"Create a menu for {e['guest_count']} people with dishes like those at {e['location']}",
+        "pricing_stats": lambda e: f"What do we usually charge per guest for hot lunch at {e['guest_count']}+ guests?",
+        "general": lambda e: f"Which desserts work well with {e['menu_sections'][0][1][0] if e['menu_sections'] else 'salmon'}?"
+    }
+    return {
+        label: [template(events[i % len(events)]) for i in range(count)]
+        for label, template in templates.items()
+    }
+
+
+def bench_queries(rag_app, queries):
+    results = {}
+    for label, batch in queries.items():
+        samples = []
+        for query in batch:
+            rag_app.response_cache.clear()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                rag_app.get_response(query, [])
+            samples.append(time.perf_counter() - start)
+        results[label] = percentiles(samples)
+    return results
+
+
+def flatten(data, prefix=""):
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(previous, current):
+    old, new = flatten(previous), flatten(current)
+    for name in sorted(new):
+        if name in old and old[name]:
+            change = (new[name] - old[name]) / old[name]
+            print(f"{name:60} {old[name]:14.4f} -> {new[name]:14.4f}  {change:+7.1%}")
+
+
+def run(args):
+    corpus_dir = os.path.abspath("corpus")
+    start = time.perf_counter()
+    generate_corpus(corpus_dir, args.docs, args.sections, args.items, args.seed)
+    generate_seconds = time.perf_counter() - start
+
+    embeddings = HashEmbeddings()
+    source = LocalFolderSource(corpus_dir)
+    processor = PDFProcessor(source=source, embeddings=embeddings)
+
+    stages, index = bench_ingestion_stages(source, processor, embeddings)
+    full_seconds = bench_full_ingest(processor, args.pipelined)
+    stages["process_all_pdfs"] = stage(args.docs, full_seconds, "files")
+    stages["re_extract"] = stage(args.docs, bench_re_extract(processor), "files")
+
+    llm = StubLLM(responses=[STUB_ANSWER])
+    rag_app = RAGApplication(embeddings=embeddings, llm=llm, index_path=INDEX_PATH, event_store=EventStore())
+    queries = build_queries(rag_app.event_store, args.queries)
+
+    return {
+        "config": {
+            "docs": args.docs, "sections": args.sections, "items": args.items,
+            "seed": args.seed, "queries": args.queries, "pipelined": args.pipelined
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count()
+        },
+        "corpus": {"generate_seconds": generate_seconds},
+        "ingestion": stages,
+        "index": index,
+        "queries": bench_queries(rag_app, queries)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100, help="Synthetic invoices to generate")
+    parser.add_argument("--sections", type=int, default=4, help="Menu sections per invoice")
+    parser.add_argument("--items", type=int, default=5, help="Dishes per menu section")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--queries", type=int, default=50, help="Queries per query type")
+    parser.add_argument("--pipelined", action="store_true", help="Use IngestPipeline for the end-to-end run")
+    parser.add_argument("--workdir", help="Keep all generated files in this directory")
+    parser.add_argument("--output", help="Write the JSON results here")
+    parser.add_argument("--compare", help="Print changes against an earlier JSON result")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    previous_path = os.path.abspath(args.compare) if args.compare else None
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="menu_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = run(args)
+    finally:
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    if previous_path:
+        with open(previous_path) as f:
+            compare(json.load(f), results)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+"""The original regex extraction functions, kept as the reference MenuExtractor is checked against.
+
+They produced the golden files in benchmarks/golden and are only used by
+extraction_benchmark; ingestion goes through MenuExtractor.
+"""
+import re
+
+
+def extract_pricing_details(text):
+    """Extract detailed pricing breakdown with line item associations"""
+    pricing_details = {
+        'per_person_charges': [],  # Items charged per guest
+        'flat_charges': [],        # Fixed charges
+        'staff_charges': [],       # Staff-related charges
+        'additional_charges': [],  # Additional services
+        'summary': {              # Total calculations
+            'subtotal': None,
+            'service_fee': None,
+            'delivery_setup': None,
+            'tax': None,
+            'tax_rate': None,
+            'grand_total': None
+        }
+    }
+
+    # Find the pricing section
+    pricing_section = None
+    lines = text.split('\n')
+    for i, line in enumerate(lines):
+        if re.match(r'^\s*pricing\s*$', line, re.I):
+            # Capture all lines until we hit a blank line or new section
+            pricing_lines = []
+            j = i + 1
+            while j < len(lines) and lines[j].strip() and not lines[j].strip().lower().startswith(('menu', 'contact')):
+                pricing_lines.append(lines[j].strip())
+                j += 1
+            pricing_section = '\n'.join(pricing_lines)
+            break
+
+    if not pricing_section:
+        return pricing_details
+
+    # Patterns for different pricing formats
+    patterns = {
+        'per_person': r'(?P<item>.*?)\s*at\s*\$(?P<price>[\d,.]+)\s*per\s*guest\s*x\s*(?P<guests>\d+)\s*guests?\s*=\s*\$(?P<total>[\d,.]+)',
+        'staff': r'(?P<role>.*?)\s*at\s*\$(?P<rate>[\d,.]+)\s*x\s*(?P<count>\d+)?\s*=\s*\$(?P<total>[\d,.]+)',
+        'tax': r'(?P<rate>[\d.]+)\s*%\s*tax\s*=\s*\$(?P<amount>[\d,.]+)',
+        'service': r'service\s*fee\s*=\s*\$(?P<amount>[\d,.]+)',
+        'delivery': r'delivery\s*(?:&|and)\s*set-?up\s*fee\s*=\s*\$(?P<amount>[\d,.]+)',
+        'total': r'grand\s*total\s*=\s*\$(?P<amount>[\d,.]+)',
+        'flat_rate': r'(?P<item>.*?)\s*=\s*\$(?P<amount>[\d,.]+)',
+        'tbd': r'(?P<item>.*?)\s*=\s*(?:t\.b\.d\.|TBD)',
+    }
+
+    # Process each line of the pricing section
+    for line in pricing_section.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+
+        # Try to match each pattern
+        matched = False
+
+        # Check for per-person charges first
+        match = re.match(patterns['per_person'], line, re.I)
+        if match:
+            pricing_details['per_person_charges'].append({
+                'item': match.group('item').strip(),
+                'price_per_person': float(match.group('price').replace(',', '')),
+                'guest_count': int(match.group('guests')),
+                'total': float(match.group('total').replace(',', '')),
+                'line_item': line.strip()
+            })
+            matched = True
+            continue
+
+        # Check for staff charges
+        match = re.match(patterns['staff'], line, re.I)
+        if match and 'guest' not in line.lower():
+            pricing_details['staff_charges'].append({
+                'role': match.group('role').strip(),
+                'rate': float(match.group('rate').replace(',', '')),
+                'count': int(match.group('count')) if match.group('count') else 1,
+                'total': float(match.group('total').replace(',', '')),
+                'line_item': line.strip()
+            })
+            matched = True
+            continue
+
+        # Check for tax
+        match = re.match(patterns['tax'], line, re.I)
+        if match:
+            pricing_details['summary']['tax_rate'] = float(match.group('rate'))
+            pricing_details['summary']['tax'] = float(match.group('amount').replace(',', ''))
+            matched = True
+            continue
+
+        # Check for service fee
+        match = re.match(patterns['service'], line, re.I)
+        if match:
+            pricing_details['summary']['service_fee'] = float(match.group('amount').replace(',', ''))
+            matched = True
+            continue
+
+        # Check for delivery fee
+        match = re.match(patterns['delivery'], line, re.I)
+        if match:
+            pricing_details['summary']['delivery_setup'] = float(match.group('amount').replace(',', ''))
+            matched = True
+            continue
+
+        # Check for grand total
+        match = re.match(patterns['total'], line, re.I)
+        if match:
+            pricing_details['summary']['grand_total'] = float(match.group('amount').replace(',', ''))
+            matched = True
+            continue
+
+        # Check for TBD items
+        match = re.match(patterns['tbd'], line, re.I)
+        if match:
+            pricing_details['additional_charges'].append({
+                'item': match.group('item').strip(),
+                'amount': 'TBD',
+                'line_item': line.strip()
+            })
+            matched = True
+            continue
+
+        # Check for flat rate items if no other patterns matched
+        if not matched:
+            match = re.match(patterns['flat_rate'], line, re.I)
+            if match:
+                item = match.group('item').strip().lower()
+                if not any(keyword in item for keyword in ['total', 'sub-total', 'service fee', 'tax']):
+                    pricing_details['flat_charges'].append({
+                        'item': match.group('item').strip(),
+                        'amount': float(match.group('amount').replace(',', '')),
+                        'line_item': line.strip()
+                    })
+
+    return pricing_details
+
+
+def extract_event_details(text, filename):
+    """Extract comprehensive event details"""
+    # Enhanced patterns for event metadata
+    patterns = {
+        'price': [
+            r'\$[\d,]+(?:\.\d{2})?(?:\s*(?:per person|pp|p/p))?',
+            r'(?:price|cost|total):\s*\$[\d,]+(?:\.\d{2})?',
+            r'(?:per person|pp|p/p):\s*\$[\d,]+(?:\.\d{2})?'
+        ],
+        'date': [
+            r'(?:date:|on:?)\s*([\w\s,.&]+\d{2,4})',
+            r'(\d{1,2}[./]\d{1,2}[./]\d{2,4})',
+            r'([A-Z][a-z]+ \d{1,2}(?:st|nd|rd|th)?,? \d{4})'
+        ],
+        'time': [
+            r'(?:time[s]?:|at:?)\s*([^\n]+)',
+            r'(\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)(?:\s*-\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm))?)'
+        ],
+        'guest_count': [
+            r'(?:guests?|people|attendees|count):\s*(\d+)',
+            r'(?:for|serving)\s+(\d+)\s+(?:people|guests|attendees)',
+            r'guests?:\s*([^\n]+)'  # Capture varying guest counts
+        ],
+        'location': [
+            r'(?:location|venue|place):\s*([^\n]+)'
+        ],
+        'setup_notes': [
+            r'(?:setup|set up|setup notes):\s*([^\n]+(?:\n(?!\w+:)[^\n]+)*)'
+        ],
+        'invoice_no': [
+            r'(?:invoice\s*(?:no|number|#)?:?\s*)([A-Z0-9]+)'
+        ],
+        'contact': [
+            r'(?:contact|contact person):\s*([^\n]+)'
+        ],
+        'email': [
+            r'(?:email|e-mail):\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+            r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
+        ],
+        'phone': [
+            r'(?:phone|cell|tel):\s*([0-9.()-]+)',
+            r'(?:phone|cell|tel)[^:]*:\s*([^\n]+)'  # Capture phone with description
+        ]
+    }
+
+    # Add specific pattern for event name
+    event_patterns = [
+        r'^(?:event|function|occasion):\s*(.+)$',
+        r'^(?:event|function|occasion)\s+name:\s*(.+)$',
+        r'(?:catering|menu)\s+for:\s*(.+)$'
+    ]
+
+    # Initialize details dictionary
+    details = {
+        "event_name": "",
+        "date": None,
+        "time": None,
+        "guest_count": None,
+        "location": None,
+        "setup_notes": None,
+        "invoice_no": None,
+        "contact": None,
+        "email": None,
+        "phone": None,
+        "prices": [],
+        "menu_items": [],
+        "full_text": text
+    }
+
+    # Extract event name - enhanced method
+    lines = text.split('\n')
+    event_name_found = False
+
+    # First try explicit event patterns
+    for line in lines[:15]:  # Look in first 15 lines
+        line = line.strip()
+        for pattern in event_patterns:
+            match = re.match(pattern, line, re.I)
+            if match:
+                details['event_name'] = match.group(1).strip()
+                event_name_found = True
+                break
+        if event_name_found:
+            break
+
+    # If no explicit event name found, look for a suitable header
+    if not event_name_found:
+        for line in lines[:10]:
+            line = line.strip()
+            # Look for lines that might be event names
+            if (len(line) > 10 and 
+                not any(p in line.lower() for p in ['date:', 'time:', 'price:', 'location:', 'menu:', 'contact:']) and
+                not line.startswith('$') and
+                not re.match(r'^\d+', line)):
+                details['event_name'] = line
+                break
+
+    # If still no event name, use filename
+    if not details['event_name']:
+        details['event_name'] = filename.replace('.pdf', '').replace('_', ' ').title()
+
+    # Create searchable variations of the event name
+    details['event_name_variations'] = [
+        details['event_name'],
+        details['event_name'].lower(),
+        re.sub(r'[^\w\s]', '', details['event_name']).lower(),  # Remove punctuation
+        ' '.join(word for word in details['event_name'].split() if len(word) > 2)  # Key words only
+    ]
+
+    # Extract all metadata using patterns
+    for field, pattern_list in patterns.items():
+        for pattern in pattern_list:
+            matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
+            for match in matches:
+                if field == 'price':
+                    details['prices'].append(match.group())
+                elif field == 'setup_notes':
+                    # Capture multiline setup notes
+                    setup_text = match.group(1)
+                    details['setup_notes'] = setup_text.strip()
+                else:
+                    if not details[field]:  # Only capture first match for non-price fields
+                        details[field] = match.group(1).strip()
+
+    # Extract menu items
+    menu_section = False
+    current_section = ""
+    menu_sections = {}
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # Detect menu section headers
+        if re.search(r'menu|breakfast|lunch|dinner|appetizers|entrees|desserts|beverages', line, re.I):
+            menu_section = True
+            current_section = line
+            menu_sections[current_section] = []
+        elif menu_section and not line.startswith(('$', 'Price', 'Total', 'Contact', 'Phone', 'Email')):
+            if current_section in menu_sections:
+                menu_sections[current_section].append(line)
+
+    # Format menu items with sections
+    details['menu_items'] = menu_sections
+
+    # Add pricing details extraction
+    pricing_details = extract_pricing_details(text)
+    details['pricing_breakdown'] = pricing_details
+
+    return details
+
+
+def extract_food_items(text):
+    """Extract individual food items with their descriptions"""
+    food_items = []
+    lines = text.split('\n')
+    current_item = None
+    current_description = []
+    menu_section = None
+
+    # Patterns to identify menu sections and items
+    section_pattern = r'^(?:menu|breakfast|lunch|dinner|appetizers?|entree?s|desserts?|beverages?|hors\s+d\'oeuvres)s?:?\s*$'
+
+    # Pattern to identify likely food item headers (capitalized, no pricing)
+    item_header_pattern = r'^[A-Z][A-Za-z\s&-]+$'
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            # Process any pending item before moving on
+            if current_item and current_description:
+                food_items.append({
+                    'name': current_item,
+                    'description': ' '.join(current_description),
+                    'section': menu_section,
+                    'source_text': f"{current_item}\n{' '.join(current_description)}"
+                })
+                current_item = None
+                current_description = []
+            continue
+
+        # Check for menu section headers
+        if re.match(section_pattern, line, re.I):
+            menu_section = line.strip(':').title()
+            continue
+
+        # Check if this line looks like a food item header
+        if re.match(item_header_pattern, line) and len(line) > 3 and not any(char.isdigit() for char in line):
+            # Process any pending item before starting new one
+            if current_item and current_description:
+                food_items.append({
+                    'name': current_item,
+                    'description': ' '.join(current_description),
+                    'section': menu_section,
+                    'source_text': f"{current_item}\n{' '.join(current_description)}"
+                })
+            current_item = line
+            current_description = []
+        elif current_item:
+            # If we have a current item, this line is part of its description
+            # Ignore lines that look like pricing
+            if not re.match(r'^[\s]*\$?\d+', line) and not re.match(r'^total|^tax|^service', line.lower()):
+                current_description.append(line)
+
+    # Don't forget to add the last item if there is one
+    if current_item and current_description:
+        food_items.append({
+            'name': current_item,
+            'description': ' '.join(current_description),
+            'section': menu_section,
+            'source_text': f"{current_item}\n{' '.join(current_description)}"
+        })
+
+    return food_items
@@ -0,0 +1,147 @@
+"""Cold-start cost of RAGApplication, eager versus lazy.
+
+Ingests a small synthetic corpus (as pipeline_benchmark does), then starts a
+fresh interpreter per run so imports are measured cold. Each run reports the
+time to import rag_application, to construct the application, to have every
+component loaded, and the latency of the first and second menu query. Run
+from the repository root:
+
+    python -m benchmarks.startup_benchmark --docs 50 --runs 3 --output startup.json
+
+Modes:
+
+    eager       RAGApplication() loads everything in the constructor
+    lazy        RAGApplication(lazy=True); the first query loads what it needs
+    background  lazy, then warm_up_in_background() as app.py does after rendering
+
+Embeddings are HashEmbeddings and the LLM is canned, so construction of the
+OpenAI clients themselves is not included.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+MODES = ("eager", "lazy", "background")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MENU_QUERY = "Create a lunch menu for 50 people with vegetarian options"
+
+
+def build_index(docs, seed):
+    """Generate and ingest a corpus in the current directory"""
+    from benchmarks.synthetic_corpus import generate_corpus
+    from document_sources import LocalFolderSource
+    from embedding_cache import HashEmbeddings
+    from pdf_processor import PDFProcessor
+    corpus_dir = os.path.abspath("corpus")
+    generate_corpus(corpus_dir, docs, 4, 5, seed)
+    processor = PDFProcessor(source=LocalFolderSource(corpus_dir), embeddings=HashEmbeddings())
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor.process_all_pdfs(full_rebuild=True)
+
+
+def child(mode):
+    """One cold start, in this fresh interpreter; prints the timings as JSON"""
+    start = time.perf_counter()
+    from rag_application import RAGApplication
+    import_seconds = time.perf_counter() - start
+
+    from embedding_cache import HashEmbeddings
+    from benchmarks.pipeline_benchmark import StubLLM, STUB_ANSWER
+    embeddings, llm = HashEmbeddings(), StubLLM(responses=[STUB_ANSWER])
+
+    start = time.perf_counter()
+    rag_app = RAGApplication(embeddings=embeddings, llm=llm, lazy=mode != "eager")
+    construct_seconds = time.perf_counter() - start
+    result = {"import_seconds": import_seconds, "construct_seconds": construct_seconds}
+
+    if mode == "background":
+        rag_app.warm_up_in_background().join()
+        result["warm_seconds"] = time.perf_counter() - start
+
+    for label in ("first_query_seconds", "second_query_seconds"):
+        rag_app.response_cache.clear()
+        query_start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rag_app.get_response(MENU_QUERY, [])
+        result[label] = time.perf_counter() - query_start
+
+    result["ready_seconds"] = import_seconds + construct_seconds + result["first_query_seconds"]
+    result["component_load_seconds"] = rag_app.load_seconds
+    print(json.dumps(result))
+
+
+def run_child(mode):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup_benchmark", "--child", mode],
+        env=env, check=True, stdout=subprocess.PIPE, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(runs):
+    summary = {}
+    for key in runs[0]:
+        if key == "component_load_seconds":
+            summary[key] = {
+                name: float(np.median([run[key].get(name, 0.0) for run in runs]))
+                for name in runs[0][key]
+            }
+        else:
+            summary[key] = float(np.median([run[key] for run in runs]))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50, help="Synthetic invoices to ingest")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts per mode (the median is reported)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--workdir", help="Keep all generated files in this directory")
+    parser.add_argument("--output", help="Write the JSON results here")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    output = os.path.abspath(args.output) if args.output else None
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="menu_startup_")
+    os.makedirs(workdir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        build_index(args.docs, args.seed)
+        results = {"config": {"docs": args.docs, "runs": args.runs}, "modes": {}}
+        for mode in args.modes:
+            results["modes"][mode] = summarize([run_child(mode) for _ in range(args.runs)])
+            row = results["modes"][mode]
+            print(f"{mode:11} import {row['import_seconds']:.2f}s  construct {row['construct_seconds']:.2f}s  "
+                  f"first query {row['first_query_seconds']:.2f}s  second {row['second_query_seconds']:.2f}s",
+                  file=sys.stderr)
+    finally:
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Synthetic catering invoice PDFs shaped like the real Drive folder.
+
+Each invoice has the usual header (event, date, guests, location, invoice
+number, contact), menu sections of dishes with description lines, and a
+"Pricing" block with per-guest, staff, service fee, tax and grand total
+lines. Generation is seeded, so the same arguments give the same corpus.
+
+    python -m benchmarks.synthetic_corpus OUTPUT_DIR --docs 200 --sections 4 --items 6
+"""
+import argparse
+import os
+import random
+
+ORGANIZATIONS = [
+    "Trial School", "Harbor Credit Union", "Riverside Library", "Maple Street Clinic",
+    "Northside Rotary", "Oak Hill Academy", "Lakeview Partners", "Summit Design Group",
+    "Greenway Foundation", "Bayside Arts Council", "Crescent Law", "Pioneer Robotics"
+]
+OCCASIONS = [
+    "Spring Luncheon", "Board Breakfast", "Annual Dinner", "Staff Appreciation Lunch",
+    "Holiday Party", "Volunteer Reception", "Graduation Dinner", "Quarterly Review Lunch"
+]
+LOCATIONS = [
+    "Library, 2nd floor", "Conference Room B", "Riverside Hall", "Main Gym",
+    "Rooftop Terrace", "Community Room", "Auditorium Lobby"
+]
+SECTIONS = ["Appetizers", "Lunch Menu", "Entrees", "Sides", "Desserts", "Beverages"]
+DISHES = [
+    ("Grilled Lemon Herb Chicken", "marinated chicken breast with lemon and thyme"),
+    ("Caesar Salad", "crisp romaine, shaved parmesan, garlic croutons"),
+    ("Roasted Vegetable Platter", "seasonal vegetables with balsamic glaze"),
+    ("Mini Crab Cakes", "remoulade, micro greens"),
+    ("Caprese Skewers", "fresh mozzarella, basil, cherry tomato"),
+    ("Braised Short Ribs", "red wine reduction, horseradish mashed potatoes"),
+    ("Wild Mushroom Risotto", "arborio rice, parmesan, truffle oil"),
+    ("Tiramisu Cups", "espresso soaked ladyfingers"),
+    ("Fresh Fruit Platter", "melon, berries, pineapple"),
+    ("Bagels and Spreads", "plain and everything bagels, cream cheese, butter, jam"),
+    ("Herb Roasted Salmon", "dill yogurt sauce, charred lemon"),
+    ("Penne Primavera", "garden vegetables, garlic cream sauce"),
+    ("Quinoa Power Bowl", "kale, chickpeas, roasted squash, tahini"),
+    ("Chocolate Chip Cookies", "baked fresh that morning"),
+    ("Iced Tea and Lemonade", "served with lemon wedges"),
+    ("Coffee Service", "regular and decaf, cream and sugar"),
+    ("Turkey Club Wraps", "bacon, avocado, tomato, herb mayo"),
+    ("Beef Sliders", "cheddar, caramelized onions, brioche"),
+    ("Spinach Artichoke Dip", "toasted pita chips"),
+    ("Lemon Bars", "powdered sugar, shortbread crust")
+]
+SERVICES = [("Hot lunch", 30.00), ("Sandwich lunch", 20.00), ("Breakfast", 18.50), ("Dinner", 55.00)]
+STAFF = [("Server", 40.00), ("Attendant", 35.00), ("Bartender", 45.00)]
+TAX_RATE = 8.875
+
+LINES_PER_PAGE = 48
+
+
+def invoice_lines(rng, index, sections, items):
+    """Text lines of one synthetic invoice"""
+    name = f"{rng.choice(ORGANIZATIONS)} {rng.choice(OCCASIONS)} {index}"
+    guests = rng.randint(10, 200)
+    lines = [
+        "Baddabing Catering",
+        f"Event: {name}",
+        f"Date: {rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.choice([23, 24, 25])}",
+        f"Time: {rng.randint(7, 12)}:30 AM - {rng.randint(1, 8)}:00 PM",
+        f"Guests: {guests}",
+        f"Location: {rng.choice(LOCATIONS)}",
+        f"Invoice No: SYN{index:06d}",
+        "Contact: Jordan Smith",
+        f"Email: events{index}@example.org",
+        f"Phone: 555.{rng.randint(100, 999)}.{rng.randint(1000, 9999)}",
+        "",
+        "Setup: Buffet along the north wall",
+        "",
+    ]
+    for section in rng.sample(SECTIONS, min(sections, len(SECTIONS))):
+        lines.append(section)
+        for dish, description in rng.sample(DISHES, min(items, len(DISHES))):
+            lines += [dish, description]
+        lines.append("")
+
+    service, price = rng.choice(SERVICES)
+    role, rate = rng.choice(STAFF)
+    staff = max(1, guests // 25)
+    food = price * guests
+    drinks = 4.00 * guests
+    staffing = rate * staff
+    subtotal = food + drinks + staffing
+    fee = round(subtotal * 0.10, 2)
+    tax = round((subtotal + fee) * TAX_RATE / 100, 2)
+    lines += [
+        "Pricing",
+        f"{service} at ${price:,.2f} per guest x {guests} guests = ${food:,.2f}",
+        f"Drinks at $4.00 per guest x {guests} guests = ${drinks:,.2f}",
+        f"{role} at ${rate:,.2f} x {staff} = ${staffing:,.2f}",
+        f"Service fee = ${fee:,.2f}",
+        f"{TAX_RATE}% tax = ${tax:,.2f}",
+        f"Grand total = ${subtotal + fee + tax:,.2f}",
+    ]
+    return name, lines
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(lines, lines_per_page=LINES_PER_PAGE):
+    """Minimal multi-page PDF with one Helvetica text line per input line"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    font_id = 3 + 2 * len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages))), len(pages)
+        ),
+    ]
+    for i, page_lines in enumerate(pages):
+        content = "BT /F1 10 Tf 14 TL 50 760 Td " + " ".join(
+            f"({_escape(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def generate_corpus(folder, docs=100, sections=4, items=5, seed=0):
+    """Write `docs` invoice PDFs to `folder` and return their event names"""
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    names = []
+    for index in range(docs):
+        name, lines = invoice_lines(rng, index, sections, items)
+        with open(os.path.join(folder, f"invoice_{index:06d}.pdf"), "wb") as f:
+            f.write(make_pdf(lines))
+        names.append(name)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir")
+    parser.add_argument("--docs", type=int, default=100, help="Number of invoices")
+    parser.add_argument("--sections", type=int, default=4, help="Menu sections per invoice")
+    parser.add_argument("--items", type=int, default=5, help="Dishes per menu section")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_corpus(args.output_dir, args.docs, args.sections, args.items, args.seed)
+    print(f"Wrote {args.docs} invoices to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import json
+import mmap
+import os
+from langchain.docstore.base import AddableMixin, Docstore
+from langchain.schema import Document
+
+BLOB_FILE = "documents.blob"
+ENTRIES_FILE = "docstore.json"
+
+# Metadata kept in memory for every document; everything else, including
+# page_content, is only read from the blob file when a document is returned
+INLINE_FIELDS = ("document_type", "event_name", "date")
+
+
+class BlobDocstore(Docstore, AddableMixin):
+    """Docstore whose text and metadata live in an append-only blob file.
+
+    In memory each document is only [offset, length, small fields]. The blob
+    file is memory-mapped on first use and a document is decoded only when a
+    search returns it. Added documents stay in memory until `save`, which
+    appends them to the blob, or rewrites the blob once deleted documents
+    make up more than half of it. Appending never moves existing records, so
+    a process still reading the previous version is unaffected.
+    """
+
+    def __init__(self, folder=None, entries=None, documents=None):
+        self.folder = folder
+        self.entries = entries or {}  # id -> [offset, length, inline fields]
+        self._pending = dict(documents or {})  # id -> Document not yet in the blob
+        self._blob = None
+
+    @classmethod
+    def load(cls, folder):
+        with open(os.path.join(folder, ENTRIES_FILE), "r") as f:
+            return cls(folder, json.load(f)["documents"])
+
+    @staticmethod
+    def exists(folder):
+        return os.path.exists(os.path.join(folder, ENTRIES_FILE))
+
+    def __len__(self):
+        return len(self.entries) + len(self._pending)
+
+    def _mapped(self):
+        if self._blob is None:
+            with open(os.path.join(self.folder, BLOB_FILE), "rb") as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._blob
+
+    def open(self):
+        """Map the blob file now rather than on first use, so the store keeps
+        working if its folder is deleted afterwards"""
+        if self.entries:
+            self._mapped()
+        return self
+
+    def _read(self, doc_id):
+        offset, length, _ = self.entries[doc_id]
+        return self._mapped()[offset:offset + length]
+
+    def add(self, texts):
+        overlapping = set(texts).intersection(self.entries).union(set(texts).intersection(self._pending))
+        if overlapping:
+            raise ValueError(f"Tried to add ids that already exist: {overlapping}")
+        self._pending.update(texts)
+
+    def update(self, documents):
+        """Replace stored documents by id; the new versions are appended on `save`"""
+        missing = set(documents).difference(self.entries).difference(self._pending)
+        if missing:
+            raise ValueError(f"Tried to update ids that do not exist: {missing}")
+        for doc_id, document in documents.items():
+            self.entries.pop(doc_id, None)
+            self._pending[doc_id] = document
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.entries.pop(doc_id, None)
+            self._pending.pop(doc_id, None)
+
+    def search(self, search):
+        if search in self._pending:
+            return self._pending[search]
+        entry = self.entries.get(search)
+        if entry is None:
+            return f"ID {search} not found."
+        record = json.loads(self._read(search))
+        return Document(page_content=record["page_content"], metadata={**entry[2], **record["metadata"]})
+
+    def fields(self, doc_id):
+        """The in-memory metadata of a document, without touching the blob"""
+        if doc_id in self._pending:
+            metadata = self._pending[doc_id].metadata
+            return {key: metadata[key] for key in INLINE_FIELDS if key in metadata}
+        return self.entries[doc_id][2]
+
+    @staticmethod
+    def _encode(document):
+        fields = {key: document.metadata[key] for key in INLINE_FIELDS if key in document.metadata}
+        metadata = {key: value for key, value in document.metadata.items() if key not in fields}
+        data = json.dumps({"page_content": document.page_content, "metadata": metadata}).encode("utf-8")
+        return fields, data
+
+    def save(self, folder):
+        """Write the blob and the entry table to `folder`"""
+        blob_path = os.path.join(folder, BLOB_FILE)
+        same_folder = self.folder is not None and os.path.abspath(folder) == os.path.abspath(self.folder)
+        live_bytes = sum(entry[1] for entry in self.entries.values())
+        blob_bytes = os.path.getsize(blob_path) if same_folder and os.path.exists(blob_path) else 0
+
+        if same_folder and blob_bytes <= 2 * live_bytes:
+            entries = self.entries
+            with open(blob_path, "ab") as f:
+                offset = f.tell()
+                for doc_id, document in self._pending.items():
+                    fields, data = self._encode(document)
+                    f.write(data)
+                    entries[doc_id] = [offset, len(data), fields]
+                    offset += len(data)
+        else:
+            # New folder, or mostly garbage: copy live records into a fresh file
+            entries = {}
+            tmp_path = f"{blob_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                for doc_id, (_, _, fields) in self.entries.items():
+                    data = self._read(doc_id)
+                    entries[doc_id] = [f.tell(), len(data), fields]
+                    f.write(data)
+                for doc_id, document in self._pending.items():
+                    fields, data = self._encode(document)
+                    entries[doc_id] = [f.tell(), len(data), fields]
+                    f.write(data)
+            os.replace(tmp_path, blob_path)
+
+        tmp_path = os.path.join(folder, f"{ENTRIES_FILE}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"documents": entries}, f)
+        os.replace(tmp_path, os.path.join(folder, ENTRIES_FILE))
+
+        self.folder = folder
+        self.entries = entries
+        self._pending = {}
+        self._blob = None
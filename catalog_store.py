@@ -0,0 +1,256 @@
+"""Compact on-disk catalogs of food item records and event summaries.
+
+Each catalog is a JSON Lines file, one compact record per line, written and
+read as a stream, plus a sidecar index (`<name>.idx.json`) mapping menu
+section, source event, source file and date to the byte offsets of the
+matching lines. `CatalogFile.select` answers filters such as "all desserts
+served since 2023" by reading only the lines the index points at.
+
+In memory, records are slotted objects whose repeated strings (sections,
+event names, file ids, dates) are interned, so a catalog of many thousands
+of dishes holds each event name once.
+"""
+import bisect
+import json
+import os
+import sys
+from event_store import parse_event_date
+
+FOOD_ITEMS_FILE = "food_items.jsonl"
+EVENT_SUMMARIES_FILE = "event_summaries.jsonl"
+
+# Written by earlier versions as one indented JSON list; removed on the next write
+LEGACY_FILES = {FOOD_ITEMS_FILE: "food_items_catalog.json", EVENT_SUMMARIES_FILE: "event_summaries.json"}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def index_key(value):
+    """How section and event names are matched: case and surrounding space ignored"""
+    return " ".join(value.lower().split()) if value else ""
+
+
+class FoodItemRecord:
+    """One dish as it appeared on one invoice"""
+
+    __slots__ = ("item_name", "description", "section", "source_event", "event_date",
+                 "served_on", "source_file_id")
+
+    def __init__(self, item_name, description, section, source_event, event_date,
+                 source_file_id, served_on=None):
+        self.item_name = item_name
+        self.description = description
+        self.section = _intern(section)
+        self.source_event = _intern(source_event)
+        self.event_date = _intern(event_date)
+        self.source_file_id = _intern(source_file_id)
+        if served_on is None:
+            parsed = parse_event_date(event_date)
+            served_on = parsed.isoformat() if parsed else None
+        self.served_on = _intern(served_on)  # ISO date, or None if event_date did not parse
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    @classmethod
+    def from_legacy(cls, data):
+        return cls(data['item_name'], data.get('description'), data.get('section'),
+                   data.get('source_event'), data.get('event_date'), data.get('source_file_id'))
+
+    def index_values(self):
+        return {
+            "section": index_key(self.section),
+            "source_event": index_key(self.source_event),
+            "source_file_id": self.source_file_id
+        }
+
+
+class EventSummary:
+    """The headline facts of one event; its dishes are the FoodItemRecords with its file id"""
+
+    __slots__ = ("event_name", "date", "served_on", "guest_count", "prices", "menu_items",
+                 "food_item_count", "source_file_id")
+
+    def __init__(self, event_name, date, guest_count, prices, menu_items, food_item_count,
+                 source_file_id, served_on=None):
+        self.event_name = _intern(event_name)
+        self.date = _intern(date)
+        self.guest_count = guest_count
+        self.prices = prices
+        self.menu_items = menu_items
+        self.food_item_count = food_item_count
+        self.source_file_id = _intern(source_file_id)
+        if served_on is None:
+            parsed = parse_event_date(date)
+            served_on = parsed.isoformat() if parsed else None
+        self.served_on = _intern(served_on)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    @classmethod
+    def from_legacy(cls, data):
+        return cls(data['event_name'], data.get('date'), data.get('guest_count'), data.get('prices'),
+                   data.get('menu_items'), len(data.get('food_items') or []), data.get('source_file_id'))
+
+    def index_values(self):
+        return {
+            "source_event": index_key(self.event_name),
+            "source_file_id": self.source_file_id
+        }
+
+
+class CatalogFile:
+    """A JSON Lines catalog of `record_class` records with a sidecar offset index"""
+
+    def __init__(self, path, record_class):
+        self.path = path
+        self.record_class = record_class
+        self.index_path = f"{os.path.splitext(path)[0]}.idx.json"
+        legacy = LEGACY_FILES.get(os.path.basename(path))
+        self.legacy_path = os.path.join(os.path.dirname(path), legacy) if legacy else None
+        self._index = None
+        self._index_stamp = None
+
+    @classmethod
+    def food_items(cls, path=FOOD_ITEMS_FILE):
+        return cls(path, FoodItemRecord)
+
+    @classmethod
+    def event_summaries(cls, path=EVENT_SUMMARIES_FILE):
+        return cls(path, EventSummary)
+
+    def exists(self):
+        return os.path.exists(self.path) or self._has_legacy()
+
+    def _has_legacy(self):
+        return self.legacy_path is not None and os.path.exists(self.legacy_path)
+
+    def __iter__(self):
+        """Stream every record, one line at a time"""
+        if not os.path.exists(self.path):
+            if self._has_legacy():
+                with open(self.legacy_path, 'r') as f:
+                    yield from (self.record_class.from_legacy(data) for data in json.load(f))
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield self.record_class.from_dict(json.loads(line))
+
+    def write(self, records):
+        """Stream `records` (any iterable, e.g. one reading this same file) to disk.
+
+        Data and index are each written to a temporary file and swapped in.
+        The index records the size of the data it describes, so a reader that
+        catches the two out of step indexes the data itself instead.
+        """
+        index = self._new_index()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for record in records:
+                offset = f.tell()
+                f.write(json.dumps(record.to_dict(), separators=(',', ':')).encode('utf-8') + b"\n")
+                self._add_to_index(index, record, offset)
+            index["size"] = f.tell()
+        index["dates"].sort()
+        with open(f"{self.index_path}.tmp", 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+        self._index = None
+        if self._has_legacy():
+            os.remove(self.legacy_path)
+        return index["count"]
+
+    @staticmethod
+    def _new_index():
+        return {"count": 0, "size": 0, "fields": {}, "dates": []}
+
+    @staticmethod
+    def _add_to_index(index, record, offset):
+        for field, value in record.index_values().items():
+            if value:
+                index["fields"].setdefault(field, {}).setdefault(value, []).append(offset)
+        if record.served_on:
+            index["dates"].append([record.served_on, offset])
+        index["count"] += 1
+
+    def _scan(self):
+        """Index the data file by reading it through"""
+        index = self._new_index()
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    self._add_to_index(index, self.record_class.from_dict(json.loads(line)), offset)
+                offset += len(line)
+            index["size"] = offset
+        index["dates"].sort()
+        return index
+
+    def index(self):
+        """The offset index, reloaded when the catalog file changes"""
+        if not os.path.exists(self.path):
+            self.write(list(self))  # converts a legacy JSON list
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if self._index is None or self._index_stamp != stamp:
+            index = None
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r') as f:
+                    index = json.load(f)
+            if index is None or index.get("size") != stat.st_size:
+                index = self._scan()
+            self._index = index
+            self._index_stamp = stamp
+        return self._index
+
+    def values(self, field):
+        """Distinct indexed values of `field` with their record counts"""
+        if not self.exists():
+            return {}
+        return {value: len(offsets) for value, offsets in self.index()["fields"].get(field, {}).items()}
+
+    def select(self, section=None, source_event=None, source_file_id=None, since=None, until=None):
+        """Yield the records matching every given filter, reading only those lines.
+
+        `section` and `source_event` match case-insensitively; `since` and
+        `until` are inclusive dates (datetime.date or ISO strings) and
+        exclude records whose date could not be parsed.
+        """
+        if not self.exists():
+            return
+        index = self.index()
+        selected = None
+        for field, value in (("section", section), ("source_event", source_event),
+                             ("source_file_id", source_file_id)):
+            if value is None:
+                continue
+            key = value if field == "source_file_id" else index_key(value)
+            offsets = set(index["fields"].get(field, {}).get(key, ()))
+            selected = offsets if selected is None else selected & offsets
+        if since is not None or until is not None:
+            dates = index["dates"]
+            start = bisect.bisect_left(dates, [str(since)]) if since is not None else 0
+            # An infinite offset sorts after every entry dated `until`
+            end = bisect.bisect_right(dates, [str(until), float("inf")]) if until is not None else len(dates)
+            offsets = {offset for _, offset in dates[start:end]}
+            selected = offsets if selected is None else selected & offsets
+        if selected is None:
+            yield from self
+            return
+        with open(self.path, 'rb') as f:
+            for offset in sorted(selected):
+                f.seek(offset)
+                yield self.record_class.from_dict(json.loads(f.readline()))
@@ -0,0 +1,128 @@
+"""Per-session conversation memory with a hard token budget.
+
+The last few turns are kept verbatim. Older turns are folded, one at a
+time as they fall out of that window, into a rolling summary: the previous
+summary plus the evicted turn go to the summarizer, never the whole
+conversation. `as_chat_history` is what is passed to
+RAGApplication.get_response, and it never exceeds `max_tokens`.
+"""
+from embedding_scheduler import load_encoding, count_tokens
+
+# Marks the summary as the first (question, answer) pair of a chat history
+SUMMARY_MARKER = "(Summary of the earlier conversation)"
+
+
+def truncate_tokens(text, max_tokens, encoding):
+    """`text` cut to at most `max_tokens` tokens"""
+    if count_tokens(text, encoding) <= max_tokens:
+        return text
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max(max_tokens - 1, 0)]) + "…"
+    return text[:max(max_tokens - 1, 0) * 4] + "…"
+
+
+def history_tokens(chat_history, encoding):
+    return sum(count_tokens(question, encoding) + count_tokens(answer, encoding)
+               for question, answer in chat_history)
+
+
+def trim_history(chat_history, max_tokens, encoding):
+    """The most recent (question, answer) pairs that fit in `max_tokens`.
+
+    A leading summary pair is kept as long as anything is; a single turn
+    that is too long on its own is truncated.
+    """
+    chat_history = [tuple(turn) for turn in chat_history]
+    summary = []
+    if chat_history and chat_history[0][0] == SUMMARY_MARKER:
+        summary, chat_history = chat_history[:1], chat_history[1:]
+    while chat_history and history_tokens(summary + chat_history, encoding) > max_tokens:
+        if len(chat_history) == 1:
+            question, answer = chat_history[0]
+            budget = max(max_tokens - history_tokens(summary, encoding), 0)
+            question = truncate_tokens(question, budget // 2, encoding)
+            chat_history = [(question, truncate_tokens(answer, budget - count_tokens(question, encoding), encoding))]
+            break
+        chat_history = chat_history[1:]
+    return summary + chat_history
+
+
+def extractive_summary(summary, turns, max_tokens, encoding):
+    """Summarizer used without an LLM: each turn's question and the start of its answer"""
+    lines = [summary] if summary else []
+    for question, answer in turns:
+        first_line = next((line.strip() for line in answer.splitlines() if line.strip()), "")
+        lines.append(f"Asked: {question.strip()} Answered: {first_line}")
+    # Keep the newest lines when over budget
+    text = "\n".join(lines)
+    while count_tokens(text, encoding) > max_tokens and len(lines) > 1:
+        lines.pop(0)
+        text = "\n".join(lines)
+    return truncate_tokens(text, max_tokens, encoding)
+
+
+class ConversationMemory:
+    """Recent turns verbatim plus an incrementally updated summary of older ones.
+
+    `max_tokens` bounds the whole history; the summary may use up to
+    `summary_tokens` of it. A turn is folded into the summary when there are
+    more than `recent_turns` turns or the history is over budget.
+    """
+
+    def __init__(self, max_tokens=1500, recent_turns=3, summary_tokens=400):
+        self.max_tokens = max_tokens
+        self.recent_turns = recent_turns
+        self.summary_tokens = min(summary_tokens, max_tokens // 2)
+        self.turns = []  # (question, answer), oldest first
+        self.summary = ""
+        self.summarized_turns = 0
+        self._encoding = None
+        self._encoding_loaded = False
+
+    def __len__(self):
+        return self.summarized_turns + len(self.turns)
+
+    @property
+    def encoding(self):
+        if not self._encoding_loaded:
+            self._encoding = load_encoding()
+            self._encoding_loaded = True
+        return self._encoding
+
+    def tokens(self):
+        return history_tokens(self.as_chat_history(), self.encoding)
+
+    def add_turn(self, question, answer, summarize=None):
+        """Record a turn, folding the oldest ones into the summary as needed.
+
+        `summarize(summary, turns, max_tokens)` returns the updated summary
+        (e.g. RAGApplication.summarize_history); without it the summary is
+        extractive.
+        """
+        self.turns.append((question, answer))
+        while len(self.turns) > 1 and (
+            len(self.turns) > self.recent_turns
+            or history_tokens(self._with_summary(self.turns), self.encoding) > self.max_tokens
+        ):
+            self._fold(self.turns.pop(0), summarize)
+
+    def _fold(self, turn, summarize):
+        if summarize is not None:
+            summary = summarize(self.summary, [turn], self.summary_tokens)
+        else:
+            summary = extractive_summary(self.summary, [turn], self.summary_tokens, self.encoding)
+        # The summarizer is asked to stay within budget; make sure it did
+        self.summary = truncate_tokens(summary.strip(), self.summary_tokens, self.encoding)
+        self.summarized_turns += 1
+
+    def _with_summary(self, turns):
+        return ([(SUMMARY_MARKER, self.summary)] if self.summary else []) + list(turns)
+
+    def as_chat_history(self):
+        """(question, answer) pairs for get_response: the summary first, then recent turns"""
+        return trim_history(self._with_summary(self.turns), self.max_tokens, self.encoding)
+
+    def clear(self):
+        self.turns = []
+        self.summary = ""
+        self.summarized_turns = 0
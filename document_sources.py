@@ -0,0 +1,115 @@
+"""Where ingestion gets its PDFs from.
+
+A source lists file records and downloads their bytes. Records carry the
+fields IngestManifest fingerprints ('id', 'title', 'md5Checksum',
+'modifiedDate'), so Drive files and local files are interchangeable.
+`iter_files` yields records as they are listed, so ingestion can start on
+the first ones while the rest are still coming in; `list_files` collects
+them all. CachedTextSource replays the files already ingested from the
+extracted-text cache instead of fetching anything.
+"""
+import datetime
+import hashlib
+import os
+from config import DRIVE_FOLDER_ID
+from ingest_manifest import IngestManifest
+
+# Only what ingestion reads; the full Drive file resource is ~40 fields
+DRIVE_LIST_FIELDS = "nextPageToken, items(id, title, md5Checksum, modifiedDate, fileSize)"
+
+
+class DriveSource:
+    """PDFs in a Google Drive folder"""
+
+    def __init__(self, drive, folder_id=DRIVE_FOLDER_ID, page_size=100):
+        self.drive = drive
+        self.folder_id = folder_id
+        self.page_size = page_size
+        self.location = f"folder ID: {folder_id}"
+
+    def iter_files(self):
+        """Yield files one page of `page_size` at a time, fetching pages lazily"""
+        query = f"'{self.folder_id}' in parents and mimeType='application/pdf'"
+        listing = self.drive.ListFile({
+            'q': query,
+            'maxResults': self.page_size,
+            'fields': DRIVE_LIST_FIELDS
+        })
+        for page in listing:
+            yield from page
+
+    def list_files(self):
+        return list(self.iter_files())
+
+    def download(self, file):
+        """Download a Drive file straight into memory"""
+        return b"".join(file.GetContentIOBuffer())
+
+
+class LocalFolderSource:
+    """PDFs in a local folder, e.g. a synthetic benchmark corpus"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.location = f"folder: {folder}"
+
+    def iter_files(self):
+        """Yield files in name order, checksumming each only when it is reached"""
+        for name in sorted(os.listdir(self.folder)):
+            path = os.path.join(self.folder, name)
+            if not name.lower().endswith(".pdf") or not os.path.isfile(path):
+                continue
+            with open(path, "rb") as f:
+                checksum = hashlib.md5(f.read()).hexdigest()
+            modified = datetime.datetime.fromtimestamp(os.path.getmtime(path), datetime.timezone.utc)
+            yield {
+                'id': name,
+                'title': name,
+                'md5Checksum': checksum,
+                'modifiedDate': modified.isoformat(),
+                'path': path
+            }
+
+    def list_files(self):
+        return list(self.iter_files())
+
+    def download(self, file):
+        with open(file['path'], "rb") as f:
+            return f.read()
+
+
+class CachedTextSource:
+    """The files in the ingest manifest, read back from a TextCache.
+
+    Used to re-run extraction over everything already ingested without
+    touching Drive: every file's page text comes from the cache, so nothing
+    is downloaded or parsed with PyPDF2.
+    """
+
+    def __init__(self, text_cache, manifest_path=None):
+        self.text_cache = text_cache
+        self.manifest = IngestManifest(manifest_path) if manifest_path else IngestManifest()
+        self.location = f"text cache: {text_cache.path}"
+
+    def iter_files(self):
+        files = [
+            {'id': file_id, 'title': entry['title'],
+             'md5Checksum': entry.get('md5Checksum'), 'modifiedDate': entry.get('modifiedDate')}
+            for file_id, entry in self.manifest.files.items()
+        ]
+        if not files:
+            raise Exception("Nothing has been ingested yet, so there is no text to re-extract")
+        # Check up front so a partial cache fails before anything is rebuilt
+        missing = [f['title'] for f in files if not self.text_cache.contains(f)]
+        if missing:
+            raise Exception(
+                f"No cached text for {len(missing)} of {len(files)} ingested files "
+                f"(e.g. {missing[0]}); run one ingestion with --full-rebuild to fill the cache"
+            )
+        yield from files
+
+    def list_files(self):
+        return list(self.iter_files())
+
+    def download(self, file):
+        raise Exception(f"{file['title']} is not in the text cache")
@@ -0,0 +1,262 @@
+from array import array
+import asyncio
+from concurrent.futures import Future
+import hashlib
+import math
+import queue
+import re
+import sqlite3
+import threading
+import time
+from langchain.embeddings.base import Embeddings
+from langchain.embeddings import OpenAIEmbeddings
+from config import OPENAI_API_KEY
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_CACHE_FILE = "embedding_cache.sqlite"
+EMBEDDING_CACHE_MAX_ENTRIES = 200000
+
+
+class CachedEmbeddings(Embeddings):
+    """On-disk, content-addressed cache in front of another embeddings object.
+
+    Vectors are stored in SQLite keyed by sha256(model name + exact text), so
+    ingestion and the app share hits across runs and processes. The least
+    recently used entries are evicted once the cache exceeds `max_entries`.
+    """
+
+    def __init__(self, embeddings, model_name, path=EMBEDDING_CACHE_FILE,
+                 max_entries=EMBEDDING_CACHE_MAX_ENTRIES):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def _lookup(self, keys):
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), 500):
+            chunk = unique_keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                vector = array('f')
+                vector.frombytes(blob)
+                found[key] = vector.tolist()
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found]
+            )
+        return found
+
+    def _store(self, vectors):
+        now = time.time()
+        # Keys are content hashes, so a row already there (say, written by
+        # another process meanwhile) holds the same vector; only new rows are
+        # counted, from the change counter, and existing ones just marked used
+        changes = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+            [(key, array('f', vector).tobytes(), now) for key, vector in vectors.items()]
+        )
+        added = self._conn.total_changes - changes
+        if added < len(vectors):
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, key) for key in vectors]
+            )
+        self._size += added
+        if self._size > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (self._size - self.max_entries,)
+            )
+            self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _split(self, keys, texts):
+        """Cached vectors by key, and the texts still to embed by key"""
+        with self._lock:
+            found = self._lookup(keys)
+            self._conn.commit()
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in found:
+                    missing.setdefault(key, text)
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += len(missing)
+        return found, missing
+
+    def _remember(self, computed):
+        with self._lock:
+            self._store(computed)
+            self._conn.commit()
+
+    def embed_documents(self, texts):
+        keys = [self._key(text) for text in texts]
+        found, missing = self._split(keys, texts)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._remember(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text):
+        key = self._key(text)
+        found, missing = self._split([key], [text])
+        if missing:
+            found[key] = self.embeddings.embed_query(text)
+            self._remember({key: found[key]})
+        return found[key]
+
+    # The async versions do their SQLite work in a thread so the event loop
+    # never waits on the database (or on another writer's lock)
+    async def aembed_documents(self, texts):
+        keys = [self._key(text) for text in texts]
+        found, missing = await asyncio.to_thread(self._split, keys, texts)
+        if missing:
+            vectors = await self.embeddings.aembed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            await asyncio.to_thread(self._remember, computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text):
+        key = self._key(text)
+        found, missing = await asyncio.to_thread(self._split, [key], [text])
+        if missing:
+            found[key] = await self.embeddings.aembed_query(text)
+            await asyncio.to_thread(self._remember, {key: found[key]})
+        return found[key]
+
+    def stats(self):
+        """Hit/miss counters for this process plus the current cache size"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self._size
+        }
+
+
+class BatchingEmbeddings(Embeddings):
+    """Coalesces concurrent embed_query calls into one embed_documents call.
+
+    Each caller blocks while a background thread gathers queries for up to
+    `max_wait` seconds (or `max_batch_size` queries) and embeds them together,
+    so many simultaneous requests cost one embedding round trip.
+    """
+
+    def __init__(self, embeddings, max_batch_size=32, max_wait=0.005):
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.queries = 0
+        self._pending = queue.Queue()
+        threading.Thread(target=self._run, name="embedding-batcher", daemon=True).start()
+
+    def embed_documents(self, texts):
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        future = Future()
+        self._pending.put((text, future))
+        return future.result()
+
+    def _next_batch(self):
+        batch = [self._pending.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = dict(zip(texts, self.embeddings.embed_documents(texts)))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.queries += len(batch)
+            for text, future in batch:
+                future.set_result(vectors[text])
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "mean_batch_size": self.queries / self.batches if self.batches else 0.0
+        }
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic offline stand-in for the OpenAI embeddings.
+
+    Uses the hashing trick over lowercase word tokens, so identical texts get
+    identical vectors and texts sharing words are close in cosine distance.
+    """
+
+    def __init__(self, size=256):
+        self.size = size
+
+    def _embed(self, text):
+        vector = [0.0] * self.size
+        for token in re.findall(r'\w+', text.lower()):
+            digest = hashlib.md5(token.encode('utf-8')).digest()
+            index = int.from_bytes(digest[:4], 'little') % self.size
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def make_embeddings(cache_path=EMBEDDING_CACHE_FILE):
+    """Build the cached OpenAI embeddings used by both ingestion and the app"""
+    return CachedEmbeddings(
+        OpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            openai_api_key=OPENAI_API_KEY
+        ),
+        EMBEDDING_MODEL,
+        path=cache_path
+    )
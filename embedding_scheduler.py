@@ -0,0 +1,176 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import os
+import random
+import shutil
+import time
+import numpy as np
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+CHECKPOINT_DIR = "embedding_checkpoints"
+
+# Client errors worth retrying, by class name so that no particular client
+# library (openai 0.x/1.x, httpx, requests) has to be imported
+TRANSIENT_ERROR_NAMES = {
+    "RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError",
+    "ServiceUnavailableError", "Timeout", "TimeoutException", "ConnectTimeout", "ReadTimeout",
+    "ConnectError", "RemoteProtocolError",
+}
+
+
+def load_encoding():
+    """cl100k_base tokenizer, or None if tiktoken or its BPE file is unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def is_transient(error):
+    """Rate limits, timeouts, connection failures and 5xx responses; anything else will fail again"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "http_status", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 429) or status >= 500
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def count_tokens(text, encoding):
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # Rough fallback when tiktoken is not installed
+    return len(text) // 4 + 1
+
+
+class EmbeddingScheduler:
+    """Embeds documents in token-sized batches with retries and checkpoints.
+
+    Texts are packed in order into batches of at most `max_batch_tokens`
+    tokens (and `max_batch_docs` texts), `concurrency` batches are in flight
+    at a time, batches failing with a transient error (`is_transient`) are
+    retried with exponential backoff and full jitter, and every finished batch is checkpointed to disk so a crashed
+    build resumes from where it stopped.
+    """
+
+    def __init__(self, embeddings, max_batch_tokens=100000, max_batch_docs=500,
+                 concurrency=4, max_retries=6, base_delay=1.0, max_delay=60.0,
+                 checkpoint_dir=CHECKPOINT_DIR):
+        self.embeddings = embeddings
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_docs = max_batch_docs
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.checkpoint_dir = checkpoint_dir
+        self._encoding = load_encoding()
+
+    def count_tokens(self, text):
+        return count_tokens(text, self._encoding)
+
+    def make_batches(self, texts):
+        """Pack text indexes into batches bounded by token and document count"""
+        batches = []
+        current, current_tokens = [], 0
+        for i, text in enumerate(texts):
+            tokens = self.count_tokens(text)
+            if current and (current_tokens + tokens > self.max_batch_tokens
+                            or len(current) >= self.max_batch_docs):
+                batches.append((current, current_tokens))
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append((current, current_tokens))
+        return batches
+
+    def _checkpoint_path(self, batch_texts):
+        digest = hashlib.sha256()
+        for text in batch_texts:
+            digest.update(hashlib.sha256(text.encode('utf-8')).digest())
+        return os.path.join(self.checkpoint_dir, f"{digest.hexdigest()}.npy")
+
+    def _load_checkpoint(self, path):
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path).tolist()
+        except Exception as e:
+            print(f"Ignoring unreadable checkpoint {path}: {str(e)}")
+            return None
+
+    def _save_checkpoint(self, path, vectors):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.asarray(vectors, dtype=np.float32))
+        os.replace(tmp_path, path)
+
+    def _embed_with_retry(self, batch_texts):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.embeddings.embed_documents(batch_texts)
+            except Exception as e:
+                if attempt == self.max_retries or not is_transient(e):
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                print(f"Embedding batch failed ({str(e)}), retrying in {delay:.1f}s "
+                      f"[{attempt + 1}/{self.max_retries}]")
+                time.sleep(delay)
+
+    def embed(self, texts):
+        """Return one vector per text, in input order"""
+        texts = list(texts)
+        vectors = [None] * len(texts)
+        if not texts:
+            return vectors
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        batches = self.make_batches(texts)
+        total_tokens = sum(tokens for _, tokens in batches)
+        start = time.time()
+
+        pending = []
+        resumed = 0
+        for indexes, tokens in batches:
+            batch_texts = [texts[i] for i in indexes]
+            path = self._checkpoint_path(batch_texts)
+            cached = self._load_checkpoint(path)
+            if cached is not None and len(cached) == len(indexes):
+                for i, vector in zip(indexes, cached):
+                    vectors[i] = vector
+                resumed += 1
+            else:
+                pending.append((indexes, batch_texts, path))
+        print(f"Embedding {len(texts)} documents (~{total_tokens} tokens) in {len(batches)} batches"
+              + (f", {resumed} resumed from checkpoints" if resumed else ""))
+
+        def run(batch):
+            indexes, batch_texts, path = batch
+            batch_vectors = self._embed_with_retry(batch_texts)
+            self._save_checkpoint(path, batch_vectors)
+            return indexes, batch_vectors
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(run, batch) for batch in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                indexes, batch_vectors = future.result()
+                for i, vector in zip(indexes, batch_vectors):
+                    vectors[i] = vector
+                print(f"Embedded batch {done}/{len(pending)}")
+
+        elapsed = max(time.time() - start, 1e-9)
+        print(f"Embedded {len(texts)} documents in {elapsed:.1f}s "
+              f"({len(texts) / elapsed:.1f} docs/sec, {total_tokens / elapsed:.0f} tokens/sec)")
+        return vectors
+
+    def clear_checkpoints(self):
+        """Drop checkpoints once the index they fed has been saved"""
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
@@ -0,0 +1,320 @@
+import datetime
+import json
+import os
+import re
+import sqlite3
+from functools import lru_cache
+
+EVENT_STORE_FILE = "event_store.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    source_file_id TEXT NOT NULL,
+    event_name TEXT NOT NULL,
+    date TEXT,
+    time TEXT,
+    guest_count TEXT,
+    location TEXT,
+    setup_notes TEXT,
+    invoice_no TEXT,
+    contact TEXT,
+    email TEXT,
+    phone TEXT,
+    subtotal REAL,
+    service_fee REAL,
+    delivery_setup REAL,
+    tax REAL,
+    tax_rate REAL,
+    grand_total REAL
+);
+CREATE INDEX IF NOT EXISTS events_source_file ON events (source_file_id);
+CREATE INDEX IF NOT EXISTS events_invoice ON events (invoice_no COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS event_names (
+    event_id INTEGER NOT NULL REFERENCES events (id) ON DELETE CASCADE,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS event_names_name ON event_names (name);
+CREATE TABLE IF NOT EXISTS pricing_items (
+    event_id INTEGER NOT NULL REFERENCES events (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    item TEXT,
+    unit_price REAL,
+    quantity INTEGER,
+    amount REAL,
+    line_item TEXT
+);
+CREATE INDEX IF NOT EXISTS pricing_items_event ON pricing_items (event_id);
+CREATE TABLE IF NOT EXISTS menu_sections (
+    event_id INTEGER NOT NULL REFERENCES events (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    section TEXT NOT NULL,
+    items TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS menu_sections_event ON menu_sections (event_id);
+"""
+
+INVOICE_PATTERN = re.compile(r'(?:invoice\s*(?:no|number|#)?:?|#)\s*([A-Z0-9]+)', re.I)
+# Unlabelled tokens shaped like our invoice numbers (e.g. HCU1187), so guest
+# counts and years are never taken for one
+INVOICE_TOKEN_PATTERN = re.compile(r'\b([A-Z]{2,}\d{3,})\b', re.I)
+
+# Shortest name variation we trust to identify an event on its own
+MIN_NAME_LENGTH = 8
+
+DATE_FORMATS = ("%m/%d/%y", "%m/%d/%Y", "%Y-%m-%d", "%B %d, %Y", "%b %d, %Y",
+                "%A, %B %d, %Y", "%a, %b %d, %Y", "%B %d %Y")
+
+
+def normalize_name(text):
+    """Lowercase, drop punctuation and collapse whitespace for name matching"""
+    return ' '.join(re.sub(r'[^\w\s]', '', text.lower()).split())
+
+
+@lru_cache(maxsize=4096)
+def parse_event_date(text):
+    """Best-effort parse of an invoice date, or None (memoized: dates repeat across dishes)"""
+    if not text:
+        return None
+    text = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", text.strip())
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class EventStore:
+    """Indexed SQLite store of events, their pricing line items and menu sections.
+
+    Lets event lookups that name a single event (by a name variation or an
+    invoice number) be answered from structured data without the vector
+    search and LLM round trip. An FTS5 table, when SQLite provides one,
+    supports keyword search over event names and menus.
+    """
+
+    def __init__(self, path=EVENT_STORE_FILE):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            try:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts "
+                    "USING fts5(event_name, menu_text)"
+                )
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                self.has_fts = False
+        self._names = None
+        self._invoices = None
+        self._loaded_mtime = None
+
+    @staticmethod
+    def exists(path=EVENT_STORE_FILE):
+        return os.path.exists(path)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _delete(self, conn, file_ids):
+        for file_id in file_ids:
+            rows = conn.execute("SELECT id FROM events WHERE source_file_id = ?", (file_id,)).fetchall()
+            for row in rows:
+                if self.has_fts:
+                    conn.execute("DELETE FROM events_fts WHERE rowid = ?", (row['id'],))
+                conn.execute("DELETE FROM events WHERE id = ?", (row['id'],))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM events")
+            if self.has_fts:
+                conn.execute("DELETE FROM events_fts")
+        self._names = self._invoices = None
+
+    def delete_files(self, file_ids):
+        with self._connect() as conn:
+            self._delete(conn, file_ids)
+        self._names = self._invoices = None
+
+    def replace_file(self, file_id, event_details):
+        """Store the parsed details of one PDF, replacing what it produced before"""
+        summary = event_details['pricing_breakdown']['summary']
+        with self._connect() as conn:
+            self._delete(conn, [file_id])
+            cursor = conn.execute(
+                """INSERT INTO events (source_file_id, event_name, date, time, guest_count,
+                   location, setup_notes, invoice_no, contact, email, phone, subtotal,
+                   service_fee, delivery_setup, tax, tax_rate, grand_total)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (file_id, event_details['event_name'], event_details['date'],
+                 event_details['time'], event_details['guest_count'], event_details['location'],
+                 event_details['setup_notes'], event_details['invoice_no'],
+                 event_details['contact'], event_details['email'], event_details['phone'],
+                 summary['subtotal'], summary['service_fee'], summary['delivery_setup'],
+                 summary['tax'], summary['tax_rate'], summary['grand_total'])
+            )
+            event_id = cursor.lastrowid
+
+            names = {normalize_name(v) for v in event_details['event_name_variations']}
+            conn.executemany(
+                "INSERT INTO event_names (event_id, name) VALUES (?, ?)",
+                [(event_id, name) for name in names if name]
+            )
+
+            pricing = event_details['pricing_breakdown']
+            rows = []
+            for charge in pricing['per_person_charges']:
+                rows.append((event_id, 'per_person', charge['item'], charge['price_per_person'],
+                             charge['guest_count'], charge['total'], charge['line_item']))
+            for charge in pricing['staff_charges']:
+                rows.append((event_id, 'staff', charge['role'], charge['rate'],
+                             charge['count'], charge['total'], charge['line_item']))
+            for charge in pricing['flat_charges']:
+                rows.append((event_id, 'flat', charge['item'], None, None,
+                             charge['amount'], charge['line_item']))
+            for charge in pricing['additional_charges']:
+                rows.append((event_id, 'tbd', charge['item'], None, None, None, charge['line_item']))
+            conn.executemany(
+                """INSERT INTO pricing_items (event_id, kind, item, unit_price, quantity, amount, line_item)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+
+            conn.executemany(
+                "INSERT INTO menu_sections (event_id, position, section, items) VALUES (?, ?, ?, ?)",
+                [(event_id, position, section, json.dumps(items))
+                 for position, (section, items) in enumerate(event_details['menu_items'].items())]
+            )
+
+            if self.has_fts:
+                menu_text = '\n'.join(
+                    f"{section}\n" + '\n'.join(items)
+                    for section, items in event_details['menu_items'].items()
+                )
+                conn.execute(
+                    "INSERT INTO events_fts (rowid, event_name, menu_text) VALUES (?, ?, ?)",
+                    (event_id, event_details['event_name'], menu_text)
+                )
+        self._names = self._invoices = None
+        return event_id
+
+    def _load_lookups(self):
+        # Ingestion runs in another process, so reload when the file changes
+        mtime = self.version()
+        if self._names is not None and mtime == self._loaded_mtime:
+            return
+        names, invoices = {}, {}
+        with self._connect() as conn:
+            for row in conn.execute("SELECT event_id, name FROM event_names"):
+                if len(row['name']) >= MIN_NAME_LENGTH:
+                    names.setdefault(row['name'], set()).add(row['event_id'])
+            for row in conn.execute("SELECT id, invoice_no FROM events WHERE invoice_no IS NOT NULL"):
+                invoices.setdefault(row['invoice_no'].lower(), set()).add(row['id'])
+        self._names, self._invoices = names, invoices
+        self._loaded_mtime = mtime
+
+    def resolve(self, query):
+        """Return the id of the single event a query refers to, or None"""
+        self._load_lookups()
+
+        # Invoice numbers, either labelled or as an invoice-shaped token
+        candidates = [m.group(1) for m in INVOICE_PATTERN.finditer(query)]
+        candidates += INVOICE_TOKEN_PATTERN.findall(query)
+        for candidate in candidates:
+            event_ids = self._invoices.get(candidate.lower())
+            if event_ids and len(event_ids) == 1:
+                return next(iter(event_ids))
+
+        # The longest event-name variation contained in the query
+        normalized = f" {normalize_name(query)} "
+        best_name, best_ids = None, None
+        for name, event_ids in self._names.items():
+            if f" {name} " in normalized and (best_name is None or len(name) > len(best_name)):
+                best_name, best_ids = name, event_ids
+        if best_ids and len(best_ids) == 1:
+            return next(iter(best_ids))
+        return None
+
+    def get_event(self, event_id):
+        """Full structured record of an event"""
+        with self._connect() as conn:
+            event = conn.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
+            if event is None:
+                return None
+            record = dict(event)
+            record['pricing_items'] = [
+                dict(row) for row in conn.execute(
+                    "SELECT kind, item, unit_price, quantity, amount, line_item "
+                    "FROM pricing_items WHERE event_id = ? ORDER BY rowid", (event_id,)
+                )
+            ]
+            record['menu_sections'] = [
+                (row['section'], json.loads(row['items'])) for row in conn.execute(
+                    "SELECT section, items FROM menu_sections WHERE event_id = ? ORDER BY position",
+                    (event_id,)
+                )
+            ]
+        return record
+
+    def all_events(self):
+        """Every stored event as returned by get_event"""
+        with self._connect() as conn:
+            event_ids = [row['id'] for row in conn.execute("SELECT id FROM events ORDER BY id")]
+        return [self.get_event(event_id) for event_id in event_ids]
+
+    def version(self):
+        """Changes whenever ingestion rewrites the store"""
+        return os.stat(self.path).st_mtime_ns
+
+    def search(self, text, limit=10):
+        """Keyword search over event names and menus (FTS5 when available)"""
+        with self._connect() as conn:
+            if self.has_fts:
+                terms = ' '.join(f'"{token}"' for token in re.findall(r'\w+', text))
+                if not terms:
+                    return []
+                rows = conn.execute(
+                    "SELECT rowid AS id FROM events_fts WHERE events_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (terms, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT id FROM events WHERE event_name LIKE ? LIMIT ?", (f"%{text}%", limit)
+                ).fetchall()
+        return [row['id'] for row in rows]
+
+    @staticmethod
+    def format_event(event):
+        """Render a structured event record as a markdown answer"""
+        lines = [f"**{event['event_name']}**", ""]
+        for label, key in (("Date", "date"), ("Time", "time"), ("Guest Count", "guest_count"),
+                           ("Location", "location"), ("Invoice", "invoice_no"), ("Contact", "contact"),
+                           ("Email", "email"), ("Phone", "phone")):
+            lines.append(f"- {label}: {event[key] or 'Not specified'}")
+
+        if event['menu_sections']:
+            lines += ["", "**Menu**"]
+            for section, items in event['menu_sections']:
+                lines.append(f"\n*{section}*")
+                lines += [f"- {item}" for item in items]
+
+        if event['pricing_items']:
+            lines += ["", "**Pricing Breakdown**"]
+            lines += [f"- {row['line_item']}" for row in event['pricing_items']]
+
+        summary = [("Subtotal", event['subtotal']), ("Service Fee", event['service_fee']),
+                   ("Delivery & Setup", event['delivery_setup'])]
+        if event['tax']:
+            summary.append((f"Tax ({event['tax_rate']}%)", event['tax']))
+        summary.append(("Grand Total", event['grand_total']))
+        summary = [(label, value) for label, value in summary if value]
+        if summary:
+            lines += ["", "**Summary**"]
+            lines += [f"- {label}: ${value:,.2f}" for label, value in summary]
+
+        lines += ["", "**Setup Notes**", event['setup_notes'] or "No setup notes provided"]
+        return "\n".join(lines)
@@ -0,0 +1,179 @@
+"""Canonical food items, merged across events.
+
+Ingestion records every dish of every invoice in the food items catalog
+(catalog_store.FoodItemRecord).
+FoodCatalog folds those records into one canonical item per dish: records
+whose normalized names match (or nearly match) and whose descriptions share
+most of their words are the same dish. Each canonical item keeps how many
+events served it, which ones, and when it was last served, and is embedded
+once as a `food_item` document.
+"""
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+from langchain.schema import Document
+
+CANONICAL_CATALOG_FILE = "canonical_food_catalog.json"
+
+NAME_SIMILARITY = 0.9
+DESCRIPTION_SIMILARITY = 0.5
+
+DESCRIPTION_STOPWORDS = {"and", "with", "the", "served", "our", "fresh", "for"}
+
+
+def normalize_item_name(name):
+    """Lowercase words with '&' spelled out and simple plurals dropped"""
+    words = re.findall(r"[a-z0-9]+", (name or "").lower().replace("&", " and "))
+    return " ".join(
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in words
+    )
+
+
+def names_similar(first, second):
+    matcher = SequenceMatcher(None, first, second)
+    return matcher.quick_ratio() >= NAME_SIMILARITY and matcher.ratio() >= NAME_SIMILARITY
+
+
+def description_words(description):
+    return {word for word in normalize_item_name(description).split()
+            if len(word) > 2 and word not in DESCRIPTION_STOPWORDS}
+
+
+def description_similarity(first, second):
+    """Jaccard similarity of description words; a missing description matches anything"""
+    if not first or not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def _most_common(values):
+    """Most frequent non-empty value, ties going to the shortest then alphabetical"""
+    counts = Counter(value for value in values if value)
+    if not counts:
+        return ""
+    return min(counts, key=lambda value: (-counts[value], len(value), value))
+
+
+class FoodCatalog:
+    """Canonical food items keyed by a stable id"""
+
+    def __init__(self, items=None):
+        self.items = items or []
+
+    @staticmethod
+    def exists(path=CANONICAL_CATALOG_FILE):
+        return os.path.exists(path)
+
+    @classmethod
+    def load(cls, path=CANONICAL_CATALOG_FILE):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def save(self, path=CANONICAL_CATALOG_FILE):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.items, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def build(cls, records):
+        """Merge FoodItemRecords into canonical items"""
+        clusters = {}  # normalized name -> [(first record's description words, [records])]
+        names_by_initial = {}  # near-identical names are only looked for under the same initial
+        similar_names = {}
+        ordered = sorted(records, key=lambda r: (
+            normalize_item_name(r.item_name), r.description or "", r.source_file_id or ""
+        ))
+        for record in ordered:
+            key = normalize_item_name(record.item_name)
+            if not key:
+                continue
+            words = description_words(record.description)
+            if key not in similar_names:
+                similar_names[key] = [name for name in names_by_initial.get(key[0], ())
+                                      if name != key and names_similar(name, key)]
+            candidates = [key] + similar_names[key]
+            for name in candidates:
+                match = next((cluster for cluster in clusters.get(name, ())
+                              if description_similarity(cluster[0], words) >= DESCRIPTION_SIMILARITY), None)
+                if match is not None:
+                    match[1].append(record)
+                    break
+            else:
+                if key not in clusters:
+                    names_by_initial.setdefault(key[0], []).append(key)
+                clusters.setdefault(key, []).append((words, [record]))
+
+        items = [cls._canonical_item(key, members)
+                 for key, group in clusters.items() for _, members in group]
+        items.sort(key=lambda item: (item['name'].lower(), item['id']))
+        return cls(items)
+
+    @staticmethod
+    def _canonical_item(key, records):
+        description = _most_common(r.description for r in records)
+        # Newest first; undated events last
+        dated = sorted(records, key=lambda r: r.served_on or "", reverse=True)
+        events = list(dict.fromkeys(r.source_event for r in dated if r.source_event))
+        return {
+            "id": hashlib.md5(f"{key}|{description}".encode('utf-8')).hexdigest()[:16],
+            "name": _most_common(r.item_name for r in records),
+            "section": _most_common(r.section for r in records),
+            "description": description,
+            "usage_count": len({r.source_file_id or r.source_event for r in records}),
+            "events": events,
+            "last_event": events[0] if events else None,
+            "last_served": dated[0].served_on,
+            "variants": sorted({r.item_name for r in records}),
+            "source_file_ids": sorted({r.source_file_id for r in records if r.source_file_id})
+        }
+
+    @staticmethod
+    def doc_id(item):
+        return f"food_item:{item['id']}"
+
+    @staticmethod
+    def document(item):
+        """The food_item document embedded for a canonical item"""
+        return Document(
+            page_content=f"""
+Food Item: {item['name']}
+Section: {item['section'] or 'General Menu'}
+Description: {item['description']}
+""",
+            metadata={
+                "document_type": "food_item",
+                "item_name": item['name'],
+                "menu_section": item['section'],
+                "full_description": item['description'],
+                "usage_count": item['usage_count'],
+                "source_event": item['last_event'],
+                "last_served": item['last_served'],
+                "source_events": item['events']
+            }
+        )
+
+    def diff(self, previous):
+        """Compare with the catalog `previous` was built into on the last run.
+
+        Returns (items to embed: new, or whose document text changed; doc ids
+        to delete: items gone or re-embedded; items whose text is unchanged but
+        whose usage metadata moved on, which keep their vectors).
+        """
+        before = {item['id']: item for item in previous.items}
+        changed, updated = [], []
+        for item in self.items:
+            old = before.get(item['id'])
+            if old is None or self.document(old).page_content != self.document(item).page_content:
+                changed.append(item)
+            elif old != item:
+                updated.append(item)
+        keep = {item['id'] for item in self.items}.difference(item['id'] for item in changed)
+        stale = [self.doc_id(item) for item in previous.items if item['id'] not in keep]
+        return changed, stale, updated
@@ -0,0 +1,118 @@
+"""Immutable, versioned index directories behind an atomically updated pointer.
+
+    faiss_index/
+        CURRENT                             id of the live version
+        versions/000001-20240501T120000/event_details/...
+        versions/000002-20240502T090000/...
+
+Ingestion saves every build into a new version directory and only then
+replaces CURRENT (write to a temporary file, then `os.replace`), so a
+reader sees either the old index or the new one, never a half-written one.
+A published version is never written to again. Readers poll CURRENT,
+which is one tiny file, to notice a new version. Indexes from before versioning (partitions stored
+directly in the root) are served as a "legacy" version until the first
+publish.
+"""
+import os
+import shutil
+import time
+from partitioned_store import INDEX_PATH, PartitionedVectorStore, index_version
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+LEGACY_PREFIX = "legacy-"
+
+# Versions kept on disk, the live one included
+DEFAULT_RETAIN = 3
+
+
+class IndexVersions:
+    """The published versions of the index under `root`"""
+
+    def __init__(self, root=INDEX_PATH, retain=DEFAULT_RETAIN):
+        self.root = root
+        self.retain = retain
+        self.versions_dir = os.path.join(root, VERSIONS_DIR)
+
+    def current(self):
+        """Id of the live version, or None if nothing has been published"""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE), 'r') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            pass
+        if PartitionedVectorStore.exists(self.root):
+            return LEGACY_PREFIX + index_version(self.root)
+        return None
+
+    def path(self, version):
+        if version.startswith(LEGACY_PREFIX):
+            return self.root
+        return os.path.join(self.versions_dir, version)
+
+    def current_path(self):
+        version = self.current()
+        return self.path(version) if version else None
+
+    def exists(self):
+        path = self.current_path()
+        return path is not None and PartitionedVectorStore.exists(path)
+
+    def list(self):
+        """Version ids on disk, oldest first (ids start with a zero-padded sequence number)"""
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(os.listdir(self.versions_dir))
+
+    def create(self):
+        """A new, empty version directory to save a build into"""
+        versions = self.list()
+        sequence = int(versions[-1].split("-")[0]) + 1 if versions else 1
+        path = self.path(f"{sequence:06d}-{time.strftime('%Y%m%dT%H%M%S')}")
+        os.makedirs(path)
+        return path
+
+    def publish(self, version_path):
+        """Make a saved version directory the live version and return its id"""
+        version = os.path.basename(os.path.normpath(version_path))
+        tmp_path = os.path.join(self.root, f"{CURRENT_FILE}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(version + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.root, CURRENT_FILE))
+        print(f"Published index version {version}")
+        return version
+
+    def collect_garbage(self):
+        """Delete all but the newest `retain` versions and a superseded legacy index.
+
+        Versions newer than the live one (a build still being saved) are
+        kept. Processes still serving an old version keep working: its files
+        are already open or mapped, and POSIX keeps them until they are
+        closed.
+        """
+        current = self.current()
+        versions = self.list()
+        removed = []
+        if current not in versions:
+            return removed
+        # The live version plus `retain - 1` older ones
+        older = versions[:versions.index(current)]
+        for version in older[:max(len(older) - (self.retain - 1), 0)]:
+            shutil.rmtree(self.path(version), ignore_errors=True)
+            removed.append(version)
+        # A legacy index is older than every version
+        if len(older) >= self.retain - 1:
+            for name in os.listdir(self.root):
+                path = os.path.join(self.root, name)
+                if name in (VERSIONS_DIR, CURRENT_FILE):
+                    continue
+                if os.path.isdir(path) and os.path.exists(os.path.join(path, "index.faiss")):
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed.append(f"legacy/{name}")
+                elif name in ("index.faiss", "index.pkl"):
+                    os.remove(path)
+        if removed:
+            print(f"Removed old index versions: {', '.join(removed)}")
+        return removed
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+
+MANIFEST_FILE = "ingest_manifest.json"
+
+
+class IngestManifest:
+    """Per-file record of what has already been extracted and embedded.
+
+    Entries are keyed by Drive file id and remember the checksum/modified date
+    the file had when it was ingested plus the docstore ids of the vectors it
+    produced, so later runs can skip unchanged files and replace or purge the
+    vectors of changed and deleted ones.
+    """
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.files = {}
+        self.base_pricing_checksum = None
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            self.files = data.get('files', {})
+            self.base_pricing_checksum = data.get('base_pricing_checksum')
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def clear(self):
+        self.files = {}
+        self.base_pricing_checksum = None
+
+    @staticmethod
+    def fingerprint(pdf_file):
+        """Return the (checksum, modified date) pair identifying a file revision"""
+        return pdf_file.get('md5Checksum'), pdf_file.get('modifiedDate')
+
+    def is_current(self, pdf_file):
+        """Check whether this exact revision of the file is already ingested"""
+        entry = self.files.get(pdf_file['id'])
+        if entry is None:
+            return False
+        checksum, modified = self.fingerprint(pdf_file)
+        if checksum and entry.get('md5Checksum'):
+            return checksum == entry['md5Checksum']
+        return modified is not None and modified == entry.get('modifiedDate')
+
+    def diff(self, pdf_files):
+        """Split a Drive listing into (new or changed files, deleted file ids)"""
+        listed_ids = set()
+        changed = list(self.changed(pdf_files, listed_ids))
+        return changed, self.deleted(listed_ids)
+
+    def changed(self, pdf_files, listed_ids):
+        """Yield the new or changed files of a listing as it is consumed.
+
+        Every listed id is added to `listed_ids`; once the listing is
+        exhausted, pass it to `deleted`.
+        """
+        for pdf_file in pdf_files:
+            listed_ids.add(pdf_file['id'])
+            if not self.is_current(pdf_file):
+                yield pdf_file
+
+    def deleted(self, listed_ids):
+        """Ids of ingested files missing from a complete listing"""
+        return [file_id for file_id in self.files if file_id not in listed_ids]
+
+    def doc_ids(self, file_id):
+        entry = self.files.get(file_id)
+        return list(entry['doc_ids']) if entry else []
+
+    def record(self, pdf_file, doc_ids):
+        checksum, modified = self.fingerprint(pdf_file)
+        self.files[pdf_file['id']] = {
+            'title': pdf_file['title'],
+            'md5Checksum': checksum,
+            'modifiedDate': modified,
+            'doc_ids': list(doc_ids)
+        }
+
+    def remove(self, file_id):
+        self.files.pop(file_id, None)
+
+    @staticmethod
+    def checksum(value):
+        """Stable checksum for JSON-serialisable data such as BASE_PRICING"""
+        payload = json.dumps(value, sort_keys=True).encode('utf-8')
+        return hashlib.md5(payload).hexdigest()
+
+    def save(self):
+        """Write the manifest atomically so a crash never leaves it half-written"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'files': self.files,
+                'base_pricing_checksum': self.base_pricing_checksum
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
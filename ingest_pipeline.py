@@ -0,0 +1,140 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+import os
+import queue
+import threading
+import pdf_extraction
+
+_DONE = object()
+
+
+class IngestPipeline:
+    """Overlapped download -> parse pipeline for ingestion.
+
+    Downloads run in a bounded thread pool straight into memory, PyPDF2 and the
+    regex extraction passes run in a process pool, and the stages are joined by
+    bounded queues. At most `window` files are in flight at once, and results
+    are yielded in listing order no matter which worker finishes first.
+    """
+
+    def __init__(self, download_workers=4, parse_workers=None, queue_size=8):
+        self.download_workers = download_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.window = max(queue_size, download_workers + self.parse_workers)
+
+    def run(self, pdf_files, download, cached=None):
+        """Yield (pdf_file, parsed, error) for each file, in listing order.
+
+        `pdf_files` can be a generator; files are downloaded as it yields
+        them and an error raised while listing is re-raised here.
+
+        `download` is called in a worker thread and must return the PDF bytes.
+        `cached`, if given, is called first and returns the page texts of a
+        file already extracted (or None); those files are neither downloaded
+        nor parsed with PyPDF2. `parsed` is the dict from
+        `pdf_extraction.parse_pages` (None for PDFs without text) and `error`
+        is the exception if the file failed.
+        """
+        downloaded = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue(maxsize=self.queue_size)
+        slots = threading.Semaphore(self.window)
+        stop = threading.Event()
+        listing_errors = []
+
+        def fetch(index, pdf_file):
+            if stop.is_set():
+                return
+            try:
+                pages = cached(pdf_file) if cached is not None else None
+                if pages is not None:
+                    print(f"Using cached text for {pdf_file['title']}")
+                    downloaded.put((index, pdf_file, pages, None))
+                    return
+                print(f"Downloading content for {pdf_file['title']}...")
+                downloaded.put((index, pdf_file, download(pdf_file), None))
+            except Exception as e:
+                downloaded.put((index, pdf_file, None, e))
+
+        def feed():
+            # `pdf_files` may be a lazy listing, so it is consumed here too
+            try:
+                with ThreadPoolExecutor(max_workers=self.download_workers) as pool:
+                    for index, pdf_file in enumerate(pdf_files):
+                        slots.acquire()
+                        if stop.is_set():
+                            break
+                        pool.submit(fetch, index, pdf_file)
+            except Exception as e:
+                listing_errors.append(e)
+            finally:
+                downloaded.put(_DONE)
+
+        def dispatch():
+            pending = {}
+            with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+                finished = False
+                while not finished or pending:
+                    if not finished and len(pending) < self.parse_workers * 2:
+                        try:
+                            item = downloaded.get(timeout=0.05 if pending else None)
+                        except queue.Empty:
+                            item = None
+                        if item is _DONE:
+                            finished = True
+                        elif item is not None:
+                            index, pdf_file, data, error = item
+                            if error is not None:
+                                results.put((index, pdf_file, None, error))
+                            else:
+                                # Cached files arrive as page texts, the rest as PDF bytes
+                                parse = (pdf_extraction.parse_pages if isinstance(data, list)
+                                         else pdf_extraction.parse_pdf)
+                                future = pool.submit(parse, data, pdf_file['title'])
+                                pending[future] = (index, pdf_file)
+                            continue
+                    if not pending:
+                        continue
+                    # Poll briefly while more downloads may arrive, otherwise block
+                    accepting = not finished and len(pending) < self.parse_workers * 2
+                    done, _ = wait(list(pending), timeout=0.05 if accepting else None,
+                                   return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index, pdf_file = pending.pop(future)
+                        try:
+                            results.put((index, pdf_file, future.result(), None))
+                        except Exception as e:
+                            results.put((index, pdf_file, None, e))
+            results.put(_DONE)
+
+        threads = [
+            threading.Thread(target=feed, daemon=True),
+            threading.Thread(target=dispatch, daemon=True)
+        ]
+        for thread in threads:
+            thread.start()
+
+        buffered = {}
+        next_index = 0
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                index, pdf_file, parsed, error = item
+                buffered[index] = (pdf_file, parsed, error)
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+                    slots.release()
+            if listing_errors:
+                raise listing_errors[0]
+        finally:
+            stop.set()
+            # Unblock the feeder if the consumer stopped early
+            for _ in range(self.window):
+                slots.release()
+            while any(thread.is_alive() for thread in threads):
+                try:
+                    results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
@@ -0,0 +1,345 @@
+import re
+
+# Metadata fields that keep only their first non-empty match, in pattern order
+FIRST_MATCH_FIELDS = {
+    'date': [
+        r'(?:date:|on:?)\s*([\w\s,.&]+\d{2,4})',
+        r'(\d{1,2}[./]\d{1,2}[./]\d{2,4})',
+        r'([A-Z][a-z]+ \d{1,2}(?:st|nd|rd|th)?,? \d{4})'
+    ],
+    'time': [
+        r'(?:time[s]?:|at:?)\s*([^\n]+)',
+        r'(\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)(?:\s*-\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm))?)'
+    ],
+    'guest_count': [
+        r'(?:guests?|people|attendees|count):\s*(\d+)',
+        r'(?:for|serving)\s+(\d+)\s+(?:people|guests|attendees)',
+        r'guests?:\s*([^\n]+)'  # Capture varying guest counts
+    ],
+    'location': [
+        r'(?:location|venue|place):\s*([^\n]+)'
+    ],
+    'invoice_no': [
+        r'(?:invoice\s*(?:no|number|#)?:?\s*)([A-Z0-9]+)'
+    ],
+    'contact': [
+        r'(?:contact|contact person):\s*([^\n]+)'
+    ],
+    'email': [
+        r'(?:email|e-mail):\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+        r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
+    ],
+    'phone': [
+        r'(?:phone|cell|tel):\s*([0-9.()-]+)',
+        r'(?:phone|cell|tel)[^:]*:\s*([^\n]+)'  # Capture phone with description
+    ]
+}
+
+PRICE_PATTERNS = [
+    r'\$[\d,]+(?:\.\d{2})?(?:\s*(?:per person|pp|p/p))?',
+    r'(?:price|cost|total):\s*\$[\d,]+(?:\.\d{2})?',
+    r'(?:per person|pp|p/p):\s*\$[\d,]+(?:\.\d{2})?'
+]
+
+# Multiline setup notes; the last match wins
+SETUP_NOTES_PATTERN = r'(?:setup|set up|setup notes):\s*([^\n]+(?:\n(?!\w+:)[^\n]+)*)'
+
+EVENT_NAME_PATTERNS = [
+    r'^(?:event|function|occasion):\s*(.+)$',
+    r'^(?:event|function|occasion)\s+name:\s*(.+)$',
+    r'(?:catering|menu)\s+for:\s*(.+)$'
+]
+
+PRICING_LINE_PATTERNS = {
+    'per_person': r'(?P<item>.*?)\s*at\s*\$(?P<price>[\d,.]+)\s*per\s*guest\s*x\s*(?P<guests>\d+)\s*guests?\s*=\s*\$(?P<total>[\d,.]+)',
+    'staff': r'(?P<role>.*?)\s*at\s*\$(?P<rate>[\d,.]+)\s*x\s*(?P<count>\d+)?\s*=\s*\$(?P<total>[\d,.]+)',
+    'tax': r'(?P<rate>[\d.]+)\s*%\s*tax\s*=\s*\$(?P<amount>[\d,.]+)',
+    'service': r'service\s*fee\s*=\s*\$(?P<amount>[\d,.]+)',
+    'delivery': r'delivery\s*(?:&|and)\s*set-?up\s*fee\s*=\s*\$(?P<amount>[\d,.]+)',
+    'total': r'grand\s*total\s*=\s*\$(?P<amount>[\d,.]+)',
+    'flat_rate': r'(?P<item>.*?)\s*=\s*\$(?P<amount>[\d,.]+)',
+    'tbd': r'(?P<item>.*?)\s*=\s*(?:t\.b\.d\.|TBD)',
+}
+
+HEADER_KEYWORDS = ['date:', 'time:', 'price:', 'location:', 'menu:', 'contact:']
+FLAT_RATE_EXCLUDED = ['total', 'sub-total', 'service fee', 'tax']
+
+
+class MenuExtractor:
+    """Compiled, single-pass replacement for the pdf_extraction functions.
+
+    All patterns are compiled once per extractor. Event name, menu sections,
+    the pricing block and food items come out of one pass over the lines,
+    and each first-match metadata field stops at its first non-empty match
+    instead of collecting every match. Output is identical to
+    `pdf_extraction.extract_event_details`, `extract_pricing_details` and
+    `extract_food_items`, which remain the reference implementations.
+    """
+
+    def __init__(self):
+        flags = re.IGNORECASE | re.MULTILINE
+        self.first_match_fields = [
+            (field, [re.compile(p, flags) for p in patterns])
+            for field, patterns in FIRST_MATCH_FIELDS.items()
+        ]
+        self.price_patterns = [re.compile(p, flags) for p in PRICE_PATTERNS]
+        self.setup_notes_pattern = re.compile(SETUP_NOTES_PATTERN, flags)
+        self.event_name_patterns = [re.compile(p, re.I) for p in EVENT_NAME_PATTERNS]
+        self.leading_digit = re.compile(r'^\d+')
+        self.pricing_header = re.compile(r'^\s*pricing\s*$', re.I)
+        self.pricing_lines = {
+            name: re.compile(p, re.I) for name, p in PRICING_LINE_PATTERNS.items()
+        }
+        self.menu_header = re.compile(r'menu|breakfast|lunch|dinner|appetizers|entrees|desserts|beverages', re.I)
+        self.food_section = re.compile(
+            r'^(?:menu|breakfast|lunch|dinner|appetizers?|entree?s|desserts?|beverages?|hors\s+d\'oeuvres)s?:?\s*$',
+            re.I
+        )
+        self.food_item_header = re.compile(r'^[A-Z][A-Za-z\s&-]+$')
+        self.price_like = re.compile(r'^[\s]*\$?\d+')
+        self.punctuation = re.compile(r'[^\w\s]')
+
+    @staticmethod
+    def _empty_pricing():
+        return {
+            'per_person_charges': [],  # Items charged per guest
+            'flat_charges': [],        # Fixed charges
+            'staff_charges': [],       # Staff-related charges
+            'additional_charges': [],  # Additional services
+            'summary': {              # Total calculations
+                'subtotal': None,
+                'service_fee': None,
+                'delivery_setup': None,
+                'tax': None,
+                'tax_rate': None,
+                'grand_total': None
+            }
+        }
+
+    def _add_pricing_line(self, pricing_details, line):
+        """Classify one stripped pricing line, trying patterns in the original order"""
+        if '=' not in line:
+            return  # Every pricing pattern needs an '='
+        patterns = self.pricing_lines
+        if '$' in line:
+            match = patterns['per_person'].match(line)
+            if match:
+                pricing_details['per_person_charges'].append({
+                    'item': match.group('item').strip(),
+                    'price_per_person': float(match.group('price').replace(',', '')),
+                    'guest_count': int(match.group('guests')),
+                    'total': float(match.group('total').replace(',', '')),
+                    'line_item': line
+                })
+                return
+
+            match = patterns['staff'].match(line)
+            if match and 'guest' not in line.lower():
+                pricing_details['staff_charges'].append({
+                    'role': match.group('role').strip(),
+                    'rate': float(match.group('rate').replace(',', '')),
+                    'count': int(match.group('count')) if match.group('count') else 1,
+                    'total': float(match.group('total').replace(',', '')),
+                    'line_item': line
+                })
+                return
+
+            summary = pricing_details['summary']
+            if '%' in line:
+                match = patterns['tax'].match(line)
+                if match:
+                    summary['tax_rate'] = float(match.group('rate'))
+                    summary['tax'] = float(match.group('amount').replace(',', ''))
+                    return
+
+            match = patterns['service'].match(line)
+            if match:
+                summary['service_fee'] = float(match.group('amount').replace(',', ''))
+                return
+
+            match = patterns['delivery'].match(line)
+            if match:
+                summary['delivery_setup'] = float(match.group('amount').replace(',', ''))
+                return
+
+            match = patterns['total'].match(line)
+            if match:
+                summary['grand_total'] = float(match.group('amount').replace(',', ''))
+                return
+
+        match = patterns['tbd'].match(line)
+        if match:
+            pricing_details['additional_charges'].append({
+                'item': match.group('item').strip(),
+                'amount': 'TBD',
+                'line_item': line
+            })
+            return
+
+        if '$' in line:
+            match = patterns['flat_rate'].match(line)
+            if match:
+                item = match.group('item').strip().lower()
+                if not any(keyword in item for keyword in FLAT_RATE_EXCLUDED):
+                    pricing_details['flat_charges'].append({
+                        'item': match.group('item').strip(),
+                        'amount': float(match.group('amount').replace(',', '')),
+                        'line_item': line
+                    })
+
+    def _scan_lines(self, lines, with_pricing=True):
+        """The single line-oriented pass behind every extraction"""
+        explicit_name = None
+        header_name = None
+
+        menu_active = False
+        current_section = ""
+        menu_sections = {}
+
+        pricing_details = self._empty_pricing()
+        pricing_state = 'searching' if with_pricing else 'done'  # -> 'collecting' -> 'done'
+
+        food_items = []
+        current_item = None
+        current_description = []
+        food_section = None
+
+        for index, raw_line in enumerate(lines):
+            line = raw_line.strip()
+
+            # Event name: explicit label in the first 15 lines, else a header-like line
+            if index < 15 and explicit_name is None:
+                for pattern in self.event_name_patterns:
+                    match = pattern.match(line)
+                    if match:
+                        explicit_name = match.group(1).strip()
+                        break
+                if (index < 10 and header_name is None and len(line) > 10 and
+                        not any(p in line.lower() for p in HEADER_KEYWORDS) and
+                        not line.startswith('$') and
+                        not self.leading_digit.match(line)):
+                    header_name = line
+
+            # Pricing block: the lines after the first "Pricing" header
+            if pricing_state == 'collecting':
+                if line and not line.lower().startswith(('menu', 'contact')):
+                    self._add_pricing_line(pricing_details, line)
+                else:
+                    pricing_state = 'done'
+            elif pricing_state == 'searching' and self.pricing_header.match(raw_line):
+                pricing_state = 'collecting'
+
+            if not line:
+                # Process any pending food item before moving on
+                if current_item and current_description:
+                    food_items.append({
+                        'name': current_item,
+                        'description': ' '.join(current_description),
+                        'section': food_section,
+                        'source_text': f"{current_item}\n{' '.join(current_description)}"
+                    })
+                    current_item = None
+                    current_description = []
+                continue
+
+            # Menu sections for the event details
+            if self.menu_header.search(line):
+                menu_active = True
+                current_section = line
+                menu_sections[current_section] = []
+            elif menu_active and not line.startswith(('$', 'Price', 'Total', 'Contact', 'Phone', 'Email')):
+                if current_section in menu_sections:
+                    menu_sections[current_section].append(line)
+
+            # Individual food items
+            if self.food_section.match(line):
+                food_section = line.strip(':').title()
+                continue
+            if len(line) > 3 and self.food_item_header.match(line):
+                if current_item and current_description:
+                    food_items.append({
+                        'name': current_item,
+                        'description': ' '.join(current_description),
+                        'section': food_section,
+                        'source_text': f"{current_item}\n{' '.join(current_description)}"
+                    })
+                current_item = line
+                current_description = []
+            elif current_item:
+                if not self.price_like.match(line) and not line.lower().startswith(('total', 'tax', 'service')):
+                    current_description.append(line)
+
+        if current_item and current_description:
+            food_items.append({
+                'name': current_item,
+                'description': ' '.join(current_description),
+                'section': food_section,
+                'source_text': f"{current_item}\n{' '.join(current_description)}"
+            })
+
+        event_name = explicit_name if explicit_name is not None else header_name
+        return event_name, menu_sections, pricing_details, food_items
+
+    def _build_event_details(self, text, filename, scan):
+        event_name, menu_sections, pricing_details, _ = scan
+        details = {
+            "event_name": "",
+            "date": None,
+            "time": None,
+            "guest_count": None,
+            "location": None,
+            "setup_notes": None,
+            "invoice_no": None,
+            "contact": None,
+            "email": None,
+            "phone": None,
+            "prices": [],
+            "menu_items": [],
+            "full_text": text
+        }
+
+        details['event_name'] = event_name or filename.replace('.pdf', '').replace('_', ' ').title()
+        details['event_name_variations'] = [
+            details['event_name'],
+            details['event_name'].lower(),
+            self.punctuation.sub('', details['event_name']).lower(),  # Remove punctuation
+            ' '.join(word for word in details['event_name'].split() if len(word) > 2)  # Key words only
+        ]
+
+        if '$' in text:
+            for pattern in self.price_patterns:
+                details['prices'].extend(match.group() for match in pattern.finditer(text))
+
+        for field, patterns in self.first_match_fields:
+            if field == 'email' and '@' not in text:
+                continue
+            value = None
+            for pattern in patterns:
+                for match in pattern.finditer(text):
+                    value = match.group(1).strip()
+                    if value:
+                        break
+                if value:
+                    break
+            details[field] = value
+
+        for match in self.setup_notes_pattern.finditer(text):
+            details['setup_notes'] = match.group(1).strip()
+
+        details['menu_items'] = menu_sections
+        details['pricing_breakdown'] = pricing_details
+        return details
+
+    def extract(self, text, filename):
+        """Return (event_details, food_items) from a single pass over the text"""
+        scan = self._scan_lines(text.split('\n'))
+        return self._build_event_details(text, filename, scan), scan[3]
+
+    def extract_event_details(self, text, filename):
+        return self.extract(text, filename)[0]
+
+    def extract_pricing_details(self, text):
+        return self._scan_lines(text.split('\n'))[2]
+
+    def extract_food_items(self, text):
+        return self._scan_lines(text.split('\n'), with_pricing=False)[3]
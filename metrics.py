@@ -0,0 +1,274 @@
+"""Lightweight timing spans and counters for ingestion and query handling.
+
+    from metrics import metrics
+
+    with metrics.trace("query"):          # groups the spans of one request
+        with metrics.span("classify"):
+            ...
+        metrics.observe("prompt_tokens", 812, query_type="general")
+
+Everything is off unless enabled, either with MENU_METRICS=1 or with
+`metrics.configure(enabled=True)`. While disabled, `span` and `trace` return
+a shared no-op context manager and `incr`/`observe` return straight away.
+`with metrics.collect() as traces:` records the traces of just the code
+inside it (e.g. one request shown in a debug panel) without enabling
+aggregates or exports for the rest of the process.
+
+Aggregates are exported as Prometheus text (`to_prometheus`) and finished
+traces as JSON lines. Set MENU_METRICS_PROMETHEUS and/or MENU_METRICS_JSONL
+(or pass the paths to `configure`) to have them written after every trace.
+"""
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+
+
+# The trace being recorded; a context variable so that concurrent asyncio
+# tasks (and threads) each see their own
+_current_trace = contextvars.ContextVar("metrics_trace", default=None)
+# Inside `Metrics.collect`, the list its finished traces are appended to
+_collecting = contextvars.ContextVar("metrics_collecting", default=None)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "labels", "attrs", "start")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.attrs = {}
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes to the enclosing trace (e.g. the query type)"""
+        trace = _current_trace.get()
+        if trace is not None:
+            trace["attrs"].update(attrs)
+
+
+class _Trace(_Span):
+    __slots__ = ("token",)
+
+    def __enter__(self):
+        self.token = _current_trace.set(
+            {"name": self.name, "attrs": dict(self.labels), "spans": [], "values": []}
+        )
+        return _Span.__enter__(self)
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        trace = _current_trace.get()
+        _current_trace.reset(self.token)
+        trace["seconds"] = elapsed
+        trace["timestamp"] = time.time()
+        if exc[0] is not None:
+            trace["error"] = exc[0].__name__
+        self.metrics.record(self.name, elapsed, **self.labels)
+        self.metrics._finish_trace(trace)
+        return False
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Metrics:
+    """Process-wide timing, counter and value aggregates plus per-request traces"""
+
+    def __init__(self, enabled=False, prometheus_path=None, jsonl_path=None, prefix="menu"):
+        self.enabled = enabled
+        self.prometheus_path = prometheus_path
+        self.jsonl_path = jsonl_path
+        self.prefix = prefix
+        self._timings = {}   # (name, labels) -> [count, total seconds, max seconds]
+        self._values = {}    # (name, labels) -> [count, total, max]
+        self._counters = {}  # (name, labels) -> total
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def configure(self, enabled=None, prometheus_path=None, jsonl_path=None):
+        if enabled is not None:
+            self.enabled = enabled
+        if prometheus_path is not None:
+            self.prometheus_path = prometheus_path
+        if jsonl_path is not None:
+            self.jsonl_path = jsonl_path
+
+    def active(self):
+        """Whether spans and traces are recorded here (enabled, or inside `collect`)"""
+        return self.enabled or _collecting.get() is not None
+
+    @contextlib.contextmanager
+    def collect(self):
+        """Record the traces of the block into the yielded list; aggregates and exports still follow `enabled`"""
+        traces = []
+        token = _collecting.set(traces)
+        try:
+            yield traces
+        finally:
+            _collecting.reset(token)
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._values.clear()
+            self._counters.clear()
+
+    def span(self, name, **labels):
+        """Time a block; recorded under `name` and in the current trace"""
+        if not self.active():
+            return _NULL_SPAN
+        return _Span(self, name, labels)
+
+    def trace(self, name, **attrs):
+        """Time a whole request and keep its spans as this thread's last trace"""
+        if not self.active():
+            return _NULL_SPAN
+        return _Trace(self, name, attrs)
+
+    def timed(self, name):
+        """Decorator form of `span`"""
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                if not self.active():
+                    return func(*args, **kwargs)
+                with _Span(self, name, {}):
+                    return func(*args, **kwargs)
+            wrapper.__name__ = func.__name__
+            wrapper.__doc__ = func.__doc__
+            return wrapper
+        return decorator
+
+    def _aggregate(self, table, key, value):
+        with self._lock:
+            entry = table.get(key)
+            if entry is None:
+                table[key] = [1, value, value]
+            else:
+                entry[0] += 1
+                entry[1] += value
+                if value > entry[2]:
+                    entry[2] = value
+
+    def record(self, name, seconds, **labels):
+        """Record an externally measured duration"""
+        if not self.active():
+            return
+        if self.enabled:
+            self._aggregate(self._timings, _key(name, labels), seconds)
+        trace = _current_trace.get()
+        if trace is not None and trace["name"] != name:
+            trace["spans"].append({"name": name, "seconds": seconds, **labels})
+
+    def observe(self, name, value, **labels):
+        """Record a sampled value such as a prompt size"""
+        if not self.active():
+            return
+        if self.enabled:
+            self._aggregate(self._values, _key(name, labels), value)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace["values"].append({"name": name, "value": value, **labels})
+
+    def incr(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def last_trace(self):
+        """The most recent finished trace on this thread, or None"""
+        return getattr(self._local, "last", None)
+
+    def _finish_trace(self, trace):
+        self._local.last = trace
+        collected = _collecting.get()
+        if collected is not None:
+            collected.append(trace)
+        if not self.enabled:
+            return
+        if self.jsonl_path:
+            with self._lock, open(self.jsonl_path, "a") as f:
+                f.write(json.dumps(trace) + "\n")
+        if self.prometheus_path:
+            self.write_prometheus(self.prometheus_path)
+
+    def snapshot(self):
+        """Aggregates as a list of plain records"""
+        with self._lock:
+            records = []
+            for (name, labels), (count, total, peak) in sorted(self._timings.items()):
+                records.append({"type": "timing", "name": name, "labels": dict(labels),
+                                "count": count, "sum": total, "max": peak})
+            for (name, labels), (count, total, peak) in sorted(self._values.items()):
+                records.append({"type": "value", "name": name, "labels": dict(labels),
+                                "count": count, "sum": total, "max": peak})
+            for (name, labels), total in sorted(self._counters.items()):
+                records.append({"type": "counter", "name": name, "labels": dict(labels), "value": total})
+        return records
+
+    def to_prometheus(self):
+        """Prometheus text exposition of every aggregate"""
+        def labels_text(labels):
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+        lines = []
+        for record in self.snapshot():
+            labels = labels_text(record["labels"])
+            if record["type"] == "counter":
+                lines.append(f"{self.prefix}_{record['name']}_total{labels} {record['value']}")
+                continue
+            suffix = "_seconds" if record["type"] == "timing" else ""
+            base = f"{self.prefix}_{record['name']}{suffix}"
+            lines.append(f"{base}_count{labels} {record['count']}")
+            lines.append(f"{base}_sum{labels} {record['sum']}")
+            lines.append(f"{base}_max{labels} {record['max']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def write_jsonl(self, path):
+        """Append the current aggregates, one JSON record per line"""
+        timestamp = time.time()
+        with open(path, "a") as f:
+            for record in self.snapshot():
+                f.write(json.dumps(dict(record, timestamp=timestamp)) + "\n")
+
+
+metrics = Metrics(
+    enabled=os.environ.get("MENU_METRICS", "") not in ("", "0"),
+    prometheus_path=os.environ.get("MENU_METRICS_PROMETHEUS"),
+    jsonl_path=os.environ.get("MENU_METRICS_JSONL")
+)
@@ -0,0 +1,43 @@
+"""LangChain callback handler feeding `metrics`.
+
+Kept out of metrics.py so that importing metrics does not import LangChain.
+"""
+import time
+from langchain.callbacks.base import BaseCallbackHandler
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Times retriever and LLM calls inside LangChain chains and counts prompt tokens"""
+
+    def __init__(self, metrics, count_tokens, **labels):
+        self.metrics = metrics
+        self.count_tokens = count_tokens
+        self.labels = labels
+        self._starts = {}
+
+    def on_retriever_start(self, serialized, query, *, run_id, **kwargs):
+        self._starts[run_id] = time.perf_counter()
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            self.metrics.record("retrieval", time.perf_counter() - start, **self.labels)
+            self.metrics.observe("retrieved_documents", len(documents), **self.labels)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._starts[run_id] = time.perf_counter()
+        self.metrics.observe("prompt_tokens", sum(self.count_tokens(p) for p in prompts), **self.labels)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        start = self._starts.pop(run_id, None)
+        if start is not None:
+            self.metrics.record("llm", time.perf_counter() - start, **self.labels)
+        text = "".join(g.text for generations in response.generations for g in generations)
+        self.metrics.observe("completion_tokens", self.count_tokens(text), **self.labels)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._starts.pop(run_id, None)
+        self.metrics.incr("llm_errors", **self.labels)
+
+    def on_retriever_error(self, error, *, run_id, **kwargs):
+        self._starts.pop(run_id, None)
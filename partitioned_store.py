@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import shutil
+import faiss
+from langchain.vectorstores import FAISS
+from ann_index import DEFAULT_INDEX_SPEC, build_index, infer_index_spec, read_index, remove_positions
+from blob_docstore import BlobDocstore
+
+INDEX_PATH = "faiss_index"
+IDS_FILE = "index_ids.json"
+# The index spec a store was built with, so a full rebuild keeps its type
+SPEC_FILE = "index_spec.txt"
+
+
+def index_version(folder_path=INDEX_PATH):
+    """Cheap fingerprint of the index on disk; changes whenever a partition is rewritten"""
+    stamps = []
+    for root, _, files in os.walk(folder_path):
+        for name in files:
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            stamps.append(f"{os.path.relpath(path, folder_path)}:{stat.st_mtime_ns}:{stat.st_size}")
+    return hashlib.md5("|".join(sorted(stamps)).encode('utf-8')).hexdigest()
+
+
+class PartitionedVectorStore:
+    """One FAISS index per document_type, stored as sub-folders of one index folder.
+
+    Retrievers search only their own partition, so every search is an exact
+    top-k over documents of that type, with no post-search metadata filter
+    and a cost proportional to the partition size.
+
+    Each partition folder holds the FAISS index, the docstore ids in index
+    order and a BlobDocstore, so loading reads no document text and
+    unpickles nothing. Indexes saved as index.pkl are still loaded and are
+    converted on the next save.
+
+    New partitions are built with `index_spec` (see ann_index); existing
+    partitions keep the type they were built with until a full rebuild.
+    The spec is saved with the store (see `stored_index_spec`).
+    """
+
+    def __init__(self, embeddings, partitions=None, index_spec=DEFAULT_INDEX_SPEC):
+        self.embeddings = embeddings
+        self.partitions = partitions or {}
+        self.index_spec = index_spec
+
+    @staticmethod
+    def exists(folder_path=INDEX_PATH):
+        if not os.path.isdir(folder_path):
+            return False
+        return any(
+            os.path.exists(os.path.join(folder_path, name, "index.faiss"))
+            for name in os.listdir(folder_path)
+        )
+
+    @staticmethod
+    def stored_index_spec(folder_path=INDEX_PATH):
+        """The spec a saved store was built with, inferred from its indexes if it predates SPEC_FILE"""
+        try:
+            with open(os.path.join(folder_path, SPEC_FILE), "r") as f:
+                return f.read().strip() or DEFAULT_INDEX_SPEC
+        except FileNotFoundError:
+            pass
+        if not PartitionedVectorStore.exists(folder_path):
+            return None
+        return infer_index_spec(
+            read_index(os.path.join(folder_path, name, "index.faiss"), mmap=True)
+            for name in sorted(os.listdir(folder_path))
+            if os.path.exists(os.path.join(folder_path, name, "index.faiss"))
+        )
+
+    @classmethod
+    def load(cls, folder_path, embeddings, mmap=False, index_spec=None):
+        """Load every partition; `mmap` maps the indexes and document blobs read-only for serving.
+
+        New partitions use `index_spec`, by default the spec the store was built with.
+        """
+        partitions = {}
+        for name in sorted(os.listdir(folder_path)):
+            path = os.path.join(folder_path, name)
+            if os.path.exists(os.path.join(path, "index.faiss")):
+                partitions[name] = cls._load_partition(path, embeddings, mmap)
+        if index_spec is None:
+            index_spec = cls.stored_index_spec(folder_path) or DEFAULT_INDEX_SPEC
+        return cls(embeddings, partitions, index_spec)
+
+    @staticmethod
+    def _load_partition(path, embeddings, mmap=False):
+        if not BlobDocstore.exists(path):
+            # Pickled docstore from before BlobDocstore
+            store = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+            store.docstore = BlobDocstore(documents=store.docstore._dict)
+            return store
+        with open(os.path.join(path, IDS_FILE), "r") as f:
+            ids = json.load(f)
+        return FAISS(
+            embeddings,
+            read_index(os.path.join(path, "index.faiss"), mmap),
+            BlobDocstore.load(path).open() if mmap else BlobDocstore.load(path),
+            dict(enumerate(ids))
+        )
+
+    def partition(self, document_type):
+        if document_type not in self.partitions:
+            raise KeyError(f"No '{document_type}' documents in the vector store")
+        return self.partitions[document_type]
+
+    def doc_ids(self):
+        """All docstore ids across partitions"""
+        ids = set()
+        for store in self.partitions.values():
+            ids.update(store.index_to_docstore_id.values())
+        return ids
+
+    def add_embeddings(self, text_embeddings, metadatas, ids):
+        """Route precomputed (text, vector) pairs to their document_type partition"""
+        grouped = {}
+        for pair, metadata, doc_id in zip(text_embeddings, metadatas, ids):
+            group = grouped.setdefault(metadata["document_type"], ([], [], []))
+            group[0].append(pair)
+            group[1].append(metadata)
+            group[2].append(doc_id)
+        for document_type, (pairs, group_metadatas, group_ids) in grouped.items():
+            if document_type in self.partitions:
+                self.partitions[document_type].add_embeddings(
+                    pairs, metadatas=group_metadatas, ids=group_ids
+                )
+            else:
+                index = build_index(self.index_spec, [vector for _, vector in pairs])
+                store = FAISS(self.embeddings, index, BlobDocstore(), {})
+                store.add_embeddings(pairs, metadatas=group_metadatas, ids=group_ids)
+                self.partitions[document_type] = store
+
+    def delete(self, ids):
+        """Delete docstore ids from whichever partitions hold them"""
+        ids = set(ids)
+        for document_type in list(self.partitions):
+            store = self.partitions[document_type]
+            owned = [doc_id for doc_id in store.index_to_docstore_id.values() if doc_id in ids]
+            if not owned:
+                continue
+            if len(owned) == len(store.index_to_docstore_id):
+                del self.partitions[document_type]
+                continue
+            owned = set(owned)
+            positions = [i for i, doc_id in store.index_to_docstore_id.items() if doc_id in owned]
+            store.index = remove_positions(store.index, positions)
+            store.docstore.delete(owned)
+            remaining = [doc_id for _, doc_id in sorted(store.index_to_docstore_id.items())
+                         if doc_id not in owned]
+            store.index_to_docstore_id = dict(enumerate(remaining))
+
+    def update_documents(self, documents):
+        """Replace the stored text/metadata of existing docstore ids without touching their vectors"""
+        for store in self.partitions.values():
+            stored = set(store.index_to_docstore_id.values())
+            owned = {doc_id: document for doc_id, document in documents.items() if doc_id in stored}
+            if owned:
+                store.docstore.update(owned)
+
+    def save(self, folder_path=INDEX_PATH):
+        os.makedirs(folder_path, exist_ok=True)
+        for document_type, store in self.partitions.items():
+            path = os.path.join(folder_path, document_type)
+            os.makedirs(path, exist_ok=True)
+            store.docstore.save(path)
+            # Replace rather than overwrite: a serving process may have the old file mapped
+            index_path = os.path.join(path, "index.faiss")
+            faiss.write_index(store.index, f"{index_path}.tmp")
+            os.replace(f"{index_path}.tmp", index_path)
+            with open(os.path.join(path, IDS_FILE), "w") as f:
+                json.dump([store.index_to_docstore_id[i] for i in range(len(store.index_to_docstore_id))], f)
+            if os.path.exists(os.path.join(path, "index.pkl")):
+                os.remove(os.path.join(path, "index.pkl"))
+        with open(os.path.join(folder_path, SPEC_FILE), "w") as f:
+            f.write(self.index_spec + "\n")
+        # Drop partitions that no longer exist and any pre-partitioning index files
+        for name in os.listdir(folder_path):
+            if name in self.partitions:
+                continue
+            path = os.path.join(folder_path, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            elif name in ("index.faiss", "index.pkl"):
+                os.remove(path)
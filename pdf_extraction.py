@@ -0,0 +1,53 @@
+"""Text extraction helpers shared by the sequential and pipelined ingestion.
+
+Everything here is a plain module-level function of its inputs so it can run
+inside a process pool worker.
+"""
+import io
+import PyPDF2
+from menu_extractor import MenuExtractor
+
+# Compiled once per process (including each process pool worker)
+_extractor = MenuExtractor()
+
+
+def extract_pdf_pages(data):
+    """Extract the text of every page from in-memory PDF bytes"""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+    pages = []
+    for i, page in enumerate(pdf_reader.pages):
+        try:
+            pages.append(page.extract_text())
+        except Exception as e:
+            print(f"Error extracting text from page {i+1}: {str(e)}")
+    return pages
+
+
+def join_pages(pages):
+    """Join page texts the way the index has always stored them"""
+    return "".join(page_text + "\n" for page_text in pages)
+
+
+def parse_text(text, filename):
+    """Extract event details and food items from a document's text in one pass"""
+    event_details, food_items = _extractor.extract(text, filename)
+    return {
+        'text': text,
+        'event_details': event_details,
+        'food_items': food_items
+    }
+
+
+def parse_pages(pages, filename):
+    """Extracted details of a document's page texts, with the pages (None without text)"""
+    text = join_pages(pages)
+    if not text.strip():
+        return None
+    parsed = parse_text(text, filename)
+    parsed['pages'] = pages
+    return parsed
+
+
+def parse_pdf(data, filename):
+    """Process-pool entry point: PDF bytes in, extracted text and details out"""
+    return parse_pages(extract_pdf_pages(data), filename)
@@ -1,19 +1,62 @@
-from PyDrive2.auth import GoogleAuth
-from PyDrive2.drive import GoogleDrive
-import PyPDF2
-import io
+from pydrive2.auth import GoogleAuth
+from pydrive2.drive import GoogleDrive
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings import OpenAIEmbeddings
-from langchain.vectorstores import FAISS
 from langchain.schema import Document
 from config import GOOGLE_DRIVE_CREDENTIALS, DRIVE_FOLDER_ID, OPENAI_API_KEY
+from document_sources import DriveSource
 from menu_base_pricing import BASE_PRICING
+from ingest_manifest import IngestManifest
+from embedding_cache import make_embeddings
+from embedding_scheduler import EmbeddingScheduler
+from partitioned_store import PartitionedVectorStore
+from index_versions import IndexVersions, DEFAULT_RETAIN
+from ann_index import DEFAULT_INDEX_SPEC
+from menu_extractor import MenuExtractor
+from event_store import EventStore
+from pricing_cube import PricingCube
+from food_catalog import FoodCatalog
+from catalog_store import CatalogFile, EventSummary, FoodItemRecord
+from text_cache import TextCache
+from metrics import metrics
+import pdf_extraction
 import os
-import re
 import json
+import time
+
+class CountingIterator:
+    """Wraps an iterator and counts the items taken from it"""
+
+    def __init__(self, iterable):
+        self._iterator = iter(iterable)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._iterator)
+        self.count += 1
+        return item
 
 class PDFProcessor:
-    def __init__(self):
+    def __init__(self, source=None, embeddings=None, text_cache=None):
+        """Ingest PDFs from `source` (the configured Drive folder by default)
+
+        Page texts extracted with PyPDF2 are kept in `text_cache` (a
+        TextCache in the working directory by default), so unchanged files
+        are never downloaded or parsed again.
+        """
+        self.gauth = None
+        self.drive = None
+        if source is None:
+            source = DriveSource(self._connect_drive())
+        self.source = source
+        self.embeddings = embeddings or make_embeddings()
+        self.text_cache = text_cache or TextCache()
+        self.extractor = MenuExtractor()
+
+    def _connect_drive(self):
+        """Authenticate with saved or fresh credentials and return a GoogleDrive"""
         self.gauth = GoogleAuth()
         # Load settings
         self.gauth.settings['client_config_file'] = 'client_secrets.json'
@@ -58,363 +101,33 @@ class PDFProcessor:
         # Save the current credentials
         self.gauth.SaveCredentialsFile("credentials.json")
         self.drive = GoogleDrive(self.gauth)
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            openai_api_key=OPENAI_API_KEY
-        )
+        return self.drive
 
     def extract_pricing_details(self, text):
         """Extract detailed pricing breakdown with line item associations"""
-        pricing_details = {
-            'per_person_charges': [],  # Items charged per guest
-            'flat_charges': [],        # Fixed charges
-            'staff_charges': [],       # Staff-related charges
-            'additional_charges': [],  # Additional services
-            'summary': {              # Total calculations
-                'subtotal': None,
-                'service_fee': None,
-                'delivery_setup': None,
-                'tax': None,
-                'tax_rate': None,
-                'grand_total': None
-            }
-        }
-        
-        # Find the pricing section
-        pricing_section = None
-        lines = text.split('\n')
-        for i, line in enumerate(lines):
-            if re.match(r'^\s*pricing\s*$', line, re.I):
-                # Capture all lines until we hit a blank line or new section
-                pricing_lines = []
-                j = i + 1
-                while j < len(lines) and lines[j].strip() and not lines[j].strip().lower().startswith(('menu', 'contact')):
-                    pricing_lines.append(lines[j].strip())
-                    j += 1
-                pricing_section = '\n'.join(pricing_lines)
-                break
-        
-        if not pricing_section:
-            return pricing_details
-        
-        # Patterns for different pricing formats
-        patterns = {
-            'per_person': r'(?P<item>.*?)\s*at\s*\$(?P<price>[\d,.]+)\s*per\s*guest\s*x\s*(?P<guests>\d+)\s*guests?\s*=\s*\$(?P<total>[\d,.]+)',
-            'staff': r'(?P<role>.*?)\s*at\s*\$(?P<rate>[\d,.]+)\s*x\s*(?P<count>\d+)?\s*=\s*\$(?P<total>[\d,.]+)',
-            'tax': r'(?P<rate>[\d.]+)\s*%\s*tax\s*=\s*\$(?P<amount>[\d,.]+)',
-            'service': r'service\s*fee\s*=\s*\$(?P<amount>[\d,.]+)',
-            'delivery': r'delivery\s*(?:&|and)\s*set-?up\s*fee\s*=\s*\$(?P<amount>[\d,.]+)',
-            'total': r'grand\s*total\s*=\s*\$(?P<amount>[\d,.]+)',
-            'flat_rate': r'(?P<item>.*?)\s*=\s*\$(?P<amount>[\d,.]+)',
-            'tbd': r'(?P<item>.*?)\s*=\s*(?:t\.b\.d\.|TBD)',
-        }
-        
-        # Process each line of the pricing section
-        for line in pricing_section.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Try to match each pattern
-            matched = False
-            
-            # Check for per-person charges first
-            match = re.match(patterns['per_person'], line, re.I)
-            if match:
-                pricing_details['per_person_charges'].append({
-                    'item': match.group('item').strip(),
-                    'price_per_person': float(match.group('price').replace(',', '')),
-                    'guest_count': int(match.group('guests')),
-                    'total': float(match.group('total').replace(',', '')),
-                    'line_item': line.strip()
-                })
-                matched = True
-                continue
-            
-            # Check for staff charges
-            match = re.match(patterns['staff'], line, re.I)
-            if match and 'guest' not in line.lower():
-                pricing_details['staff_charges'].append({
-                    'role': match.group('role').strip(),
-                    'rate': float(match.group('rate').replace(',', '')),
-                    'count': int(match.group('count')) if match.group('count') else 1,
-                    'total': float(match.group('total').replace(',', '')),
-                    'line_item': line.strip()
-                })
-                matched = True
-                continue
-            
-            # Check for tax
-            match = re.match(patterns['tax'], line, re.I)
-            if match:
-                pricing_details['summary']['tax_rate'] = float(match.group('rate'))
-                pricing_details['summary']['tax'] = float(match.group('amount').replace(',', ''))
-                matched = True
-                continue
-            
-            # Check for service fee
-            match = re.match(patterns['service'], line, re.I)
-            if match:
-                pricing_details['summary']['service_fee'] = float(match.group('amount').replace(',', ''))
-                matched = True
-                continue
-            
-            # Check for delivery fee
-            match = re.match(patterns['delivery'], line, re.I)
-            if match:
-                pricing_details['summary']['delivery_setup'] = float(match.group('amount').replace(',', ''))
-                matched = True
-                continue
-            
-            # Check for grand total
-            match = re.match(patterns['total'], line, re.I)
-            if match:
-                pricing_details['summary']['grand_total'] = float(match.group('amount').replace(',', ''))
-                matched = True
-                continue
-            
-            # Check for TBD items
-            match = re.match(patterns['tbd'], line, re.I)
-            if match:
-                pricing_details['additional_charges'].append({
-                    'item': match.group('item').strip(),
-                    'amount': 'TBD',
-                    'line_item': line.strip()
-                })
-                matched = True
-                continue
-            
-            # Check for flat rate items if no other patterns matched
-            if not matched:
-                match = re.match(patterns['flat_rate'], line, re.I)
-                if match:
-                    item = match.group('item').strip().lower()
-                    if not any(keyword in item for keyword in ['total', 'sub-total', 'service fee', 'tax']):
-                        pricing_details['flat_charges'].append({
-                            'item': match.group('item').strip(),
-                            'amount': float(match.group('amount').replace(',', '')),
-                            'line_item': line.strip()
-                        })
-        
-        return pricing_details
+        with metrics.span("extract_pricing_details"):
+            return self.extractor.extract_pricing_details(text)
 
     def extract_event_details(self, text, filename):
         """Extract comprehensive event details"""
-        # Enhanced patterns for event metadata
-        patterns = {
-            'price': [
-                r'\$[\d,]+(?:\.\d{2})?(?:\s*(?:per person|pp|p/p))?',
-                r'(?:price|cost|total):\s*\$[\d,]+(?:\.\d{2})?',
-                r'(?:per person|pp|p/p):\s*\$[\d,]+(?:\.\d{2})?'
-            ],
-            'date': [
-                r'(?:date:|on:?)\s*([\w\s,.&]+\d{2,4})',
-                r'(\d{1,2}[./]\d{1,2}[./]\d{2,4})',
-                r'([A-Z][a-z]+ \d{1,2}(?:st|nd|rd|th)?,? \d{4})'
-            ],
-            'time': [
-                r'(?:time[s]?:|at:?)\s*([^\n]+)',
-                r'(\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)(?:\s*-\s*\d{1,2}:\d{2}\s*(?:AM|PM|am|pm))?)'
-            ],
-            'guest_count': [
-                r'(?:guests?|people|attendees|count):\s*(\d+)',
-                r'(?:for|serving)\s+(\d+)\s+(?:people|guests|attendees)',
-                r'guests?:\s*([^\n]+)'  # Capture varying guest counts
-            ],
-            'location': [
-                r'(?:location|venue|place):\s*([^\n]+)'
-            ],
-            'setup_notes': [
-                r'(?:setup|set up|setup notes):\s*([^\n]+(?:\n(?!\w+:)[^\n]+)*)'
-            ],
-            'invoice_no': [
-                r'(?:invoice\s*(?:no|number|#)?:?\s*)([A-Z0-9]+)'
-            ],
-            'contact': [
-                r'(?:contact|contact person):\s*([^\n]+)'
-            ],
-            'email': [
-                r'(?:email|e-mail):\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-                r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-            ],
-            'phone': [
-                r'(?:phone|cell|tel):\s*([0-9.()-]+)',
-                r'(?:phone|cell|tel)[^:]*:\s*([^\n]+)'  # Capture phone with description
-            ]
-        }
-        
-        # Add specific pattern for event name
-        event_patterns = [
-            r'^(?:event|function|occasion):\s*(.+)$',
-            r'^(?:event|function|occasion)\s+name:\s*(.+)$',
-            r'(?:catering|menu)\s+for:\s*(.+)$'
-        ]
-        
-        # Initialize details dictionary
-        details = {
-            "event_name": "",
-            "date": None,
-            "time": None,
-            "guest_count": None,
-            "location": None,
-            "setup_notes": None,
-            "invoice_no": None,
-            "contact": None,
-            "email": None,
-            "phone": None,
-            "prices": [],
-            "menu_items": [],
-            "full_text": text
-        }
-        
-        # Extract event name - enhanced method
-        lines = text.split('\n')
-        event_name_found = False
-        
-        # First try explicit event patterns
-        for line in lines[:15]:  # Look in first 15 lines
-            line = line.strip()
-            for pattern in event_patterns:
-                match = re.match(pattern, line, re.I)
-                if match:
-                    details['event_name'] = match.group(1).strip()
-                    event_name_found = True
-                    break
-            if event_name_found:
-                break
-        
-        # If no explicit event name found, look for a suitable header
-        if not event_name_found:
-            for line in lines[:10]:
-                line = line.strip()
-                # Look for lines that might be event names
-                if (len(line) > 10 and 
-                    not any(p in line.lower() for p in ['date:', 'time:', 'price:', 'location:', 'menu:', 'contact:']) and
-                    not line.startswith('$') and
-                    not re.match(r'^\d+', line)):
-                    details['event_name'] = line
-                    break
-        
-        # If still no event name, use filename
-        if not details['event_name']:
-            details['event_name'] = filename.replace('.pdf', '').replace('_', ' ').title()
-        
-        # Create searchable variations of the event name
-        details['event_name_variations'] = [
-            details['event_name'],
-            details['event_name'].lower(),
-            re.sub(r'[^\w\s]', '', details['event_name']).lower(),  # Remove punctuation
-            ' '.join(word for word in details['event_name'].split() if len(word) > 2)  # Key words only
-        ]
-        
-        # Extract all metadata using patterns
-        for field, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
-                for match in matches:
-                    if field == 'price':
-                        details['prices'].append(match.group())
-                    elif field == 'setup_notes':
-                        # Capture multiline setup notes
-                        setup_text = match.group(1)
-                        details['setup_notes'] = setup_text.strip()
-                    else:
-                        if not details[field]:  # Only capture first match for non-price fields
-                            details[field] = match.group(1).strip()
-        
-        # Extract menu items
-        menu_section = False
-        current_section = ""
-        menu_sections = {}
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Detect menu section headers
-            if re.search(r'menu|breakfast|lunch|dinner|appetizers|entrees|desserts|beverages', line, re.I):
-                menu_section = True
-                current_section = line
-                menu_sections[current_section] = []
-            elif menu_section and not line.startswith(('$', 'Price', 'Total', 'Contact', 'Phone', 'Email')):
-                if current_section in menu_sections:
-                    menu_sections[current_section].append(line)
-        
-        # Format menu items with sections
-        details['menu_items'] = menu_sections
-        
-        # Add pricing details extraction
-        pricing_details = self.extract_pricing_details(text)
-        details['pricing_breakdown'] = pricing_details
-        
-        return details
+        with metrics.span("extract_event_details"):
+            return self.extractor.extract_event_details(text, filename)
 
     def extract_food_items(self, text):
         """Extract individual food items with their descriptions"""
-        food_items = []
-        lines = text.split('\n')
-        current_item = None
-        current_description = []
-        menu_section = None
-        
-        # Patterns to identify menu sections and items
-        section_pattern = r'^(?:menu|breakfast|lunch|dinner|appetizers?|entree?s|desserts?|beverages?|hors\s+d\'oeuvres)s?:?\s*$'
-        
-        # Pattern to identify likely food item headers (capitalized, no pricing)
-        item_header_pattern = r'^[A-Z][A-Za-z\s&-]+$'
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                # Process any pending item before moving on
-                if current_item and current_description:
-                    food_items.append({
-                        'name': current_item,
-                        'description': ' '.join(current_description),
-                        'section': menu_section,
-                        'source_text': f"{current_item}\n{' '.join(current_description)}"
-                    })
-                    current_item = None
-                    current_description = []
-                continue
-            
-            # Check for menu section headers
-            if re.match(section_pattern, line, re.I):
-                menu_section = line.strip(':').title()
-                continue
-            
-            # Check if this line looks like a food item header
-            if re.match(item_header_pattern, line) and len(line) > 3 and not any(char.isdigit() for char in line):
-                # Process any pending item before starting new one
-                if current_item and current_description:
-                    food_items.append({
-                        'name': current_item,
-                        'description': ' '.join(current_description),
-                        'section': menu_section,
-                        'source_text': f"{current_item}\n{' '.join(current_description)}"
-                    })
-                current_item = line
-                current_description = []
-            elif current_item:
-                # If we have a current item, this line is part of its description
-                # Ignore lines that look like pricing
-                if not re.match(r'^[\s]*\$?\d+', line) and not re.match(r'^total|^tax|^service', line.lower()):
-                    current_description.append(line)
-        
-        # Don't forget to add the last item if there is one
-        if current_item and current_description:
-            food_items.append({
-                'name': current_item,
-                'description': ' '.join(current_description),
-                'section': menu_section,
-                'source_text': f"{current_item}\n{' '.join(current_description)}"
-            })
-        
-        return food_items
+        with metrics.span("extract_food_items"):
+            return self.extractor.extract_food_items(text)
 
     def create_documents(self, event_details):
-        """Create documents with enhanced metadata including individual food items"""
+        """Create the event documents for one invoice.
+
+        Food items are embedded separately, once per canonical dish (see
+        FoodCatalog), rather than once per dish per event.
+        """
+        with metrics.span("create_documents"):
+            return self._create_documents(event_details)
+
+    def _create_documents(self, event_details):
         documents = []
         
         # Create main event document
@@ -512,140 +225,303 @@ Menu Items:
         )
         documents.append(details_doc)
         
-        # Add new documents for individual food items
-        food_items = self.extract_food_items(event_details["full_text"])
-        
-        for item in food_items:
-            item_doc = Document(
-                page_content=f"""
-Food Item: {item['name']}
-Section: {item['section'] or 'General Menu'}
-Description: {item['description']}
-
-This item appeared in the menu for: {event_details['event_name']}
-Event Date: {event_details['date'] or 'Not specified'}
-Event Type: {item['section'] or 'Not specified'}
-""",
-                metadata={
-                    "document_type": "food_item",
-                    "item_name": item['name'],
-                    "menu_section": item['section'],
-                    "source_event": event_details['event_name'],
-                    "event_date": event_details['date'],
-                    "full_description": item['description'],
-                    "original_text": item['source_text']
-                }
-            )
-            documents.append(item_doc)
-        
         return documents
 
+    def download_pdf(self, file):
+        """Download a listed file straight into memory"""
+        with metrics.span("download"):
+            data = self.source.download(file)
+        metrics.incr("downloaded_bytes", len(data))
+        return data
+
     def extract_text_from_pdf(self, file):
-        """Extract text content from a PDF file"""
-        try:
-            # Download the file content
-            print(f"Downloading content for {file['title']}...")
-            file.GetContentFile('temp.pdf')
-            
-            # Read the downloaded file
-            print(f"Reading PDF content for {file['title']}...")
-            with open('temp.pdf', 'rb') as pdf_file:
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                text = ""
-                total_pages = len(pdf_reader.pages)
-                print(f"Found {total_pages} pages in {file['title']}")
-                
-                for i, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        text += page_text + "\n"
-                        print(f"Extracted {len(page_text)} characters from page {i+1}")
-                    except Exception as e:
-                        print(f"Error extracting text from page {i+1}: {str(e)}")
-            
-            # Clean up the temporary file
-            os.remove('temp.pdf')
-            return text
-            
-        except Exception as e:
-            print(f"Error processing PDF {file['title']}: {str(e)}")
-            return ""
+        """Extract text content from a PDF file, or from the text cache if it has this revision.
 
-    def process_all_pdfs(self):
-        """Process PDFs and create enhanced embeddings"""
-        self.authenticate_google_drive()
-        pdf_files = self.get_pdf_files()
-        
-        print(f"Found {len(pdf_files)} PDF files in the specified folder")
-        if len(pdf_files) == 0:
-            raise Exception(f"No PDF files found in folder ID: {DRIVE_FOLDER_ID}")
-        
-        all_documents = []
-        event_summaries = []
-        food_item_catalog = []  # New list to track all food items
-        
+        Download and read errors are raised, so a failed file is never
+        mistaken for one without text.
+        """
+        pages = self.text_cache.get(file)
+        if pages is not None:
+            print(f"Using cached text for {file['title']}")
+            return pdf_extraction.join_pages(pages)
+        # Download the file content
+        print(f"Downloading content for {file['title']}...")
+        data = self.download_pdf(file)
+        
+        # Read the downloaded file
+        print(f"Reading PDF content for {file['title']}...")
+        with metrics.span("pdf_parse"):
+            pages = pdf_extraction.extract_pdf_pages(data)
+        metrics.incr("pdf_pages", len(pages))
+        print(f"Extracted {sum(len(page) for page in pages)} characters "
+              f"from {len(pages)} pages in {file['title']}")
+        self.text_cache.put(file, pages)
+        return pdf_extraction.join_pages(pages)
+
+    def _extract_files(self, pdf_files, pipeline=None):
+        """Yield (pdf_file, parsed, error) for each file in listing order"""
+        if pipeline is not None:
+            for pdf_file, parsed, error in pipeline.run(pdf_files, self.download_pdf, self.text_cache.get):
+                if parsed is not None:
+                    self.text_cache.put(pdf_file, parsed['pages'])
+                elif error is None:
+                    # No text at all; cached so --re-extract finds every file in the manifest
+                    self.text_cache.put(pdf_file, [])
+                yield pdf_file, parsed, error
+            return
         for pdf_file in pdf_files:
-            print(f"Processing file: {pdf_file['title']}")
             try:
                 text = self.extract_text_from_pdf(pdf_file)
+                parsed = None
                 if text.strip():
-                    event_details = self.extract_event_details(text, pdf_file['title'])
+                    with metrics.span("extract"):
+                        parsed = pdf_extraction.parse_text(text, pdf_file['title'])
+                yield pdf_file, parsed, None
+            except Exception as e:
+                yield pdf_file, None, e
+
+    def process_all_pdfs(self, full_rebuild=False, pipeline=None, scheduler=None,
+                         index_spec=None, retain_versions=DEFAULT_RETAIN):
+        """Process new and changed PDFs and update the embeddings incrementally
+
+        Pass an `IngestPipeline` to overlap downloads and parsing across worker
+        pools; otherwise files are downloaded and parsed one at a time.
+        `scheduler` is the `EmbeddingScheduler` used for the embedding stage.
+        `index_spec` (see ann_index) is the FAISS index type of new partitions,
+        by default the type the live index was built with (flat for a new
+        one), also across full rebuilds; pass `full_rebuild` with a different
+        spec to change the type of existing partitions.
+        Each run publishes a new index version (see index_versions) and keeps
+        the newest `retain_versions` on disk.
+        """
+        with metrics.trace("ingest"):
+            return self._process_all_pdfs(full_rebuild, pipeline, scheduler, index_spec, retain_versions)
+
+    def _process_all_pdfs(self, full_rebuild=False, pipeline=None, scheduler=None,
+                          index_spec=None, retain_versions=DEFAULT_RETAIN):
+        if self.gauth is not None:
+            self.authenticate_google_drive()
+        
+        manifest = IngestManifest()
+        index_versions = IndexVersions(retain=retain_versions)
+        if index_spec is None:
+            # Keep the type of the live index, including across full rebuilds
+            live_path = index_versions.current_path()
+            index_spec = (live_path and PartitionedVectorStore.stored_index_spec(live_path)) or DEFAULT_INDEX_SPEC
+        print(f"Index type: {index_spec}")
+        # Without a manifest we cannot map old vectors back to files
+        if (full_rebuild or not manifest.exists() or not index_versions.exists()
+                or not EventStore.exists() or not FoodCatalog.exists()
+                or not CatalogFile.food_items().exists()):
+            full_rebuild = True
+            manifest.clear()
+        
+        base_pricing_checksum = IngestManifest.checksum(BASE_PRICING)
+        pricing_changed = base_pricing_checksum != manifest.base_pricing_checksum
+        
+        # Files are extracted as the listing streams in; deletions are only
+        # known once the whole listing has been seen
+        listed_ids = set()
+        changed_files = CountingIterator(manifest.changed(self.iter_pdf_files(), listed_ids))
+        
+        new_documents = []
+        new_doc_ids = []
+        event_summaries = []
+        food_item_records = []  # Every dish of every new or changed invoice
+        event_records = []  # (file id, event details) for the event store
+        processed_files = []
+        empty_file_ids = []  # Files without text, recorded so they are skipped until they change
+        
+        for pdf_file, parsed, error in self._extract_files(changed_files, pipeline):
+            print(f"Processing file: {pdf_file['title']}")
+            try:
+                if error is not None:
+                    raise error
+                if parsed:
+                    event_details = parsed['event_details']
                     documents = self.create_documents(event_details)
-                    all_documents.extend(documents)
+                    doc_ids = [f"{pdf_file['id']}:{i}" for i in range(len(documents))]
+                    new_documents.extend(documents)
+                    new_doc_ids.extend(doc_ids)
                     
-                    # Extract and catalog food items
-                    food_items = self.extract_food_items(text)
-                    food_item_catalog.extend([{
-                        "item_name": item['name'],
-                        "description": item['description'],
-                        "section": item['section'],
-                        "source_event": event_details['event_name'],
-                        "event_date": event_details['date']
-                    } for item in food_items])
+                    # Catalog food items
+                    food_items = parsed['food_items']
+                    food_item_records.extend(
+                        FoodItemRecord(item['name'], item['description'], item['section'],
+                                       event_details['event_name'], event_details['date'], pdf_file['id'])
+                        for item in food_items
+                    )
                     
-                    # Create summary for this event
-                    summary = {
-                        "event_name": event_details["event_name"],
-                        "date": event_details["date"],
-                        "prices": event_details["prices"],
-                        "guest_count": event_details["guest_count"],
-                        "menu_items": event_details["menu_items"],
-                        "food_items": food_items  # Add individual food items to summary
-                    }
-                    event_summaries.append(summary)
+                    # Summary for this event; its dishes are found by file id in the food items catalog
+                    event_summaries.append(EventSummary(
+                        event_details["event_name"], event_details["date"], event_details["guest_count"],
+                        event_details["prices"], event_details["menu_items"], len(food_items), pdf_file['id']
+                    ))
+                    event_records.append((pdf_file['id'], event_details))
+                    processed_files.append((pdf_file, doc_ids))
                     
                     print(f"Created {len(documents)} documents for {pdf_file['title']}")
                     print(f"Found {len(food_items)} individual food items")
+                else:
+                    # e.g. a scanned invoice; anything an earlier revision produced is dropped
+                    print(f"No text extracted from {pdf_file['title']}")
+                    empty_file_ids.append(pdf_file['id'])
+                    processed_files.append((pdf_file, []))
             except Exception as e:
+                # Leave the manifest entry untouched so the file is retried next run
                 print(f"Error processing {pdf_file['title']}: {str(e)}")
         
-        if not all_documents:
-            raise Exception("No documents were created from the PDF files")
-        
-        # Save event summaries and food item catalog
-        with open('event_summaries.json', 'w') as f:
-            json.dump(event_summaries, f, indent=2)
+        print(f"Found {len(listed_ids)} PDF files in the specified folder")
+        if not listed_ids:
+            raise Exception(f"No PDF files found in {self.source.location}")
+        deleted_ids = manifest.deleted(listed_ids)
+        print(f"{changed_files.count} new or changed files, {len(deleted_ids)} deleted, "
+              f"{len(listed_ids) - changed_files.count} unchanged")
         
-        with open('food_items_catalog.json', 'w') as f:
-            json.dump(food_item_catalog, f, indent=2)
+        if not changed_files.count and not deleted_ids and not pricing_changed:
+            print("Index is already up to date")
+            if not PricingCube.exists():
+                self._build_pricing_cube(EventStore())
+            return PartitionedVectorStore.load(index_versions.current_path(), self.embeddings)
         
         # Add base pricing document
-        base_pricing_doc = Document(
-            page_content=f"Base Menu Pricing:\n{json.dumps(BASE_PRICING, indent=2)}",
-            metadata={"document_type": "base_pricing"}
+        if pricing_changed:
+            base_pricing_doc = Document(
+                page_content=f"Base Menu Pricing:\n{json.dumps(BASE_PRICING, indent=2)}",
+                metadata={"document_type": "base_pricing"}
+            )
+            new_documents.append(base_pricing_doc)
+            new_doc_ids.append("base_pricing")
+        
+        # Vectors to drop: everything from re-processed and deleted files
+        replaced_ids = {pdf_file['id'] for pdf_file, _ in processed_files}
+        stale_doc_ids = []
+        for file_id in list(replaced_ids) + deleted_ids:
+            stale_doc_ids.extend(manifest.doc_ids(file_id))
+        if pricing_changed:
+            stale_doc_ids.append("base_pricing")
+        
+        # A dish served at many events is embedded once, as a canonical item
+        dropped_ids = replaced_ids.union(deleted_ids)
+        food_items_file = CatalogFile.food_items()
+        food_item_records = list(self._patched_records(
+            food_items_file, food_item_records, dropped_ids, full_rebuild
+        ))
+        with metrics.span("food_catalog"):
+            food_catalog = FoodCatalog.build(food_item_records)
+        changed_items, stale_item_ids, updated_items = food_catalog.diff(
+            FoodCatalog() if full_rebuild else FoodCatalog.load()
         )
-        all_documents.append(base_pricing_doc)
+        print(f"Merged {len(food_item_records)} food item records into {len(food_catalog.items)} "
+              f"canonical items ({len(changed_items)} new or changed, {len(updated_items)} with new usage)")
+        for item in changed_items:
+            new_documents.append(FoodCatalog.document(item))
+            new_doc_ids.append(FoodCatalog.doc_id(item))
+        stale_doc_ids.extend(stale_item_ids)
+        
+        if full_rebuild and not new_documents:
+            raise Exception("No documents were created from the PDF files")
         
-        print(f"Creating vector store with {len(all_documents)} documents")
-        vector_store = FAISS.from_documents(all_documents, self.embeddings)
-        vector_store.save_local("faiss_index")
+        # Embed in token-sized batches before touching the index
+        scheduler = scheduler or EmbeddingScheduler(self.embeddings)
+        texts = [doc.page_content for doc in new_documents]
+        with metrics.span("embed"):
+            text_embeddings = list(zip(texts, scheduler.embed(texts)))
+        metrics.incr("documents_embedded", len(texts))
+        metadatas = [doc.metadata for doc in new_documents]
+        
+        if full_rebuild:
+            print(f"Creating vector store with {len(new_documents)} documents")
+            vector_store = PartitionedVectorStore(self.embeddings, index_spec=index_spec)
+        else:
+            with metrics.span("index_load"):
+                vector_store = PartitionedVectorStore.load(
+                    index_versions.current_path(), self.embeddings, index_spec=index_spec
+                )
+            existing_ids = vector_store.doc_ids()
+            stale_doc_ids = [doc_id for doc_id in stale_doc_ids if doc_id in existing_ids]
+            if stale_doc_ids:
+                print(f"Removing {len(stale_doc_ids)} stale documents from vector store")
+                vector_store.delete(stale_doc_ids)
+            # Dishes whose text is unchanged keep their vectors; only usage metadata is rewritten
+            updated_documents = {FoodCatalog.doc_id(item): FoodCatalog.document(item) for item in updated_items}
+            if updated_documents:
+                vector_store.update_documents(updated_documents)
+            if new_documents:
+                print(f"Adding {len(new_documents)} documents to vector store")
+        # Each document_type gets its own index partition
+        with metrics.span("index_build"):
+            vector_store.add_embeddings(text_embeddings, metadatas, new_doc_ids)
+        # Saved as a new version; the live one is never written to
+        with metrics.span("index_save"):
+            version_path = index_versions.create()
+            vector_store.save(version_path)
+            index_versions.publish(version_path)
+            index_versions.collect_garbage()
+        scheduler.clear_checkpoints()
+        if hasattr(self.embeddings, 'stats'):
+            print(f"Embedding cache: {self.embeddings.stats()}")
+        
+        # Patch event summaries and save the food item catalogs
+        summaries_file = CatalogFile.event_summaries()
+        summaries_file.write(self._patched_records(summaries_file, event_summaries, dropped_ids, full_rebuild))
+        food_items_file.write(food_item_records)
+        food_catalog.save()
+        
+        # Structured copy of every event for exact lookups
+        with metrics.span("event_store_write"):
+            event_store = EventStore()
+            if full_rebuild:
+                event_store.clear()
+            else:
+                event_store.delete_files(deleted_ids + empty_file_ids)
+            for file_id, event_details in event_records:
+                event_store.replace_file(file_id, event_details)
+        self._build_pricing_cube(event_store)
+        
+        # Only record progress once the index is safely on disk
+        for file_id in deleted_ids:
+            manifest.remove(file_id)
+        for pdf_file, doc_ids in processed_files:
+            manifest.record(pdf_file, doc_ids)
+        manifest.base_pricing_checksum = base_pricing_checksum
+        manifest.save()
+        self.text_cache.retain(listed_ids)
+        print(f"Text cache: {self.text_cache.stats()}")
         return vector_store
 
+    def _build_pricing_cube(self, event_store):
+        """Recompute the pricing statistics from every event in the store"""
+        with metrics.span("pricing_cube"):
+            cube = PricingCube.build(event_store.all_events())
+            cube.save()
+        print(f"Pricing cube: {len(cube.price)} per-guest charges from {len(cube.event_guests)} priced events")
+
+    def _patched_records(self, catalog_file, new_records, dropped_file_ids, full_rebuild):
+        """Stream a catalog's records with those of re-processed/deleted files replaced"""
+        if not full_rebuild:
+            for record in catalog_file:
+                if record.source_file_id not in dropped_file_ids:
+                    yield record
+        yield from new_records
+
     def get_pdf_files(self):
-        """Get all PDF files from the specified Google Drive folder"""
-        query = f"'{DRIVE_FOLDER_ID}' in parents and mimeType='application/pdf'"
-        file_list = self.drive.ListFile({'q': query}).GetList()
-        return file_list
+        """Get all PDF files from the document source"""
+        with metrics.span("list_files"):
+            return self.source.list_files()
+
+    def iter_pdf_files(self):
+        """Yield PDF files from the document source as they are listed"""
+        listing = iter(self.source.iter_files())
+        seconds = 0.0
+        while True:
+            start = time.perf_counter()
+            pdf_file = next(listing, None)
+            seconds += time.perf_counter() - start
+            if pdf_file is None:
+                break
+            yield pdf_file
+        metrics.record("list_files", seconds)
 
     def authenticate_google_drive(self):
         """Authenticate with Google Drive"""
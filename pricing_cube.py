@@ -0,0 +1,499 @@
+"""Precomputed pricing statistics over every ingested invoice.
+
+Ingestion rebuilds the cube from the event store into a NumPy archive
+(`pricing_cube.npz`). Per-guest charges are stored one row per charge and
+fees and totals one row per event. Each row is tagged with a service type,
+a guest-count bucket, a month and the menu sections the event served.
+
+Percentiles, and monthly medians of the per-guest price, are precomputed
+for every combination of service type, menu section and contiguous range of
+guest-count buckets. That makes "what do we usually charge per guest for
+hot lunch at 100+ guests" a dictionary lookup. Filters that do not line up
+with a precomputed cell (a year, a guest range between bucket edges) are
+computed from the columns, which is still well under a millisecond.
+"""
+import os
+import re
+import numpy as np
+from event_store import normalize_name, parse_event_date
+from quote_engine import SERVICE_KEYWORDS, DRINK_PATTERN, service_type
+
+PRICING_CUBE_FILE = "pricing_cube.npz"
+
+# Guest-count bucket i holds counts in [edges[i], edges[i + 1])
+GUEST_BUCKET_EDGES = (0, 25, 50, 100, 200)
+PERCENTILES = (10, 25, 50, 75, 90)
+STAT_FIELDS = ("count", "events", "mean", "min", "p10", "p25", "p50", "p75", "p90", "max")
+
+PRICE_METRIC = "price_per_guest"
+# Per-event metrics, in column order: name -> (label, unit)
+EVENT_METRICS = {
+    "total_per_guest": ("Grand total per guest", "money"),
+    "service_fee_pct": ("Service fee (share of charges)", "percent"),
+    "staff_cost_pct": ("Staff cost (share of charges)", "percent"),
+    "tax_rate": ("Tax rate", "percent"),
+    "delivery_fee": ("Delivery & setup fee", "money"),
+}
+# Query phrases for each metric, matched as whole words (plural too) on the
+# normalized query and checked in order, so specific phrases win over the
+# generic "fee"; anything else is the per-guest price
+METRIC_KEYWORDS = [
+    ("service_fee_pct", ["service fee", "service charge", "gratuity"]),
+    ("delivery_fee", ["delivery fee", "setup fee", "set-up fee", "delivery"]),
+    ("staff_cost_pct", ["staff", "labor", "labour", "server", "bartender"]),
+    ("tax_rate", ["tax"]),
+    ("total_per_guest", ["grand total", "total per", "all-in", "all in", "overall cost"]),
+    ("service_fee_pct", ["fee"]),
+]
+METRIC_PATTERNS = [
+    (name, re.compile(r'\b(?:%s)(?:e?s)?\b' % '|'.join(re.escape(normalize_name(k)) for k in keywords)))
+    for name, keywords in METRIC_KEYWORDS
+]
+TREND_KEYWORDS = ["trend", "over time", "by month", "per month", "monthly", "changed", "changing",
+                  "going up", "gone up", "increase", "over the year"]
+
+# Menu sections get precomputed cells when at least this many events served them
+MIN_SECTION_EVENTS = 3
+MAX_CUBE_SECTIONS = 40
+
+GUEST_WORDS = r'(?:people|guests?|persons|attendees|pax|ppl|heads)'
+GUEST_PATTERNS = [
+    ("range", re.compile(rf'(?:between\s+)?(\d+)\s*(?:-|–|to|and)\s*(\d+)\s*{GUEST_WORDS}', re.I)),
+    ("at_least", re.compile(rf'(?<![\d$.,])(\d+)\s*\+\s*{GUEST_WORDS}?', re.I)),
+    ("at_least", re.compile(rf'(?:over|more than|above|at least|upwards of|>=?)\s*(\d+)\s*{GUEST_WORDS}', re.I)),
+    ("at_most", re.compile(rf'(?:under|fewer than|less than|below|up to|at most|<=?)\s*(\d+)\s*{GUEST_WORDS}', re.I)),
+    ("about", re.compile(rf'(\d+)\s*{GUEST_WORDS}', re.I)),
+]
+YEAR_PATTERNS = [
+    ("in", re.compile(r'\b(?:in|during|for)\s+(20\d\d)\b', re.I)),
+    ("since", re.compile(r'\b(?:since|after|from)\s+(20\d\d)\b', re.I)),
+    ("before", re.compile(r'\b(?:before|until|prior to)\s+(20\d\d)\b', re.I)),
+]
+
+
+def guest_bucket(guests):
+    return int(np.searchsorted(GUEST_BUCKET_EDGES, guests, side='right')) - 1
+
+
+def _stats(values, event_ids=None):
+    """STAT_FIELDS for `values`, ignoring NaNs (all NaN when nothing is left)"""
+    keep = ~np.isnan(values)
+    values = values[keep]
+    if not len(values):
+        return np.full(len(STAT_FIELDS), np.nan)
+    events = len(np.unique(event_ids[keep])) if event_ids is not None else len(values)
+    return np.concatenate((
+        [len(values), events, values.mean(), values.min()],
+        np.percentile(values, PERCENTILES),
+        [values.max()]
+    ))
+
+
+def _monthly_medians(months, prices):
+    """(months, medians, counts) of rows sorted by (month, price); month 0 (undated) is skipped"""
+    dated = months > 0
+    months, prices = months[dated], prices[dated]
+    if not len(months):
+        return np.zeros(0, np.int32), np.zeros(0), np.zeros(0, np.int32)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(months)) + 1))
+    counts = np.diff(np.concatenate((starts, [len(months)])))
+    # Prices are sorted within each month, so medians are just positions
+    medians = (prices[starts + (counts - 1) // 2] + prices[starts + counts // 2]) / 2
+    return months[starts], medians, counts
+
+
+class PricingCube:
+    """Pricing distributions by service type, menu section, guest count and month"""
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        for name, values in arrays.items():
+            setattr(self, name, values)
+        self.services = [str(label) for label in arrays["services"]]
+        self.sections = [str(label) for label in arrays["sections"]]
+        self._service_codes = {label: i for i, label in enumerate(self.services)}
+        self._section_codes = {normalize_name(label): i for i, label in enumerate(self.sections)}
+        # Sections a query may name: one-off headings are usually extraction noise
+        served = self.event_sections.sum(axis=0)
+        self._query_sections = sorted((label for label, count in zip(self.sections, served)
+                                       if count >= MIN_SECTION_EVENTS), key=len, reverse=True)
+        self._cells = {tuple(int(v) for v in key): i for i, key in enumerate(arrays["cell_keys"])}
+
+    @classmethod
+    def build(cls, events):
+        """Cube over event store records (EventStore.all_events)"""
+        services, sections = {}, {}
+        price_rows, event_rows, event_services, event_sections = [], [], [], []
+        for event in events:
+            charges = [row for row in event['pricing_items']
+                       if row['kind'] == 'per_person' and row['unit_price']]
+            if not charges:
+                continue  # Nothing to learn about prices from this invoice
+            event_id = len(event_rows)
+            guests = max(row['quantity'] or 0 for row in charges)
+            if not guests and event['guest_count']:
+                digits = re.search(r'\d+', str(event['guest_count']))
+                guests = int(digits.group()) if digits else 0
+            date = parse_event_date(event['date'])
+            month = date.year * 100 + date.month if date else 0
+
+            codes = set()
+            for row in charges:
+                code = services.setdefault(service_type(row['item']), len(services))
+                codes.add(code)
+                price_rows.append((row['unit_price'], row['quantity'] or guests, code, month, event_id))
+            event_services.append(codes)
+            event_sections.append({
+                sections.setdefault(normalize_name(section), (len(sections), section))[0]
+                for section, _ in event['menu_sections'] if normalize_name(section)
+            })
+
+            amounts = [row['amount'] for row in event['pricing_items'] if isinstance(row['amount'], (int, float))]
+            line_total = sum(amounts)
+            staff_total = sum(row['amount'] or 0 for row in event['pricing_items'] if row['kind'] == 'staff')
+            metrics = {
+                "total_per_guest": event['grand_total'] / guests if event['grand_total'] and guests else None,
+                "service_fee_pct": 100 * event['service_fee'] / line_total if event['service_fee'] and line_total else None,
+                "staff_cost_pct": 100 * staff_total / line_total if staff_total and line_total else None,
+                "tax_rate": event['tax_rate'],
+                "delivery_fee": event['delivery_setup'],
+            }
+            event_rows.append((guests, month, [np.nan if metrics[name] is None else metrics[name]
+                                               for name in EVENT_METRICS]))
+
+        # Charges sorted by (month, price), for monthly medians by position
+        price_rows.sort(key=lambda row: (row[3], row[0]))
+        membership = lambda rows, width: np.array(
+            [[code in codes for code in range(width)] for codes in rows], dtype=bool
+        ).reshape(len(rows), width)
+        section_labels = [label for _, label in sorted(sections.values())]
+        guests = np.array([row[1] for row in price_rows], dtype=np.int32)
+        event_guests = np.array([row[0] for row in event_rows], dtype=np.int32)
+        arrays = {
+            "services": np.array(list(services), dtype=str),
+            "sections": np.array(section_labels, dtype=str),
+            "price": np.array([row[0] for row in price_rows], dtype=np.float64),
+            "guests": guests,
+            "bucket": np.searchsorted(GUEST_BUCKET_EDGES, guests, side='right').astype(np.int8) - 1,
+            "service": np.array([row[2] for row in price_rows], dtype=np.int16),
+            "month": np.array([row[3] for row in price_rows], dtype=np.int32),
+            "event": np.array([row[4] for row in price_rows], dtype=np.int32),
+            "event_guests": event_guests,
+            "event_bucket": np.searchsorted(GUEST_BUCKET_EDGES, event_guests, side='right').astype(np.int8) - 1,
+            "event_month": np.array([row[1] for row in event_rows], dtype=np.int32),
+            "event_metrics": np.array([row[2] for row in event_rows], dtype=np.float64).reshape(
+                len(event_rows), len(EVENT_METRICS)),
+            "event_services": membership(event_services, len(services)),
+            "event_sections": membership(event_sections, len(sections)),
+        }
+        arrays.update(cls._precompute(arrays))
+        return cls(arrays)
+
+    @staticmethod
+    def _precompute(a):
+        """Statistics for every (service, section, bucket range) cell with data; -1 means any"""
+        n_buckets = len(GUEST_BUCKET_EDGES)
+        ranges = [(lo, hi) for lo in range(n_buckets) for hi in range(lo, n_buckets)]
+        section_events = a["event_sections"].sum(axis=0)
+        cube_sections = [int(i) for i in np.argsort(-section_events, kind='stable')[:MAX_CUBE_SECTIONS]
+                         if section_events[i] >= MIN_SECTION_EVENTS]
+        all_events = np.ones(len(a["event_guests"]), dtype=bool)
+        all_rows = np.ones(len(a["price"]), dtype=bool)
+
+        keys, price_stats, metric_stats = [], [], []
+        trend_offsets, trend_months, trend_medians, trend_counts = [0], [], [], []
+        for service in [-1] + list(range(len(a["services"]))):
+            service_events = all_events if service < 0 else a["event_services"][:, service]
+            service_rows = all_rows if service < 0 else a["service"] == service
+            for section in [-1] + cube_sections:
+                events = service_events if section < 0 else service_events & a["event_sections"][:, section]
+                if not events.any():
+                    continue
+                rows = service_rows if section < 0 else service_rows & a["event_sections"][a["event"], section]
+                for lo, hi in ranges:
+                    event_mask = events & (a["event_bucket"] >= lo) & (a["event_bucket"] <= hi)
+                    if not event_mask.any():
+                        continue
+                    row_mask = rows & (a["bucket"] >= lo) & (a["bucket"] <= hi)
+                    keys.append((service, section, lo, hi))
+                    price_stats.append(_stats(a["price"][row_mask], a["event"][row_mask]))
+                    metric_stats.append([_stats(column) for column in a["event_metrics"][event_mask].T])
+                    months, medians, counts = _monthly_medians(a["month"][row_mask], a["price"][row_mask])
+                    trend_months.extend(months)
+                    trend_medians.extend(medians)
+                    trend_counts.extend(counts)
+                    trend_offsets.append(len(trend_months))
+        return {
+            "cell_keys": np.array(keys, dtype=np.int32).reshape(len(keys), 4),
+            "cell_price_stats": np.array(price_stats, dtype=np.float64).reshape(len(keys), len(STAT_FIELDS)),
+            "cell_metric_stats": np.array(metric_stats, dtype=np.float64).reshape(
+                len(keys), len(EVENT_METRICS), len(STAT_FIELDS)),
+            "trend_offsets": np.array(trend_offsets, dtype=np.int64),
+            "trend_months": np.array(trend_months, dtype=np.int32),
+            "trend_medians": np.array(trend_medians, dtype=np.float64),
+            "trend_counts": np.array(trend_counts, dtype=np.int32),
+        }
+
+    @staticmethod
+    def exists(path=PRICING_CUBE_FILE):
+        return os.path.exists(path)
+
+    @staticmethod
+    def version(path=PRICING_CUBE_FILE):
+        """Changes whenever ingestion rewrites the cube; None if there is none"""
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def save(self, path=PRICING_CUBE_FILE):
+        # Swapped in whole: a reader loads the previous cube or this one
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **self.arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=PRICING_CUBE_FILE):
+        """The saved cube, or None before ingestion has built one"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def _codes(self, service_type, section):
+        """Codes for the filters (-1 for any); None if a filter names something never seen"""
+        service = -1 if service_type is None else self._service_codes.get(service_type)
+        section = -1 if section is None else self._section_codes.get(normalize_name(section))
+        if service is None or section is None:
+            return None
+        return service, section
+
+    @staticmethod
+    def _bucket_range(guests):
+        """(lo, hi) bucket indexes exactly covering an inclusive guest range, or None"""
+        low, high = guests or (None, None)
+        edges = GUEST_BUCKET_EDGES
+        lo = 0 if low is None else guest_bucket(low)
+        hi = len(edges) - 1 if high is None else guest_bucket(high)
+        if low is not None and low != edges[lo]:
+            return None
+        if high is not None and (hi + 1 >= len(edges) or high + 1 != edges[hi + 1]):
+            return None
+        return lo, hi
+
+    def _cell(self, codes, guests, months):
+        if codes is None or months is not None:
+            return None
+        bucket_range = self._bucket_range(guests)
+        if bucket_range is None:
+            return None
+        return self._cells.get(codes + bucket_range)
+
+    def _masks(self, codes, guests, months):
+        """Row and event masks for filters no precomputed cell answers"""
+        service, section = codes
+        low, high = guests or (None, None)
+        since, until = months or (None, None)
+        rows = np.ones(len(self.price), dtype=bool)
+        events = np.ones(len(self.event_guests), dtype=bool)
+        if service >= 0:
+            rows &= self.service == service
+            events &= self.event_services[:, service]
+        if section >= 0:
+            rows &= self.event_sections[self.event, section]
+            events &= self.event_sections[:, section]
+        for column, event_column, bound, compare in (
+            (self.guests, self.event_guests, low, np.greater_equal),
+            (self.guests, self.event_guests, high, np.less_equal),
+            (self.month, self.event_month, since, np.greater_equal),
+            (self.month, self.event_month, until, np.less_equal),
+        ):
+            if bound is not None:
+                rows &= compare(column, bound)
+                events &= compare(event_column, bound)
+        if months is not None:
+            rows &= self.month > 0
+            events &= self.event_month > 0
+        return rows, events
+
+    def stats(self, metric=PRICE_METRIC, service_type=None, section=None, guests=None, months=None):
+        """Distribution of `metric` as a dict of STAT_FIELDS, or None if nothing matches.
+
+        `metric` is PRICE_METRIC (one value per per-guest charge) or an
+        EVENT_METRICS name (one value per event). `guests` and `months` are
+        inclusive (low, high) ranges, either end None; months are YYYYMM.
+        """
+        codes = self._codes(service_type, section)
+        if codes is None:
+            return None
+        cell = self._cell(codes, guests, months)
+        if cell is not None:
+            values = (self.cell_price_stats[cell] if metric == PRICE_METRIC
+                      else self.cell_metric_stats[cell, list(EVENT_METRICS).index(metric)])
+        else:
+            rows, events = self._masks(codes, guests, months)
+            if metric == PRICE_METRIC:
+                values = _stats(self.price[rows], self.event[rows])
+            else:
+                values = _stats(self.event_metrics[events, list(EVENT_METRICS).index(metric)])
+        if np.isnan(values[0]):
+            return None
+        return dict(zip(STAT_FIELDS, values.tolist()))
+
+    def trend(self, service_type=None, section=None, guests=None, months=None):
+        """Median per-guest price by month: a list of (YYYYMM, median, charges)"""
+        codes = self._codes(service_type, section)
+        if codes is None:
+            return []
+        cell = self._cell(codes, guests, months)
+        if cell is not None:
+            start, end = self.trend_offsets[cell], self.trend_offsets[cell + 1]
+            months, medians, counts = (self.trend_months[start:end], self.trend_medians[start:end],
+                                       self.trend_counts[start:end])
+        else:
+            rows, _ = self._masks(codes, guests, months)
+            months, medians, counts = _monthly_medians(self.month[rows], self.price[rows])
+        return list(zip(months.tolist(), medians.tolist(), counts.tolist()))
+
+    def parse_query(self, query):
+        """Metric and filters a pricing statistics question asks for"""
+        query_lower = query.lower()
+        normalized = f" {normalize_name(query)} "
+        metric = next((name for name, pattern in METRIC_PATTERNS if pattern.search(normalized)), PRICE_METRIC)
+
+        service = None
+        for name, keywords in SERVICE_KEYWORDS:
+            if any(k in query_lower for k in keywords):
+                service = name
+                break
+        if service is None and DRINK_PATTERN.search(normalized):
+            service = "drinks"
+        if service is None:
+            # Other service types seen on invoices, e.g. "breakfast"
+            for name in self.services:
+                if f" {name.replace('_', ' ')} " in normalized:
+                    service = name
+                    break
+
+        # Longest menu section named in the query, singular or plural
+        section = None
+        for label in self._query_sections:
+            name = normalize_name(label)
+            if f" {name} " in normalized or (name.endswith('s') and f" {name[:-1]} " in normalized):
+                section = label
+                break
+
+        guests = None
+        for kind, pattern in GUEST_PATTERNS:
+            match = pattern.search(query)
+            if not match:
+                continue
+            value = int(match.group(1))
+            if kind == "range":
+                low, high = sorted((value, int(match.group(2))))
+                guests = (low, high)
+            elif kind == "at_least":
+                guests = (value + (0 if re.search(r'\+|at least|>=', match.group()) else 1), None)
+            elif kind == "at_most":
+                guests = (None, value - (0 if re.search(r'up to|at most|<=', match.group()) else 1))
+            else:
+                # "for 80 guests": events of about that size
+                bucket = guest_bucket(value)
+                edges = GUEST_BUCKET_EDGES
+                guests = (edges[bucket], edges[bucket + 1] - 1 if bucket + 1 < len(edges) else None)
+            break
+
+        months = None
+        for kind, pattern in YEAR_PATTERNS:
+            match = pattern.search(query)
+            if match:
+                year = int(match.group(1))
+                months = {"in": (year * 100 + 1, year * 100 + 12),
+                          "since": (year * 100 + 1, None),
+                          "before": (None, (year - 1) * 100 + 12)}[kind]
+                break
+
+        return {
+            "metric": metric,
+            "service_type": service,
+            "section": section,
+            "guests": guests,
+            "months": months,
+            "trend": metric == PRICE_METRIC and any(k in query_lower for k in TREND_KEYWORDS)
+        }
+
+    @staticmethod
+    def _format_value(value, unit):
+        return f"{value:.4g}%" if unit == "percent" else f"${value:,.2f}"
+
+    @staticmethod
+    def _describe(filters):
+        parts = []
+        if filters["service_type"]:
+            parts.append(filters["service_type"].replace('_', ' ').capitalize())
+        if filters["section"]:
+            parts.append(f"events serving {filters['section']}")
+        if filters["guests"]:
+            low, high = filters["guests"]
+            if high is None:
+                parts.append(f"{low}+ guests")
+            elif not low:
+                parts.append(f"up to {high} guests")
+            else:
+                parts.append(f"{low}-{high} guests")
+        if filters["months"]:
+            since, until = filters["months"]
+            if since and until:
+                parts.append(str(since // 100) if since // 100 == until // 100 else
+                             f"{since // 100}-{until // 100}")
+            elif since:
+                parts.append(f"since {since // 100}")
+            else:
+                parts.append(f"before {until // 100 + 1}")
+        return ", ".join(parts) or "all events"
+
+    def answer(self, query):
+        """Markdown answer to a pricing statistics question, or None if no invoice matches"""
+        filters = self.parse_query(query)
+        metric = filters["metric"]
+        label, unit = EVENT_METRICS.get(metric, ("Per-guest price", "money"))
+        scope = {key: filters[key] for key in ("service_type", "section", "guests", "months")}
+
+        if metric == PRICE_METRIC and filters["service_type"] is None and not filters["trend"]:
+            # Prices of different services are not comparable: one line per service
+            lines = []
+            for service in self.services:
+                stats = self.stats(metric, **dict(scope, service_type=service))
+                if stats:
+                    lines.append(
+                        f"- {service.replace('_', ' ').capitalize()}: median {self._format_value(stats['p50'], unit)}"
+                        f" (middle half {self._format_value(stats['p25'], unit)} - "
+                        f"{self._format_value(stats['p75'], unit)}, {int(stats['count'])} charges)"
+                    )
+            if not lines:
+                return None
+            return "\n".join([f"**{label} by service type: {self._describe(filters)}**", ""] + lines)
+
+        stats = self.stats(metric, **scope)
+        if stats is None:
+            return None
+        fmt = lambda key: self._format_value(stats[key], unit)
+        basis = (f"{int(stats['count'])} charges from {int(stats['events'])} events"
+                 if metric == PRICE_METRIC else f"{int(stats['count'])} events")
+        lines = [
+            f"**{label}: {self._describe(filters)}**",
+            f"Based on {basis}.",
+            "",
+            f"- Typical (median): {fmt('p50')}",
+            f"- Middle half: {fmt('p25')} - {fmt('p75')}",
+            f"- 10th to 90th percentile: {fmt('p10')} - {fmt('p90')}",
+            f"- Average {fmt('mean')}, lowest {fmt('min')}, highest {fmt('max')}",
+        ]
+        if filters["trend"]:
+            trend = self.trend(**scope)
+            if trend:
+                lines += ["", "**Median by month**"]
+                lines += [f"- {month // 100}-{month % 100:02d}: {self._format_value(median, unit)} ({count})"
+                          for month, median, count in trend]
+        return "\n".join(lines)
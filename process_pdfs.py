@@ -1,7 +1,92 @@
+import argparse
 from pdf_processor import PDFProcessor
+from document_sources import CachedTextSource
+from text_cache import TextCache
+from ingest_pipeline import IngestPipeline
+from embedding_scheduler import EmbeddingScheduler
+from metrics import metrics
+from ann_index import DEFAULT_INDEX_SPEC, parse_index_spec
+from index_versions import DEFAULT_RETAIN
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process Drive PDFs into the menu vector store")
+    parser.add_argument(
+        "--full-rebuild",
+        action="store_true",
+        help="Ignore the ingest manifest and re-embed every PDF"
+    )
+    parser.add_argument(
+        "--re-extract",
+        action="store_true",
+        help="Rebuild documents, summaries and catalogs of the ingested files from their "
+             "cached text, without listing or downloading anything (implies --full-rebuild)"
+    )
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Overlap downloads and PDF parsing using worker pools"
+    )
+    parser.add_argument("--download-workers", type=int, default=4, help="Concurrent Drive downloads")
+    parser.add_argument("--parse-workers", type=int, default=None, help="PDF parsing processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=8, help="Bound on each inter-stage queue")
+    parser.add_argument("--embed-concurrency", type=int, default=4, help="Embedding batches in flight")
+    parser.add_argument("--batch-tokens", type=int, default=100000, help="Max tokens per embedding batch")
+    parser.add_argument("--max-retries", type=int, default=6, help="Retries per embedding batch")
+    parser.add_argument(
+        "--index-type",
+        help="FAISS index for new partitions: flat, hnsw or ivfpq, optionally with "
+             "parameters such as 'hnsw:m=32,ef_search=64' (use with --full-rebuild to convert). "
+             f"Defaults to the type of the live index, or {DEFAULT_INDEX_SPEC} for a new one"
+    )
+    parser.add_argument(
+        "--retain-versions",
+        type=int,
+        default=DEFAULT_RETAIN,
+        help="Published index versions to keep on disk, the live one included"
+    )
+    parser.add_argument("--metrics-prometheus", help="Write Prometheus-style stage timings to this file")
+    parser.add_argument("--metrics-jsonl", help="Append the run's stage timings to this JSON lines file")
+    args = parser.parse_args()
+    if args.index_type is not None:
+        try:
+            parse_index_spec(args.index_type)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.retain_versions < 1:
+        parser.error("--retain-versions must be at least 1")
+    
+    if args.metrics_prometheus or args.metrics_jsonl:
+        metrics.configure(
+            enabled=True,
+            prometheus_path=args.metrics_prometheus,
+            jsonl_path=args.metrics_jsonl
+        )
+    
+    pipeline = None
+    if args.pipelined:
+        pipeline = IngestPipeline(
+            download_workers=args.download_workers,
+            parse_workers=args.parse_workers,
+            queue_size=args.queue_size
+        )
+    
     print("Starting PDF processing and embedding creation...")
-    processor = PDFProcessor()
-    processor.process_all_pdfs()
-    print("Finished processing PDFs and creating embeddings!") 
\ No newline at end of file
+    if args.re_extract:
+        text_cache = TextCache()
+        processor = PDFProcessor(source=CachedTextSource(text_cache), text_cache=text_cache)
+    else:
+        processor = PDFProcessor()
+    scheduler = EmbeddingScheduler(
+        processor.embeddings,
+        max_batch_tokens=args.batch_tokens,
+        concurrency=args.embed_concurrency,
+        max_retries=args.max_retries
+    )
+    processor.process_all_pdfs(
+        full_rebuild=args.full_rebuild or args.re_extract,
+        pipeline=pipeline,
+        scheduler=scheduler,
+        index_spec=args.index_type,
+        retain_versions=args.retain_versions
+    )
+    print("Finished processing PDFs and creating embeddings!")
@@ -0,0 +1,40 @@
+import json
+import urllib.error
+import urllib.request
+
+
+class QueryServiceClient:
+    """Stands in for RAGApplication by calling a running query_service.py"""
+
+    def __init__(self, url, timeout=300.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.last_timing = None
+
+    def _request(self, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(
+            self.url + path, data=data, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read()), response.headers
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            raise RuntimeError(f"Query service answered {e.code}: {message}") from e
+
+    def get_response(self, query, chat_history, callbacks=None, query_type=None):
+        """Same contract as RAGApplication.get_response; the answer is not streamed"""
+        path = {"menu_creation": "/menu", "event_lookup": "/event", "pricing_stats": "/pricing"}.get(query_type, "/query")
+        body, headers = self._request(path, {"query": query, "chat_history": list(chat_history)})
+        self.last_timing = {
+            "queue_ms": float(headers.get("X-Queue-Time-Ms", 0)),
+            "process_ms": float(headers.get("X-Process-Time-Ms", 0))
+        }
+        return body["response"]
+
+    def stats(self):
+        return self._request("/stats")[0]
@@ -0,0 +1,210 @@
+"""Headless HTTP front end for RAGApplication.
+
+    python query_service.py --port 8600
+
+Loads the index once and serves JSON over HTTP:
+
+    POST /menu    {"query": "...", "chat_history": []}   menu creation
+    POST /event   {"query": "..."}                        event lookup
+    POST /query   {"query": "..."}                        classified automatically
+    GET  /health                                          index version
+    GET  /stats                                           cache and batching stats
+    GET  /metrics                                         Prometheus text (with MENU_METRICS=1)
+
+Requests are answered by a fixed pool of worker threads fed from a bounded
+queue; when the queue is full the service answers 503 with Retry-After
+instead of piling up work. Concurrent query embeddings are coalesced into one
+embedding call. Every response carries X-Queue-Time-Ms, X-Process-Time-Ms and
+a Server-Timing header.
+
+A request not answered within --request-timeout gets 504. If it is still
+queued by then it is dropped without being started; a worker already
+answering it finishes the answer, which is then discarded.
+"""
+import argparse
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import queue
+import threading
+import time
+from embedding_cache import BatchingEmbeddings, make_embeddings
+from metrics import metrics
+from rag_application import RAGApplication
+
+ENDPOINT_QUERY_TYPES = {
+    "/menu": "menu_creation",
+    "/event": "event_lookup",
+    "/pricing": "pricing_stats",
+    "/query": None
+}
+
+
+class WorkerPool:
+    """Fixed worker threads fed from a bounded queue.
+
+    With a `timeout`, a job still queued that many seconds after it was
+    submitted fails with TimeoutError instead of starting; a job already
+    started always runs to the end.
+    """
+
+    def __init__(self, handler, workers=4, queue_size=32, timeout=None):
+        self.handler = handler
+        self.timeout = timeout
+        self._jobs = queue.Queue(maxsize=queue_size)
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"query-worker-{i}", daemon=True).start()
+
+    def submit(self, *args):
+        """Queue a job and return its Future; raises queue.Full when saturated"""
+        future = Future()
+        self._jobs.put_nowait((future, time.perf_counter(), args))
+        return future
+
+    def queued(self):
+        return self._jobs.qsize()
+
+    def _run(self):
+        while True:
+            future, queued_at, args = self._jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            if self.timeout is not None and started - queued_at > self.timeout:
+                # Its caller has already given up; don't spend a worker on it
+                metrics.incr("expired_requests")
+                future.set_exception(TimeoutError(f"Queued for over {self.timeout:g}s"))
+                continue
+            try:
+                result = self.handler(*args)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result((result, started - queued_at, time.perf_counter() - started))
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    server_version = "MenuQueryService/1.0"
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "index_version": service.app.index_version})
+        elif self.path == "/stats":
+            self._send_json(200, service.stats())
+        elif self.path == "/metrics":
+            body = metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        received = time.perf_counter()
+        if self.path not in ENDPOINT_QUERY_TYPES:
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            query = request["query"]
+            chat_history = [tuple(turn) for turn in request.get("chat_history", [])]
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": "Expected a JSON body with a 'query' string"})
+            return
+
+        service = self.server.service
+        try:
+            future = service.pool.submit(query, chat_history, ENDPOINT_QUERY_TYPES[self.path])
+        except queue.Full:
+            metrics.incr("rejected_requests")
+            self._send_json(503, {"error": "Too many requests in flight"}, {"Retry-After": "1"})
+            return
+
+        try:
+            response, queue_seconds, process_seconds = future.result(timeout=service.request_timeout)
+        except FutureTimeout:
+            # Stops the job only if it has not started; a running one finishes unobserved
+            future.cancel()
+            self._send_json(504, {"error": f"No answer within {service.request_timeout:g}s"})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+
+        total_ms = (time.perf_counter() - received) * 1000
+        queue_ms, process_ms = queue_seconds * 1000, process_seconds * 1000
+        self._send_json(200, {"response": response}, {
+            "X-Queue-Time-Ms": f"{queue_ms:.1f}",
+            "X-Process-Time-Ms": f"{process_ms:.1f}",
+            "X-Total-Time-Ms": f"{total_ms:.1f}",
+            "Server-Timing": f"queue;dur={queue_ms:.1f}, app;dur={process_ms:.1f}, total;dur={total_ms:.1f}"
+        })
+
+
+class QueryService:
+    """One RAGApplication shared by a worker pool behind an HTTP server"""
+
+    def __init__(self, app=None, workers=4, queue_size=32, request_timeout=300.0,
+                 batch_size=32, batch_wait=0.005):
+        if app is None:
+            embeddings = BatchingEmbeddings(make_embeddings(), batch_size, batch_wait)
+            app = RAGApplication(embeddings=embeddings)
+        self.app = app
+        self.request_timeout = request_timeout
+        self.pool = WorkerPool(self._answer, workers, queue_size, request_timeout)
+
+    def _answer(self, query, chat_history, query_type):
+        return self.app.get_response(query, chat_history, query_type=query_type)
+
+    def stats(self):
+        stats = {
+            "response_cache": self.app.response_cache.stats(),
+            "queued_requests": self.pool.queued()
+        }
+        if hasattr(self.app.embeddings, "stats"):
+            stats["embeddings"] = self.app.embeddings.stats()
+        return stats
+
+    def serve(self, host="127.0.0.1", port=8600):
+        server = ThreadingHTTPServer((host, port), QueryRequestHandler)
+        server.daemon_threads = True
+        server.service = self
+        print(f"Serving menu queries on http://{host}:{port}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve RAGApplication queries over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=4, help="Queries answered concurrently")
+    parser.add_argument("--queue-size", type=int, default=32, help="Queued queries before answering 503")
+    parser.add_argument("--request-timeout", type=float, default=300.0, help="Seconds before answering 504")
+    parser.add_argument("--batch-size", type=int, default=32, help="Max query embeddings per batch")
+    parser.add_argument("--batch-wait-ms", type=float, default=5.0, help="How long to gather a batch")
+    args = parser.parse_args()
+
+    QueryService(
+        workers=args.workers,
+        queue_size=args.queue_size,
+        request_timeout=args.request_timeout,
+        batch_size=args.batch_size,
+        batch_wait=args.batch_wait_ms / 1000
+    ).serve(args.host, args.port)
@@ -0,0 +1,231 @@
+import math
+import re
+import numpy as np
+from menu_base_pricing import BASE_PRICING
+
+# Query keywords for each BASE_PRICING service type, most specific first
+SERVICE_KEYWORDS = [
+    ("hot_lunch", ["hot lunch", "buffet lunch"]),
+    ("sandwich_lunch", ["sandwich", "lunch"]),
+    ("dinner", ["dinner", "gala", "banquet", "reception"]),
+]
+DRINK_KEYWORDS = ["drink", "beverage", "soda", "coffee", "tea"]
+# Whole words only: "team lunch" and "steak" are not drinks
+DRINK_PATTERN = re.compile(r'\b(?:%s)s?\b' % '|'.join(DRINK_KEYWORDS), re.I)
+GUEST_COUNT_PATTERN = re.compile(r'(\d+)\s*(?:people|guests|persons|attendees|pax|ppl)', re.I)
+
+# Used until ingestion has produced priced events
+DEFAULT_GUEST_COUNT = 20
+DEFAULT_SERVICE_FEE_RATE = 0.10
+# Historical flat charges listed under a quote
+MAX_FLAT_CHARGES = 5
+
+
+def _normalize_item(name):
+    return ' '.join(re.sub(r'[^\w\s]', '', name.lower()).split())
+
+
+def service_type(item):
+    """Service type of a per-person charge: a BASE_PRICING key when one matches, e.g. 'hot_lunch'"""
+    text = item.lower()
+    for service, keywords in SERVICE_KEYWORDS:
+        if any(k in text for k in keywords):
+            return service
+    if DRINK_PATTERN.search(text):
+        return "drinks"
+    return _normalize_item(item).replace(' ', '_') or "other"
+
+
+class QuoteEngine:
+    """Deterministic catering quotes from BASE_PRICING and historical invoices.
+
+    Per-person prices come from BASE_PRICING; service fee rate, tax rate,
+    delivery fee, staff rates and guests-per-staff ratio are medians over the
+    parsed pricing breakdowns of past events. The historical median rate of
+    each service type is shown next to the price list's, and flat charges
+    seen on past invoices (rentals and the like) are listed as not included,
+    since they depend on the event. Every price scenario (the low
+    and high end of a price range) is computed in one numpy pass, so the same
+    inputs always give the same quote.
+    """
+
+    def __init__(self, base_pricing=BASE_PRICING, history=None):
+        self.base_pricing = base_pricing
+        history = history or []
+
+        fee_rates, tax_rates, delivery_fees, staff_rates, guests_per_staff, guest_counts = [], [], [], [], [], []
+        item_prices, service_rates, flat_charges = {}, {}, {}
+        for event in history:
+            line_total = sum(row['amount'] for row in event['pricing_items']
+                             if isinstance(row['amount'], (int, float)))
+            if event['service_fee'] and line_total:
+                fee_rates.append(event['service_fee'] / line_total)
+            if event['tax_rate']:
+                tax_rates.append(event['tax_rate'] / 100)
+            if event['delivery_setup']:
+                delivery_fees.append(event['delivery_setup'])
+            staff = [row for row in event['pricing_items'] if row['kind'] == 'staff']
+            staff_rates.extend(row['unit_price'] for row in staff)
+            guests = [row['quantity'] for row in event['pricing_items'] if row['kind'] == 'per_person']
+            if guests:
+                guest_counts.append(max(guests))
+                staff_count = sum(row['quantity'] for row in staff)
+                if staff_count:
+                    guests_per_staff.append(max(guests) / staff_count)
+            for row in event['pricing_items']:
+                if row['kind'] == 'per_person':
+                    item_prices.setdefault(_normalize_item(row['item']), []).append(row['unit_price'])
+                    service_rates.setdefault(service_type(row['item']), []).append(row['unit_price'])
+                elif row['kind'] == 'flat' and isinstance(row['amount'], (int, float)):
+                    flat_charges.setdefault(row['item'].strip().title(), []).append(row['amount'])
+
+        def median(values, default=None):
+            return float(np.median(values)) if values else default
+
+        self.service_fee_rate = median(fee_rates, DEFAULT_SERVICE_FEE_RATE)
+        self.tax_rate = median(tax_rates, 0.0)
+        self.delivery_fee = median(delivery_fees, 0.0)
+        self.staff_rate = median(staff_rates)
+        self.guests_per_staff = median(guests_per_staff)
+        self.default_guest_count = int(median(guest_counts, DEFAULT_GUEST_COUNT))
+        self.item_prices = {name: median(prices) for name, prices in item_prices.items()}
+        self.service_rates = {name: median(rates) for name, rates in service_rates.items()}
+        # Most often charged first: (item, median amount, events)
+        self.flat_charges = sorted(
+            ((item, median(amounts), len(amounts)) for item, amounts in flat_charges.items()),
+            key=lambda charge: (-charge[2], charge[0])
+        )
+
+    @classmethod
+    def from_event_store(cls, event_store, base_pricing=BASE_PRICING):
+        return cls(base_pricing, event_store.all_events())
+
+    def detect_service_type(self, query):
+        query_lower = query.lower()
+        for service_type, keywords in SERVICE_KEYWORDS:
+            if service_type in self.base_pricing and any(k in query_lower for k in keywords):
+                return service_type
+        return None
+
+    @staticmethod
+    def parse_guest_count(query):
+        match = GUEST_COUNT_PATTERN.search(query)
+        return int(match.group(1)) if match else None
+
+    def _service_prices(self, service_type):
+        pricing = self.base_pricing[service_type]
+        if "price_per_person" in pricing:
+            return [pricing["price_per_person"]]
+        return [pricing["min_price_per_person"], pricing["max_price_per_person"]]
+
+    def quote(self, service_type, guest_count, extras=(), include_drinks=False):
+        """Quote a service type for a guest count.
+
+        `extras` are per-person items priced from past invoices (e.g. "coffee
+        service"); unknown names are ignored. Returns line items and totals,
+        one value per price scenario (two for a min/max priced service).
+        """
+        service_prices = self._service_prices(service_type)
+        scenarios = len(service_prices)
+
+        labels = [service_type.replace('_', ' ').capitalize()]
+        prices = [service_prices]
+        quantities = [guest_count]
+        if include_drinks and service_type != "drinks" and "drinks" in self.base_pricing:
+            labels.append("Drinks")
+            prices.append([self.base_pricing["drinks"]["price_per_person"]] * scenarios)
+            quantities.append(guest_count)
+        for extra in extras:
+            price = self.item_prices.get(_normalize_item(extra))
+            if price is not None:
+                labels.append(extra.capitalize())
+                prices.append([price] * scenarios)
+                quantities.append(guest_count)
+        if self.staff_rate and self.guests_per_staff:
+            labels.append("Staff")
+            prices.append([self.staff_rate] * scenarios)
+            quantities.append(max(1, math.ceil(guest_count / self.guests_per_staff)))
+
+        # (lines, scenarios) prices times per-line quantities
+        price_matrix = np.asarray(prices, dtype=np.float64)
+        quantity_vector = np.asarray(quantities, dtype=np.float64)
+        line_totals = np.round(price_matrix * quantity_vector[:, None], 2)
+        subtotal = line_totals.sum(axis=0)
+        service_fee = np.round(subtotal * self.service_fee_rate, 2)
+        delivery = np.full(scenarios, round(self.delivery_fee, 2))
+        tax = np.round((subtotal + service_fee) * self.tax_rate, 2)
+        total = subtotal + service_fee + delivery + tax
+
+        return {
+            "service_type": service_type,
+            "guest_count": guest_count,
+            "line_items": [
+                {"item": label, "unit_price": price_matrix[i].tolist(),
+                 "quantity": int(quantity_vector[i]), "total": line_totals[i].tolist()}
+                for i, label in enumerate(labels)
+            ],
+            "subtotal": subtotal.tolist(),
+            "service_fee_rate": self.service_fee_rate,
+            "service_fee": service_fee.tolist(),
+            "delivery_setup": delivery.tolist(),
+            "tax_rate": self.tax_rate,
+            "tax": tax.tolist(),
+            "total": total.tolist(),
+            "historical_price_per_person": self.service_rates.get(service_type),
+            "flat_charges_not_included": [
+                {"item": item, "median_amount": amount, "events": events}
+                for item, amount, events in self.flat_charges[:MAX_FLAT_CHARGES]
+            ]
+        }
+
+    def quote_for_query(self, query):
+        """Quotes for what a menu request asks for (every lunch/dinner type if unspecified)"""
+        guest_count = self.parse_guest_count(query)
+        assumed = guest_count is None
+        if assumed:
+            guest_count = self.default_guest_count
+        service_type = self.detect_service_type(query)
+        service_types = [service_type] if service_type else [
+            name for name, _ in SERVICE_KEYWORDS if name in self.base_pricing
+        ]
+        normalized = f" {_normalize_item(query)} "
+        # Past per-person items named in the query, other than the service types themselves
+        service_names = {name.replace('_', ' ') for name in self.base_pricing}
+        service_names.update(k for _, keywords in SERVICE_KEYWORDS for k in keywords)
+        extras = [name for name in self.item_prices
+                  if f" {name} " in normalized and name not in service_names]
+        include_drinks = bool(DRINK_PATTERN.search(normalized)) and not any(
+            DRINK_PATTERN.search(name) for name in extras
+        )
+        return [
+            dict(self.quote(name, guest_count, extras, include_drinks), guest_count_assumed=assumed)
+            for name in service_types
+        ]
+
+    @staticmethod
+    def _money(values):
+        values = [f"${value:,.2f}" for value in values]
+        return values[0] if len(set(values)) == 1 else " - ".join(values)
+
+    @classmethod
+    def format_quote(cls, quote):
+        """Render a quote as the plain-text block given to the LLM"""
+        guests = f"{quote['guest_count']} guests" + (" (assumed)" if quote.get("guest_count_assumed") else "")
+        lines = [f"{quote['service_type'].replace('_', ' ').title()} for {guests}:"]
+        for row in quote["line_items"]:
+            lines.append(f"- {row['item']}: {cls._money(row['unit_price'])} x {row['quantity']} = {cls._money(row['total'])}")
+        lines.append(f"- Subtotal: {cls._money(quote['subtotal'])}")
+        lines.append(f"- Service fee ({quote['service_fee_rate']:.0%}): {cls._money(quote['service_fee'])}")
+        if any(quote["delivery_setup"]):
+            lines.append(f"- Delivery & setup: {cls._money(quote['delivery_setup'])}")
+        if quote["tax_rate"]:
+            lines.append(f"- Tax ({quote['tax_rate'] * 100:g}%): {cls._money(quote['tax'])}")
+        lines.append(f"- Total: {cls._money(quote['total'])}")
+        if quote.get("historical_price_per_person"):
+            lines.append(f"- Per-person rate is from the current price list; past invoices for this service "
+                         f"charged a median of {cls._money([quote['historical_price_per_person']])} per person")
+        if quote.get("flat_charges_not_included"):
+            charges = ", ".join(f"{row['item']} (median {cls._money([row['median_amount']])})"
+                                for row in quote["flat_charges_not_included"])
+            lines.append(f"- Not included, quoted per event on past invoices: {charges}")
+        return "\n".join(lines)
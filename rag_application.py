@@ -0,0 +1,704 @@
+import asyncio
+import re
+import threading
+import time
+from response_cache import ResponseCache
+from event_store import EventStore
+from catalog_store import CatalogFile
+from quote_engine import QuoteEngine
+from pricing_cube import PricingCube
+from embedding_scheduler import load_encoding, count_tokens
+from metrics import metrics
+from conversation_memory import SUMMARY_MARKER, trim_history
+from config import OPENAI_API_KEY
+
+# Most catalog dishes listed per menu section named in a menu request
+MAX_SECTION_ITEMS = 25
+# Section headings too generic to mean the query asks for that section
+GENERIC_SECTIONS = {"menu"}
+
+
+class lazy_component:
+    """Attribute built by the decorated method on first access.
+
+    Each component is built once per instance even when several threads ask
+    for it at the same time; a component built by a background warm-up is
+    simply waited for. Build times are kept in `instance.load_seconds`.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self.name = build.__name__
+        self.__doc__ = build.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if self.name not in instance.__dict__:
+            with instance._component_locks[self.name]:
+                if self.name not in instance.__dict__:
+                    start = time.perf_counter()
+                    instance.__dict__[self.name] = self.build(instance)
+                    instance.load_seconds[self.name] = time.perf_counter() - start
+        return instance.__dict__[self.name]
+
+
+class RAGApplication:
+    # In dependency order, so warm_up loads each component once
+    COMPONENTS = ("embeddings", "response_cache", "encoding", "event_store", "food_catalog", "quote_engine", "pricing_cube",
+                  "index_version", "vector_store", "llm", "event_retriever", "food_retriever", "qa_chain")
+
+    def __init__(self, embeddings=None, llm=None, index_path=None, event_store=None,
+                 max_concurrent_requests=8, retrieval_timeout=15.0, llm_timeout=120.0, lazy=False,
+                 max_history_tokens=1500, index_check_interval=5.0):
+        """Load the index and build the chains.
+
+        The defaults are the production OpenAI models; benchmarks pass stub
+        `embeddings` and `llm` to run without network access. The remaining
+        arguments bound `aget_response`: requests in flight at once, and the
+        timeout in seconds for each retrieval and each LLM call.
+
+        With `lazy` nothing heavy is imported or loaded here: the models,
+        index and chains are built on first use, or ahead of it by `warm_up`.
+        A chat history passed to `get_response` is cut to its most recent
+        `max_history_tokens` tokens.
+
+        `index_path` is the root of the published index versions (see
+        index_versions). At most every `index_check_interval` seconds a
+        request checks which version is live; a new one is loaded in the
+        background and swapped in, while requests already running finish on
+        the old one.
+        """
+        self.max_concurrent_requests = max_concurrent_requests
+        self.retrieval_timeout = retrieval_timeout
+        self.llm_timeout = llm_timeout
+        self.max_history_tokens = max_history_tokens
+        self._request_slots = None
+        self._request_slots_loop = None
+        self._component_locks = {name: threading.Lock() for name in self.COMPONENTS}
+        self.load_seconds = {}
+        self.index_path = index_path
+        self.index_check_interval = index_check_interval
+        self._next_index_check = time.monotonic() + index_check_interval
+        self._index_swap_lock = threading.Lock()
+        self._index_swap = None  # Thread loading a new version, if any
+        if event_store is not None:
+            self.event_store = event_store
+        if embeddings is not None:
+            self.embeddings = embeddings
+        if llm is not None:
+            self.llm = llm
+        if not lazy:
+            self.warm_up()
+
+    def warm_up(self):
+        """Build every component not built yet"""
+        for name in self.COMPONENTS:
+            getattr(self, name)
+        return self
+
+    def warm_up_in_background(self):
+        """Start `warm_up` in a daemon thread and return the thread"""
+        thread = threading.Thread(target=self.warm_up, name="rag-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def is_warm(self):
+        return all(name in self.__dict__ for name in self.COMPONENTS)
+
+    @lazy_component
+    def embeddings(self):
+        from embedding_cache import make_embeddings
+        return make_embeddings()
+
+    @lazy_component
+    def response_cache(self):
+        return ResponseCache(self.embeddings)
+
+    @lazy_component
+    def encoding(self):
+        return load_encoding()
+
+    @lazy_component
+    def event_store(self):
+        return EventStore()
+
+    @lazy_component
+    def food_catalog(self):
+        return CatalogFile.food_items()
+
+    @lazy_component
+    def quote_engine(self):
+        self.quote_engine_version = self.event_store.version()
+        return QuoteEngine.from_event_store(self.event_store)
+
+    @lazy_component
+    def pricing_cube(self):
+        """None until ingestion has built one"""
+        self.pricing_cube_version = PricingCube.version()
+        return PricingCube.load()
+
+    def _index_path(self):
+        from partitioned_store import INDEX_PATH
+        return self.index_path or INDEX_PATH
+
+    def _index_versions(self):
+        from index_versions import IndexVersions
+        return IndexVersions(self._index_path())
+
+    @lazy_component
+    def index_version(self):
+        """The version the vector store is loaded from"""
+        version = self._index_versions().current()
+        if version is None:
+            raise FileNotFoundError(f"No index in {self._index_path()}; run process_pdfs.py first")
+        return version
+
+    @lazy_component
+    def vector_store(self):
+        return self._load_vector_store(self.index_version)
+
+    def _load_vector_store(self, version):
+        from partitioned_store import PartitionedVectorStore
+        # Read-only memory maps: index pages are shared and loaded on demand
+        return PartitionedVectorStore.load(self._index_versions().path(version), self.embeddings, mmap=True)
+
+    @lazy_component
+    def llm(self):
+        from langchain.chat_models import ChatOpenAI
+        return ChatOpenAI(
+            temperature=0.7,
+            model_name='gpt-4-0125-preview',
+            openai_api_key=OPENAI_API_KEY,
+            max_tokens=4000,
+            streaming=True
+        )
+
+    # Separate retrievers, each searching only its own partition
+    @lazy_component
+    def event_retriever(self):
+        return self._event_retriever(self.vector_store)
+
+    @lazy_component
+    def food_retriever(self):
+        return self._food_retriever(self.vector_store)
+
+    @lazy_component
+    def qa_chain(self):
+        return self._qa_chain(self.event_retriever)
+
+    @staticmethod
+    def _event_retriever(vector_store):
+        return vector_store.partition("event_details").as_retriever(
+            search_type="mmr",
+            search_kwargs={
+                "k": 4,
+                "fetch_k": 8
+            }
+        )
+
+    @staticmethod
+    def _food_retriever(vector_store):
+        return vector_store.partition("food_item").as_retriever(
+            search_type="similarity",
+            search_kwargs={
+                "k": 10  # Get more food items for better combinations
+            }
+        )
+
+    def _qa_chain(self, event_retriever):
+        from langchain.chains import ConversationalRetrievalChain
+        return ConversationalRetrievalChain.from_llm(
+            self.llm,
+            retriever=event_retriever,  # Default to event retriever
+            return_source_documents=True,
+            verbose=True,
+            max_tokens_limit=6000
+        )
+
+    def check_for_new_index(self):
+        """Start loading the live index version if it is not the one being served.
+
+        Cheap enough to call on every request: the version pointer is read at
+        most every `index_check_interval` seconds, and only once the index
+        has been loaded. Returns the loading thread, if one was started.
+        """
+        now = time.monotonic()
+        if now < self._next_index_check or "index_version" not in self.__dict__:
+            return None
+        with self._index_swap_lock:
+            if now < self._next_index_check or self._index_swap is not None:
+                return None
+            self._next_index_check = now + self.index_check_interval
+            version = self._index_versions().current()
+            if version is None or version == self.index_version:
+                return None
+            self._index_swap = threading.Thread(
+                target=self._swap_index, args=(version,), name="rag-index-swap", daemon=True
+            )
+            self._index_swap.start()
+            return self._index_swap
+
+    def _swap_index(self, version):
+        """Load `version` and replace the index components with it in one step"""
+        try:
+            with metrics.span("index_swap"):
+                start = time.perf_counter()
+                vector_store = self._load_vector_store(version)
+                event_retriever = self._event_retriever(vector_store)
+                components = {
+                    "vector_store": vector_store,
+                    "event_retriever": event_retriever,
+                    "food_retriever": self._food_retriever(vector_store),
+                    "qa_chain": self._qa_chain(event_retriever),
+                    "index_version": version
+                }
+                # One dict update, so every attribute is always a complete
+                # component; running requests keep the ones they already hold
+                self.__dict__.update(components)
+                self.load_seconds["index_swap"] = time.perf_counter() - start
+            print(f"Now serving index version {version}")
+        except Exception as e:
+            # Keep serving the old version; the next check tries again
+            print(f"Could not load index version {version}: {str(e)}")
+        finally:
+            with self._index_swap_lock:
+                self._index_swap = None
+
+    def get_response(self, query, chat_history, callbacks=None, query_type=None):
+        """Get response from the LLM
+
+        `chat_history` is a list of (question, answer) pairs, oldest first,
+        e.g. ConversationMemory.as_chat_history(); follow-up questions are
+        rewritten into standalone ones for retrieval. `callbacks` are passed
+        to the LLM call, e.g. a StreamlitTokenHandler to stream tokens into
+        the page as they are generated. `query_type` ("menu_creation",
+        "event_lookup", "pricing_stats" or "general") skips classification.
+        """
+        with metrics.trace("query"):
+            return self._get_response(query, chat_history, callbacks, query_type)
+
+    def _classify(self, query, query_type=None, chat_history=()):
+        with metrics.span("classify") as span:
+            if query_type is None:
+                query_type = self._determine_query_type(query)
+                # "Make it vegetarian" continues the most recent specific request
+                if query_type == "general":
+                    for question, _ in reversed(chat_history):
+                        previous_type = self._determine_query_type(question)
+                        if question != SUMMARY_MARKER and previous_type != "general":
+                            query_type = previous_type
+                            break
+            span.set(query_type=query_type)
+        return query_type
+
+    def _trim_history(self, chat_history):
+        return trim_history(chat_history or [], self.max_history_tokens, self.encoding)
+
+    @staticmethod
+    def _format_history(chat_history):
+        return "\n".join(
+            f"Summary of earlier conversation: {answer}" if question == SUMMARY_MARKER
+            else f"User: {question}\nAssistant: {answer}"
+            for question, answer in chat_history
+        )
+
+    def _condense_prompt(self, query, chat_history):
+        return f"""Given the conversation below and a follow-up question, rewrite the follow-up as a
+standalone question that includes every detail it depends on (event names, guest counts,
+dietary needs, dishes). Reply with the question only.
+
+Conversation:
+{self._format_history(chat_history)}
+
+Follow-up question: {query}
+Standalone question:"""
+
+    def _standalone_question(self, query, chat_history):
+        """The query rewritten to stand alone, for retrieval (no callbacks, so nothing streams)"""
+        if not chat_history:
+            return query
+        with metrics.span("condense_question"):
+            return self.llm.predict(self._condense_prompt(query, chat_history)).strip() or query
+
+    async def _astandalone_question(self, query, chat_history):
+        if not chat_history:
+            return query
+        with metrics.span("condense_question"):
+            standalone = await self._with_timeout(
+                self.llm.apredict(self._condense_prompt(query, chat_history)), self.llm_timeout, "LLM call"
+            )
+        return standalone.strip() or query
+
+    def summarize_history(self, summary, turns, max_tokens):
+        """Fold `turns` into the running `summary` (the summarizer for ConversationMemory)"""
+        prompt = f"""Progressively summarize a conversation with a catering menu assistant. Extend the
+current summary with the new lines, keeping event names, guest counts, dates, dietary needs,
+chosen dishes and prices. Stay under {max(max_tokens * 3 // 4, 20)} words.
+
+Current summary:
+{summary or "(none)"}
+
+New lines:
+{self._format_history(turns)}
+
+New summary:"""
+        with metrics.span("summarize_history"):
+            return self.llm.predict(prompt)
+
+    def _answer_from_event_store(self, query, query_type):
+        """Questions about one specific event are answered from the event store"""
+        if query_type != "event_lookup":
+            return None
+        with metrics.span("event_store_lookup"):
+            event_id = self.event_store.resolve(query)
+            event = self.event_store.get_event(event_id) if event_id is not None else None
+        if event is None:
+            return None
+        metrics.incr("responses", source="event_store")
+        return EventStore.format_event(event)
+
+    def _current_pricing_cube(self):
+        """The pricing cube, reloaded when ingestion rewrites it"""
+        pricing_cube = self.pricing_cube
+        version = PricingCube.version()
+        if version != self.pricing_cube_version:
+            pricing_cube = self.pricing_cube = PricingCube.load()
+            self.pricing_cube_version = version
+        return pricing_cube
+
+    def _answer_from_pricing_cube(self, query):
+        """Pricing statistics come from the precomputed cube; None leaves them to the LLM"""
+        with metrics.span("pricing_cube_lookup"):
+            pricing_cube = self._current_pricing_cube()
+            answer = pricing_cube.answer(query) if pricing_cube is not None else None
+        if answer is None:
+            return None
+        metrics.incr("responses", source="pricing_cube")
+        return answer
+
+    def _with_metrics_callback(self, callbacks, query_type):
+        if not metrics.active():
+            return callbacks
+        from metrics_callbacks import MetricsCallbackHandler
+        return list(callbacks or []) + [MetricsCallbackHandler(
+            metrics, lambda text: count_tokens(text, self.encoding), query_type=query_type
+        )]
+
+    def _get_response(self, query, chat_history, callbacks=None, query_type=None):
+        self.check_for_new_index()
+        chat_history = self._trim_history(chat_history)
+        query_type = self._classify(query, query_type, chat_history)
+        
+        answer = self._answer_from_event_store(query, query_type)
+        if answer is None and query_type == "pricing_stats":
+            answer = self._answer_from_pricing_cube(self._standalone_question(query, chat_history))
+        if answer is not None:
+            return answer
+        
+        # Answers that depend on earlier turns are never cached
+        use_cache = not chat_history
+        if use_cache:
+            with metrics.span("response_cache_lookup"):
+                cached = self.response_cache.get(query, query_type, self.index_version)
+            if cached is not None:
+                metrics.incr("responses", source="response_cache")
+                return cached
+        
+        callbacks = self._with_metrics_callback(callbacks, query_type)
+        start_time = time.perf_counter()
+        with metrics.span("handler", query_type=query_type):
+            if query_type == "menu_creation":
+                response = self._handle_menu_creation(query, callbacks, chat_history)
+            elif query_type == "event_lookup":
+                response = self._handle_event_query(query, callbacks, chat_history)
+            else:
+                response = self._handle_general_query(query, callbacks, chat_history)
+        metrics.incr("responses", source="llm")
+        
+        if use_cache:
+            self.response_cache.put(
+                query, query_type, self.index_version, response, time.perf_counter() - start_time
+            )
+        return response
+
+    async def aget_response(self, query, chat_history, callbacks=None, query_type=None):
+        """Async version of get_response.
+
+        Food and event retrieval run concurrently, the LLM and embeddings are
+        called through their async APIs, blocking lookups (event store,
+        pricing cube, quotes) run in worker threads, each call is bounded by
+        `retrieval_timeout`/`llm_timeout` (TimeoutError), and at most
+        `max_concurrent_requests` requests run at once per event loop.
+        """
+        async with self._request_limit():
+            with metrics.trace("query"):
+                return await self._aget_response(query, chat_history, callbacks, query_type)
+
+    def _request_limit(self):
+        # asyncio primitives belong to one loop; make a new one per loop
+        loop = asyncio.get_running_loop()
+        if self._request_slots_loop is not loop:
+            self._request_slots = asyncio.Semaphore(self.max_concurrent_requests)
+            self._request_slots_loop = loop
+        return self._request_slots
+
+    async def _aget_response(self, query, chat_history, callbacks=None, query_type=None):
+        self.check_for_new_index()
+        chat_history = self._trim_history(chat_history)
+        query_type = self._classify(query, query_type, chat_history)
+        
+        # SQLite and file reads stay off the event loop
+        answer = await asyncio.to_thread(self._answer_from_event_store, query, query_type)
+        if answer is None and query_type == "pricing_stats":
+            standalone = await self._astandalone_question(query, chat_history)
+            answer = await asyncio.to_thread(self._answer_from_pricing_cube, standalone)
+        if answer is not None:
+            return answer
+        
+        use_cache = not chat_history
+        if use_cache:
+            with metrics.span("response_cache_lookup"):
+                cached = await self.response_cache.aget(query, query_type, self.index_version)
+            if cached is not None:
+                metrics.incr("responses", source="response_cache")
+                return cached
+        
+        callbacks = self._with_metrics_callback(callbacks, query_type)
+        start_time = time.perf_counter()
+        with metrics.span("handler", query_type=query_type):
+            if query_type == "menu_creation":
+                response = await self._ahandle_menu_creation(query, callbacks, chat_history)
+            else:
+                standalone = await self._astandalone_question(query, chat_history)
+                question = (self._event_question(standalone) if query_type == "event_lookup"
+                            else self._general_question(standalone))
+                response = await self._arun_qa_chain(question, callbacks)
+        metrics.incr("responses", source="llm")
+        
+        if use_cache:
+            await self.response_cache.aput(
+                query, query_type, self.index_version, response, time.perf_counter() - start_time
+            )
+        return response
+
+    async def _with_timeout(self, awaitable, timeout, what):
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            metrics.incr("timeouts", call=what)
+            raise TimeoutError(f"{what} timed out after {timeout:g}s")
+
+    async def _ahandle_menu_creation(self, query, callbacks=None, chat_history=()):
+        search_query = await self._astandalone_question(query, chat_history)
+        food_docs, event_docs = await asyncio.gather(
+            self._with_timeout(
+                self.food_retriever.aget_relevant_documents(search_query, callbacks=callbacks),
+                self.retrieval_timeout, "Food item retrieval"
+            ),
+            self._with_timeout(
+                self.event_retriever.aget_relevant_documents(search_query, callbacks=callbacks),
+                self.retrieval_timeout, "Event retrieval"
+            )
+        )
+        # Building the quote may reload past events from the event store
+        menu_prompt = await asyncio.to_thread(
+            self._menu_prompt, query, food_docs, event_docs, chat_history, search_query
+        )
+        return await self._with_timeout(
+            self.llm.apredict(menu_prompt, callbacks=callbacks), self.llm_timeout, "LLM call"
+        )
+
+    async def _arun_qa_chain(self, question, callbacks=None):
+        # The chain retrieves and then calls the LLM, so it gets both budgets
+        result = await self._with_timeout(
+            self.qa_chain.acall({"question": question, "chat_history": []}, callbacks=callbacks),
+            self.retrieval_timeout + self.llm_timeout, "QA chain"
+        )
+        return result["answer"]
+
+    def _determine_query_type(self, query):
+        """Determine the type of query"""
+        query_lower = query.lower()
+        
+        if any(phrase in query_lower for phrase in [
+            "create", "make", "design", "suggest", "new menu",
+            "what would you recommend", "can you prepare"
+        ]):
+            return "menu_creation"
+        elif any(phrase in query_lower for phrase in [
+            "usual", "typical", "average", "median", "normally", "percentile",
+            "trend", "over time", "distribution"
+        ]) and any(phrase in query_lower for phrase in [
+            "charge", "price", "pricing", "cost", "per guest", "per person",
+            "per head", "fee", "tax", "spend", "$"
+        ]):
+            return "pricing_stats"
+        elif any(phrase in query_lower for phrase in [
+            "what was", "tell me about", "details for", "information about",
+            "pricing for", "menu for the", "what did we serve", "invoice"
+        ]):
+            return "event_lookup"
+        
+        return "general"
+
+    def _handle_menu_creation(self, query, callbacks=None, chat_history=()):
+        """Handle menu creation requests using food item catalog"""
+        # Get relevant food items and the past events they are most like
+        search_query = self._standalone_question(query, chat_history)
+        food_docs = self.food_retriever.get_relevant_documents(search_query, callbacks=callbacks)
+        event_docs = self.event_retriever.get_relevant_documents(search_query, callbacks=callbacks)
+        
+        response = self.llm.predict(
+            self._menu_prompt(query, food_docs, event_docs, chat_history, search_query), callbacks=callbacks
+        )
+        return response
+
+    def _menu_prompt(self, query, food_docs, event_docs, chat_history=(), standalone_query=None):
+        """Create a focused menu creation prompt"""
+        context = """
+        You are a creative menu designer with access to a catalog of food items. When creating menus:
+        1. Use only food items that exist in the catalog
+        2. Consider the menu section (appetizer, entree, etc.) when combining items
+        3. Create cohesive combinations that work well together
+        4. Reference which events the items were successfully used in
+        5. Use the precomputed pricing exactly as given; do not recalculate it
+        6. Explain why you chose each item and how they complement each other
+        """
+        
+        with metrics.span("quote"):
+            quotes = self._format_quotes(standalone_query or query)
+        
+        section_items = ""
+        with metrics.span("catalog_select"):
+            sections = self._format_section_items(standalone_query or query)
+        if sections:
+            section_items = f"""
+        Everything served in the sections the query names (newest first):
+        {sections}
+        """
+        
+        conversation = ""
+        if chat_history:
+            conversation = f"""
+        Conversation so far (the query may refine an earlier menu):
+        {self._format_history(chat_history)}
+        """
+        
+        return f"""
+        {context}
+        
+        Available Food Items:
+        {self._format_food_items(food_docs)}
+        
+        Related Past Events:
+        {self._format_events(event_docs)}
+        
+        {section_items}
+        Pricing (precomputed):
+        {quotes}
+        {conversation}
+        Query: {query}
+        
+        Create a menu using only the available items above. Include:
+        1. Selected items with descriptions
+        2. Why you chose each item
+        3. The pricing above, copied as given
+        4. Suggested variations or alternatives
+        """
+
+    def _format_quotes(self, query):
+        """Quotes for the request, rebuilt when ingestion updates the event store"""
+        quote_engine = self.quote_engine
+        version = self.event_store.version()
+        if version != self.quote_engine_version:
+            quote_engine = self.quote_engine = QuoteEngine.from_event_store(self.event_store)
+            self.quote_engine_version = version
+        quotes = quote_engine.quote_for_query(query)
+        return "\n\n".join(QuoteEngine.format_quote(quote) for quote in quotes)
+
+    def _format_food_items(self, food_docs):
+        """Format food items for the menu creation prompt"""
+        formatted_items = []
+        for doc in food_docs:
+            formatted_items.append(f"""
+Item: {doc.metadata.get('item_name')}
+Section: {doc.metadata.get('menu_section')}
+Description: {doc.metadata.get('full_description')}
+Previously used in: {self._format_usage(doc.metadata)}
+            """.strip())
+        return "\n\n".join(formatted_items)
+
+    def _format_section_items(self, query):
+        """Past dishes of each catalog section the query names, e.g. every dessert for "add a dessert"
+
+        Retrieval returns only the closest few dishes; this lists the section
+        from the food item catalog, reading just its lines.
+        """
+        query_words = " ".join(re.findall(r"[a-z]+", query.lower()))
+        blocks = []
+        for section in sorted(self.food_catalog.values("section")):
+            words = " ".join(re.findall(r"[a-z]+", section))
+            if not words or words in GENERIC_SECTIONS:
+                continue
+            singular = words[:-1] if words.endswith("s") else words
+            if not re.search(rf"\b(?:{re.escape(words)}|{re.escape(singular)})\b", query_words):
+                continue
+            records = sorted(self.food_catalog.select(section=section),
+                             key=lambda record: record.served_on or "", reverse=True)
+            if not records:
+                continue
+            names = []
+            for record in records:
+                if record.item_name not in names:
+                    names.append(record.item_name)
+            lines = "\n".join(f"- {name}" for name in names[:MAX_SECTION_ITEMS])
+            blocks.append(f"{records[0].section}:\n{lines}")
+        return "\n\n".join(blocks)
+
+    def _format_usage(self, metadata):
+        """'12 events, most recently Spring Luncheon (2024-04-03)' for a canonical food item"""
+        usage_count = metadata.get('usage_count')
+        if not usage_count or usage_count == 1:
+            return metadata.get('source_event')
+        last_served = f" ({metadata['last_served']})" if metadata.get('last_served') else ""
+        return f"{usage_count} events, most recently {metadata.get('source_event')}{last_served}"
+
+    def _format_events(self, event_docs):
+        """One line per related event for the menu creation prompt"""
+        return "\n".join(
+            f"- {doc.metadata.get('event_name')} ({doc.metadata.get('date') or 'date not specified'}, "
+            f"{doc.metadata.get('guest_count') or 'unknown'} guests)"
+            for doc in event_docs
+        )
+
+    def _event_question(self, query):
+        context = """
+        You are a menu bot with access to detailed event records. When providing event information:
+        1. Include the exact event name, date, and location
+        2. List all menu items by section
+        3. Provide the complete pricing breakdown
+        4. Include setup notes and contact information
+        Be specific and use exact details from the event records.
+        """
+        return f"{context}\n\nFind complete details for this event: {query}"
+
+    def _general_question(self, query):
+        context = "Menu creator bot. Use existing items/pricing only."
+        return f"{context}\n\nQuery: {query}"
+
+    def _handle_event_query(self, query, callbacks=None, chat_history=()):
+        """Handle queries about specific events"""
+        result = self.qa_chain({
+            "question": self._event_question(self._standalone_question(query, chat_history)),
+            "chat_history": []
+        }, callbacks=callbacks)
+        return result["answer"]
+
+    def _handle_general_query(self, query, callbacks=None, chat_history=()):
+        """Handle general queries"""
+        result = self.qa_chain({
+            "question": self._general_question(self._standalone_question(query, chat_history)),
+            "chat_history": []
+        }, callbacks=callbacks)
+        return result["answer"]
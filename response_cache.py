@@ -0,0 +1,151 @@
+from collections import OrderedDict
+import re
+import threading
+import time
+import numpy as np
+
+
+class ResponseCache:
+    """Two-tier cache in front of RAGApplication.get_response.
+
+    Tier one is an exact match on the normalized query plus its query type.
+    Tier two is a near-duplicate match: the cosine similarity between query
+    embeddings must be at least `similarity_threshold`, within the same query
+    type, and both queries must contain the same numbers: "menu for 50
+    guests" and "menu for 500 guests" embed almost identically but must not
+    share an answer (likewise years and invoice numbers). Entries expire
+    after `ttl_seconds`. The least recently used entry is evicted past
+    `max_entries`. The whole cache is dropped when the index version changes.
+    """
+
+    def __init__(self, embeddings, similarity_threshold=0.95, ttl_seconds=3600, max_entries=500):
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.index_version = None
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._entries = OrderedDict()  # (normalized query, query type) -> entry
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query):
+        return re.sub(r'\s+', ' ', query.lower()).strip(' ?.!')
+
+    @staticmethod
+    def numbers(query):
+        """The numeric tokens of a query (guest counts, years, invoice numbers), order-insensitive"""
+        return tuple(sorted(token.replace(',', '') for token in re.findall(r'\d[\d,]*(?:\.\d+)?', query)))
+
+    def _check_version(self, index_version):
+        if index_version != self.index_version:
+            self._entries.clear()
+            self.index_version = index_version
+
+    def _expire(self, now):
+        expired = [key for key, entry in self._entries.items()
+                   if now - entry['created'] > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+
+    @staticmethod
+    def _normalized(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _embed(self, query):
+        return self._normalized(self.embeddings.embed_query(query))
+
+    async def _aembed(self, query):
+        return self._normalized(await self.embeddings.aembed_query(query))
+
+    def _exact(self, key, query_type, index_version):
+        """Return (exact hit response, near-duplicate candidates with the same numbers)"""
+        now = time.time()
+        with self._lock:
+            self._check_version(index_version)
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                self.saved_seconds += entry['latency']
+                return entry['response'], None
+            numbers = self.numbers(key[0])
+            return None, [(k, e) for k, e in self._entries.items()
+                          if k[1] == query_type and e['numbers'] == numbers]
+
+    def _similar(self, candidates, vector):
+        if candidates:
+            matrix = np.stack([e['vector'] for _, e in candidates])
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity_threshold:
+                best_key, entry = candidates[best]
+                with self._lock:
+                    if best_key in self._entries:
+                        self._entries.move_to_end(best_key)
+                    self.semantic_hits += 1
+                    self.saved_seconds += entry['latency']
+                return entry['response']
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def get(self, query, query_type, index_version):
+        """Return a cached response for the query, or None"""
+        response, candidates = self._exact((self.normalize(query), query_type), query_type, index_version)
+        if response is not None:
+            return response
+        return self._similar(candidates, self._embed(query) if candidates else None)
+
+    async def aget(self, query, query_type, index_version):
+        """`get` using the async embeddings API"""
+        response, candidates = self._exact((self.normalize(query), query_type), query_type, index_version)
+        if response is not None:
+            return response
+        return self._similar(candidates, await self._aembed(query) if candidates else None)
+
+    def _insert(self, query, query_type, index_version, response, latency, vector):
+        key = (self.normalize(query), query_type)
+        entry = {
+            'response': response,
+            'vector': vector,
+            'numbers': self.numbers(key[0]),
+            'created': time.time(),
+            'latency': latency
+        }
+        with self._lock:
+            self._check_version(index_version)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, query, query_type, index_version, response, latency):
+        """Store a response along with how long it took to produce"""
+        self._insert(query, query_type, index_version, response, latency, self._embed(query))
+
+    async def aput(self, query, query_type, index_version, response, latency):
+        self._insert(query, query_type, index_version, response, latency, await self._aembed(query))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        hits = self.exact_hits + self.semantic_hits
+        total = hits + self.misses
+        return {
+            'exact_hits': self.exact_hits,
+            'semantic_hits': self.semantic_hits,
+            'misses': self.misses,
+            'hit_rate': hits / total if total else 0.0,
+            'saved_seconds': self.saved_seconds,
+            'entries': len(self._entries)
+        }
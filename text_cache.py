@@ -0,0 +1,96 @@
+import json
+import sqlite3
+import threading
+import zlib
+
+TEXT_CACHE_FILE = "extracted_text.sqlite"
+
+
+class TextCache:
+    """Compressed per-page text of every ingested PDF.
+
+    PyPDF2 is the slowest step of ingestion, so the page texts it extracts
+    are kept in SQLite, zlib-compressed, keyed by file id and revision (the
+    checksum, or the modified date when there is none). Only the latest
+    revision of each file is kept. Changing the extraction rules can then be
+    re-run from this cache (see CachedTextSource) without downloading or
+    parsing a single PDF.
+    """
+
+    def __init__(self, path=TEXT_CACHE_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._current = set()  # ids whose cached revision was just returned
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                file_id TEXT PRIMARY KEY,
+                revision TEXT NOT NULL,
+                title TEXT,
+                md5_checksum TEXT,
+                modified_date TEXT,
+                pages BLOB NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def revision(pdf_file):
+        return pdf_file.get('md5Checksum') or pdf_file.get('modifiedDate') or ""
+
+    def contains(self, pdf_file):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM pages WHERE file_id = ? AND revision = ?",
+                (pdf_file['id'], self.revision(pdf_file))
+            ).fetchone() is not None
+
+    def get(self, pdf_file):
+        """The page texts of this revision of the file, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pages FROM pages WHERE file_id = ? AND revision = ?",
+                (pdf_file['id'], self.revision(pdf_file))
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._current.add(pdf_file['id'])
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, pdf_file, pages):
+        """Store the page texts of a file, replacing any earlier revision"""
+        with self._lock:
+            if pdf_file['id'] in self._current:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (file_id, revision, title, md5_checksum, modified_date, pages) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (pdf_file['id'], self.revision(pdf_file), pdf_file.get('title'),
+                 pdf_file.get('md5Checksum'), pdf_file.get('modifiedDate'),
+                 zlib.compress(json.dumps(pages).encode('utf-8')))
+            )
+            self._conn.commit()
+            self._current.add(pdf_file['id'])
+
+    def retain(self, file_ids):
+        """Drop the text of every file not in `file_ids`"""
+        file_ids = set(file_ids)
+        with self._lock:
+            stored = [row[0] for row in self._conn.execute("SELECT file_id FROM pages")]
+            dropped = [file_id for file_id in stored if file_id not in file_ids]
+            self._conn.executemany("DELETE FROM pages WHERE file_id = ?", [(file_id,) for file_id in dropped])
+            self._conn.commit()
+            self._current.difference_update(dropped)
+        return len(dropped)
+
+    def stats(self):
+        with self._lock:
+            files, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(pages)), 0) FROM pages"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "files": files, "compressed_bytes": size}